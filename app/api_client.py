@@ -0,0 +1,133 @@
+import httpx
+import requests
+
+from app.http_session import build_async_client, build_session, request_async
+
+
+class FuturScamApiClient:
+    """
+    Client for the FuturScam REST API (/mongodb, /users, /mail).
+
+    All calls go through one keep-alive requests.Session with a bounded connection
+    pool, so a run reuses a handful of TCP connections instead of opening one per call.
+    Idempotent calls (GET/PUT/DELETE) are retried with backoff on 429/5xx; POST is not.
+    Methods return the requests.Response and let requests.RequestException propagate,
+    so callers keep their own status handling.
+
+    Use close() or the class as a context manager to release the pool.
+    """
+
+    def __init__(
+        self,
+        api_url: str = "http://localhost:8000",
+        pool_size: int = 10,
+        timeout: float = 30,
+        retries: int = 3,
+        backoff_factor: float = 0.5,
+    ):
+        self.api_url = api_url.rstrip("/")
+        self.timeout = timeout
+        self.session = build_session(pool_size=pool_size, retries=retries, backoff_factor=backoff_factor)
+
+    # ------------------------------------------------------------------ /mongodb
+
+    def create_rfp(self, rfp_document: dict) -> requests.Response:
+        return self.session.post(f"{self.api_url}/mongodb", json=rfp_document, timeout=self.timeout)
+
+    def update_rfp(self, job_id: str, rfp_document: dict) -> requests.Response:
+        return self.session.put(f"{self.api_url}/mongodb/{job_id}", json=rfp_document, timeout=self.timeout)
+
+    def list_rfps(self) -> requests.Response:
+        return self.session.get(f"{self.api_url}/mongodb", timeout=self.timeout)
+
+    def delete_rfp(self, job_id: str) -> requests.Response:
+        return self.session.delete(f"{self.api_url}/mongodb/{job_id}", timeout=self.timeout)
+
+    # ------------------------------------------------------------------ /users
+
+    def list_users(self) -> requests.Response:
+        return self.session.get(f"{self.api_url}/users", timeout=self.timeout)
+
+    # ------------------------------------------------------------------ /mail
+
+    def send_mail(self, data: dict) -> requests.Response:
+        """POST /mail with form data (to_addresses, subject, body, is_html)."""
+        return self.session.post(f"{self.api_url}/mail", data=data, timeout=self.timeout)
+
+    # ------------------------------------------------------------------
+
+    def close(self):
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class AsyncFuturScamApiClient:
+    """
+    asyncio counterpart of FuturScamApiClient (same endpoints, same retry policy).
+
+    One httpx.AsyncClient serves every coroutine, with up to `max_connections` calls in
+    flight. Idempotent calls are retried by request_async; POST is not. Methods return
+    the httpx.Response and let httpx.HTTPError propagate.
+
+    Use aclose() or the class as an async context manager to release the pool.
+    """
+
+    def __init__(
+        self,
+        api_url: str = "http://localhost:8000",
+        max_connections: int = 100,
+        timeout: float = 30,
+        retries: int = 3,
+        backoff_factor: float = 0.5,
+    ):
+        self.api_url = api_url.rstrip("/")
+        self.retries = retries
+        self.backoff_factor = backoff_factor
+        self.client = build_async_client(max_connections=max_connections, timeout=timeout)
+
+    async def _request(self, method: str, path: str, **kwargs) -> httpx.Response:
+        return await request_async(
+            self.client, method, f"{self.api_url}{path}",
+            retries=self.retries, backoff_factor=self.backoff_factor, **kwargs
+        )
+
+    # ------------------------------------------------------------------ /mongodb
+
+    async def create_rfp(self, rfp_document: dict) -> httpx.Response:
+        return await self._request("POST", "/mongodb", json=rfp_document)
+
+    async def update_rfp(self, job_id: str, rfp_document: dict) -> httpx.Response:
+        return await self._request("PUT", f"/mongodb/{job_id}", json=rfp_document)
+
+    async def list_rfps(self) -> httpx.Response:
+        return await self._request("GET", "/mongodb")
+
+    async def delete_rfp(self, job_id: str) -> httpx.Response:
+        return await self._request("DELETE", f"/mongodb/{job_id}")
+
+    # ------------------------------------------------------------------ /users
+
+    async def list_users(self) -> httpx.Response:
+        return await self._request("GET", "/users")
+
+    # ------------------------------------------------------------------ /mail
+
+    async def send_mail(self, data: dict) -> httpx.Response:
+        """POST /mail with form data (to_addresses, subject, body, is_html)."""
+        return await self._request("POST", "/mail", data=data)
+
+    # ------------------------------------------------------------------
+
+    async def aclose(self):
+        await self.client.aclose()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.aclose()
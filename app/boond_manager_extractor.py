@@ -1,20 +1,47 @@
+import asyncio
 import json
 import sys
 from datetime import datetime, timezone
 from pathlib import Path
 
+import httpx
 import jwt
 import requests
 
 # Add parent directory to sys.path to import params from root
 sys.path.insert(0, str(Path(__file__).parent.parent))
 import params
-from mappers.boond_mappings import BOOND_TO_MONGO_MAPPING, BOOND_LIST_MAPPINGS
+from mappers.boond_mappings import (
+    BOOND_TO_MONGO_MAPPING,
+    BOOND_LIST_MAPPINGS,
+    extract_company_name_from_included,
+    extract_resource_info_from_included
+)
 from mappers.mapper_to_mongo import map_json
+from app.fingerprint_store import make_fingerprint
+from app.http_session import (
+    RateLimiter,
+    build_async_client,
+    build_session,
+    fetch_concurrently,
+    fetch_concurrently_async,
+    request_async
+)
 
+# Overridable in params.py (e.g. point BOOND_API_URL to a local stub server)
+BOOND_API_URL = getattr(params, "BOOND_API_URL", "https://ui.boondmanager.com/api")
+BOOND_MAX_IN_FLIGHT = getattr(params, "BOOND_MAX_IN_FLIGHT", 8)
+BOOND_RATE_PER_SECOND = getattr(params, "BOOND_RATE_PER_SECOND", 5)
+BOOND_PAGE_SIZE = getattr(params, "BOOND_PAGE_SIZE", 100)
+BOOND_SERVER_DATE_FILTER = getattr(params, "BOOND_SERVER_DATE_FILTER", True)
 
-def fetch_boond_opportunities():
-    """Fetch opportunities from Boond Manager API using JWT authentication."""
+# Attributes written by analyze_opportunity (not part of the opportunity's fingerprint)
+ANALYSIS_ATTRIBUTES = ("extracted_skills", "extracted_languages", "extracted_rfp_type", "enhanced_description",
+                       "analysis_fallback")
+
+
+def build_boond_headers() -> dict:
+    """Build the Boond Manager JWT headers (the token is stable, so build it once per session)."""
     payload = { 
         "clientToken": params.CLIENT_BM,
         "clientKey": params.TOKEN_BM,
@@ -23,91 +50,417 @@ def fetch_boond_opportunities():
 
     # Generate JWT token (HS256)
     jwt_token = jwt.encode(payload, params.TOKEN_BM, algorithm="HS256")
-    
-    url = "https://ui.boondmanager.com/api/opportunities"
-    headers = {
+
+    return {
         "X-Jwt-Client-BoondManager": jwt_token,
         "Accept": "application/json"
     }
 
-    response = requests.get(url=url, headers=headers)
-    print(f"Status Code: {response.status_code}")
-    
-    if response.status_code != 200:
-        print(f"Error: received status code {response.status_code}")
-        if not response.headers.get("Content-Type", "").startswith("application/json"):
-            print("Server did NOT return JSON!")
-            print(response.text[:500])
+
+def create_boond_session(pool_size: int = BOOND_MAX_IN_FLIGHT) -> requests.Session:
+    """Create a pooled session, pre-authenticated for Boond Manager, with retry on 429/5xx."""
+    return build_session(pool_size=pool_size, headers=build_boond_headers())
+
+
+def fetch_boond_opportunities(cutoff_date: datetime = None, session: requests.Session = None):
+    """Fetch opportunities from Boond Manager API using JWT authentication.
+
+    Pages are fetched most recently updated first; when cutoff_date is given the
+    listing stops at the first opportunity not updated after it, so the payload
+    scales with the number of changed opportunities rather than the full history.
+    Returns {"data": [...]} like the unpaginated endpoint, or None on error.
+    """
+    items = []
+    try:
+        for page in iter_boond_opportunity_pages(cutoff_date=cutoff_date, session=session):
+            items.extend(page)
+    except (requests.RequestException, ValueError) as e:
+        print(f"Error: {e}")
         return None
-    
-    return response.json()
 
+    print(f"[BOOND] Listed {len(items)} opportunities")
+    return {"data": items}
 
-def filter_recent_opportunities(data: dict, cutoff_date: datetime, job_enhancer=None) -> list:
-    """Filter opportunities updated after cutoff_date and fetch their details.
-    Uses ChatGPT to extract skills and languages if job_enhancer is provided.
+
+def _parse_update_date(item: dict):
+    update_date_str = item.get("attributes", {}).get("updateDate")
+    if not update_date_str:
+        return None
+    dt = datetime.fromisoformat(update_date_str.replace("Z", "+00:00"))
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt
+
+
+def iter_boond_opportunity_pages(
+    cutoff_date: datetime = None,
+    session: requests.Session = None,
+    page_size: int = None,
+    base_url: str = None,
+):
+    """Yield pages (lists of opportunity items) of GET /opportunities as they arrive.
+
+    Results are requested sorted by updateDate, newest first. With a cutoff_date:
+    - the date filter is also sent to the server (period=updated, day granularity)
+      unless BOOND_SERVER_DATE_FILTER is False in params.py
+    - the last page is truncated at the first item updated at or before cutoff_date,
+      and no further page is requested
+
+    Raises requests.HTTPError on a non-200 page and ValueError on a non-JSON body.
     """
+    base_url = base_url or BOOND_API_URL
+    page_size = page_size or BOOND_PAGE_SIZE
+
+    own_session = session is None
+    if own_session:
+        session = create_boond_session(pool_size=1)
+
+    query = _opportunity_listing_query(cutoff_date, page_size)
+
+    try:
+        page_number = 1
+        seen = 0
+        while True:
+            response = session.get(
+                f"{base_url}/opportunities",
+                params={**query, "page": page_number},
+                timeout=30
+            )
+            print(f"Status Code: {response.status_code} (page {page_number})")
+
+            if response.status_code != 200:
+                if not response.headers.get("Content-Type", "").startswith("application/json"):
+                    print("Server did NOT return JSON!")
+                    print(response.text[:500])
+                raise requests.HTTPError(f"received status code {response.status_code}", response=response)
+
+            body = response.json()
+            page, last_page = _cut_listing_page(body, cutoff_date, page_size, seen)
+            if page:
+                yield page
+
+            seen += len(body.get("data", []))
+            if last_page:
+                break
+            page_number += 1
+    finally:
+        if own_session:
+            session.close()
+
+
+def _opportunity_listing_query(cutoff_date: datetime, page_size: int) -> dict:
+    query = {
+        "maxResults": page_size,
+        "sort": "updateDate",
+        "order": "desc",
+    }
+    if cutoff_date is not None and BOOND_SERVER_DATE_FILTER:
+        query["period"] = "updated"
+        query["startDate"] = cutoff_date.date().isoformat()
+        query["endDate"] = datetime.now(timezone.utc).date().isoformat()
+    return query
+
+
+def _cut_listing_page(body: dict, cutoff_date: datetime, page_size: int, seen: int):
+    """Return (items updated after cutoff_date, whether this is the last page to request)."""
+    page = body.get("data", [])
+    total = body.get("meta", {}).get("totals", {}).get("rows")
+
+    reached_cutoff = False
+    if cutoff_date is not None:
+        for index, item in enumerate(page):
+            update_dt = _parse_update_date(item)
+            if update_dt is not None and update_dt <= cutoff_date:
+                page = page[:index]
+                reached_cutoff = True
+                break
+
+    seen += len(body.get("data", []))
+    last_page = reached_cutoff or len(body.get("data", [])) < page_size or (total is not None and seen >= total)
+    return page, last_page
+
+
+def select_recent_ids(data: dict, cutoff_date: datetime) -> list:
+    """Return the ids of the listed opportunities updated after cutoff_date, in listing order."""
     filtered_ids = []
     for item in data.get("data", []):
-        update_date_str = item.get("attributes", {}).get("updateDate")
-        if not update_date_str:
+        update_dt = _parse_update_date(item)
+        if update_dt is None:
             continue
         
-        update_dt = datetime.fromisoformat(update_date_str.replace("Z", "+00:00"))
         if update_dt > cutoff_date:
             filtered_ids.append(item["id"])
+    return filtered_ids
+
+
+def analyze_opportunity(opportunity: dict, job_enhancer, item_id=None) -> dict:
+    """Run the single-call ChatGPT analysis on a detailed opportunity and store it in its attributes
+    (extracted_skills, extracted_languages, extracted_rfp_type, enhanced_description), which
+    BOOND_TO_MONGO_MAPPING picks up. Returns the opportunity (unchanged on error or empty text).
+    """
+    attributes = opportunity.get("data", {}).get("attributes", {})
+    item_id = item_id or opportunity.get("data", {}).get("id")
+    criteria_text = attributes.get("criteria", "")
+    description_text = attributes.get("description", "")
+
+    if not (criteria_text or description_text):
+        return opportunity
+
+    print(f"[CHATGPT] Analyzing opportunity {item_id}...")
+    try:
+        analysis = job_enhancer.analyze_job(description_text, criteria_text)
+    except Exception as e:
+        print(f"[ERROR] Error analyzing opportunity {item_id}: {e}")
+        attributes["analysis_fallback"] = True
+        return opportunity
+
+    return _store_analysis(opportunity, analysis, description_text)
+
+
+def _store_analysis(opportunity: dict, analysis: dict, description_text: str) -> dict:
+    # Store the analysis in attributes (picked up by BOOND_TO_MONGO_MAPPING)
+    attributes = opportunity["data"]["attributes"]
+    attributes["extracted_skills"] = analysis.get("skills", [])
+    attributes["extracted_languages"] = analysis.get("languages", [])
+    attributes["extracted_rfp_type"] = analysis.get("RFP_type", "Autre")
+    # Default result of a failed ChatGPT call: the opportunity must not be fingerprinted
+    attributes["analysis_fallback"] = bool(analysis.get("fallback"))
+    if description_text:
+        attributes["enhanced_description"] = analysis.get("job_description", description_text)
+
+    print(f"[OK] Extracted {len(attributes['extracted_skills'])} skills: {attributes['extracted_skills']}")
+    print(f"[OK] Extracted {len(attributes['extracted_languages'])} languages: {attributes['extracted_languages']}")
+    print(f"[OK] RFP_type: {attributes['extracted_rfp_type']}")
+    return opportunity
+
+
+def opportunity_fingerprint(opportunity: dict) -> str:
+    """Hash of what an opportunity contributes to its RFP: mapped fields, state, company and
+    manager from `included`, and the criteria sent to ChatGPT. updateDate and the ChatGPT
+    results stored by analyze_opportunity are left out, so a cosmetic Boond update keeps
+    the same fingerprint.
+    """
+    data = opportunity.get("data", {})
+    attributes = {
+        key: value for key, value in data.get("attributes", {}).items()
+        if key not in ANALYSIS_ATTRIBUTES and key != "updateDate"
+    }
+    source = dict(opportunity, data=dict(data, attributes=attributes))
+    return make_fingerprint({
+        "mapped": map_json(source, BOOND_TO_MONGO_MAPPING, BOOND_LIST_MAPPINGS),
+        "state": attributes.get("state"),
+        "criteria": attributes.get("criteria", ""),
+        "company": extract_company_name_from_included(opportunity),
+        "manager": extract_resource_info_from_included(opportunity),
+    })
+
+
+def forget_degraded_fingerprints(opportunities: list, fingerprints) -> list:
+    """Drop the pending fingerprints of the opportunities whose ChatGPT analysis failed (fallback result),
+    so they are analyzed again next run instead of being skipped as unchanged. Returns `opportunities`."""
+    if fingerprints is not None:
+        degraded = [
+            opportunity["data"]["attributes"].get("reference") for opportunity in opportunities
+            if opportunity.get("data", {}).get("attributes", {}).get("analysis_fallback")
+        ]
+        if degraded:
+            print(f"[WARN] {len(degraded)} opportunities kept the fallback analysis, not fingerprinted")
+            fingerprints.forget("boond", [reference for reference in degraded if reference])
+    return opportunities
+
+
+def skip_unchanged_opportunities(opportunities: list, fingerprints, checkpoints=None) -> list:
+    """Drop the (item_id, opportunity) pairs whose fingerprint matches the one recorded by the
+    last successful load (FingerprintStore, source "boond", keyed by reference), or that an
+    interrupted run already saved since the Boond watermark (CheckpointStore)."""
+    if fingerprints is None and checkpoints is None:
+        return opportunities
+    changed = []
+    for item_id, opportunity in opportunities:
+        reference = opportunity.get("data", {}).get("attributes", {}).get("reference")
+        if not reference:
+            changed.append((item_id, opportunity))
+            continue
+        fingerprint = opportunity_fingerprint(opportunity)
+        if checkpoints is not None and checkpoints.check("boond", reference, fingerprint):
+            print(f"[SKIP] Opportunity {item_id} ({reference}) already saved by the interrupted run")
+            continue
+        if fingerprints is not None and fingerprints.check("boond", reference, fingerprint):
+            print(f"[SKIP] Opportunity {item_id} ({reference}) unchanged since its last load")
+            continue
+        changed.append((item_id, opportunity))
+    return changed
+
+
+def filter_recent_opportunities(data: dict, cutoff_date: datetime, job_enhancer=None, session: requests.Session = None,
+                                enrichment_stage=None, fingerprints=None, checkpoints=None) -> list:
+    """Filter opportunities updated after cutoff_date and fetch their details.
+    Uses ChatGPT to analyze each opportunity if job_enhancer is provided: one call returns
+    the skills, languages, RFP_type and enhanced HTML description, stored in the attributes
+    (see analyze_opportunity).
+    Details are fetched concurrently over `session` (a new Boond session if None), and
+    the ChatGPT analyses run through `enrichment_stage` (an EnrichmentStage) if given.
+    With a FingerprintStore, opportunities unchanged since their last load are dropped
+    before the analysis, and with a CheckpointStore those already saved by an interrupted
+    run (see skip_unchanged_opportunities).
+    """
+    filtered_ids = select_recent_ids(data, cutoff_date)
     
     if not job_enhancer:
-        print("[WARN] No job enhancer provided, skills and languages extraction will be skipped")
+        print("[WARN] No job enhancer provided, ChatGPT analysis will be skipped")
     
-    # Fetch details for each filtered opportunity
-    details = []
-    for item_id in filtered_ids:
-        response = requests.get(
-            f"https://ui.boondmanager.com/api/opportunities/{item_id}/information",
-            headers={
-                "X-Jwt-Client-BoondManager": jwt.encode(
-                    {
-                        "clientToken": params.CLIENT_BM,
-                        "clientKey": params.TOKEN_BM,
-                        "userToken": params.USER_BM
-                    },
-                    params.TOKEN_BM,
-                    algorithm="HS256"
-                ),
-                "Accept": "application/json"
-            },
+    # Fetch details for all filtered opportunities concurrently (results keep filtered_ids order)
+    fetched = fetch_opportunity_details(filtered_ids, session=session)
+
+    def analyze(entry):
+        item_id, opportunity = entry
+        if job_enhancer:
+            return analyze_opportunity(opportunity, job_enhancer, item_id)
+        return opportunity
+
+    fetched = [(item_id, opportunity) for item_id, opportunity in fetched if opportunity is not None]
+    fetched = skip_unchanged_opportunities(fetched, fingerprints, checkpoints)
+    if enrichment_stage is not None:
+        # ChatGPT analyses run concurrently, results keep the fetch order
+        return forget_degraded_fingerprints(enrichment_stage.map(analyze, fetched), fingerprints)
+    return forget_degraded_fingerprints([analyze(entry) for entry in fetched], fingerprints)
+
+
+def fetch_opportunity_details(
+    item_ids: list,
+    session: requests.Session = None,
+    base_url: str = None,
+    max_in_flight: int = None,
+    rate_per_second: float = None,
+) -> list:
+    """Fetch /opportunities/{id}/information for every ID with bounded concurrency.
+
+    All requests share one pooled session (JWT built once); the session retries
+    429/5xx with backoff and honors Retry-After, and a per-host rate limiter caps
+    the request rate. Returns [(item_id, opportunity dict or None)] in item_ids order.
+    """
+    base_url = base_url or BOOND_API_URL
+    max_in_flight = max_in_flight or BOOND_MAX_IN_FLIGHT
+    if rate_per_second is None:
+        rate_per_second = BOOND_RATE_PER_SECOND
+
+    own_session = session is None
+    if own_session:
+        session = create_boond_session(pool_size=max_in_flight)
+
+    try:
+        urls = [f"{base_url}/opportunities/{item_id}/information" for item_id in item_ids]
+        responses = fetch_concurrently(
+            session,
+            urls,
+            max_in_flight=max_in_flight,
+            rate_limiter=RateLimiter(rate_per_second),
             timeout=30
         )
-        
-        if response.status_code == 200:
-            try:
-                opportunity = response.json()
-                print(opportunity)
-                
-                # Extract skills and languages using ChatGPT
-                if job_enhancer:
-                    criteria_text = opportunity.get("data", {}).get("attributes", {}).get("criteria", "")
-                    description_text = opportunity.get("data", {}).get("attributes", {}).get("description", "")
-                    
-                    if criteria_text or description_text:
-                        print(f"[CHATGPT] Extracting skills and languages for opportunity {item_id}...")
-                        extracted = job_enhancer.extract_skills_and_languages(criteria_text, description_text)
-                        
-                        # Store extracted skills and languages in attributes
-                        opportunity["data"]["attributes"]["extracted_skills"] = extracted.get("skills", [])
-                        opportunity["data"]["attributes"]["extracted_languages"] = extracted.get("languages", [])
-                        
-                        print(f"[OK] Extracted {len(extracted.get('skills', []))} skills: {extracted.get('skills', [])}")
-                        print(f"[OK] Extracted {len(extracted.get('languages', []))} languages: {extracted.get('languages', [])}")
-                
-                details.append(opportunity)
-            except json.JSONDecodeError as e:
-                print(f"Error decoding JSON for opportunity {item_id}: {e}")
-        else:
-            print(f"Error fetching opportunity {item_id}: status {response.status_code}")
-    
-    return details
+    finally:
+        if own_session:
+            session.close()
+
+    return [(item_id, _parse_detail_response(item_id, response)) for item_id, response in zip(item_ids, responses)]
+
+
+def _parse_detail_response(item_id, response):
+    """Opportunity dict of a detail response (requests or httpx), or None (exception, status, JSON)."""
+    if isinstance(response, Exception):
+        print(f"Error fetching opportunity {item_id}: {response}")
+    elif response.status_code == 200:
+        try:
+            return response.json()
+        except json.JSONDecodeError as e:
+            print(f"Error decoding JSON for opportunity {item_id}: {e}")
+    else:
+        print(f"Error fetching opportunity {item_id}: status {response.status_code}")
+    return None
+
+
+def _changed_since_stored(reference: str, opportunity: dict, document: dict, fingerprints=None) -> bool:
+    """True if the Boond opportunity was edited after its stored RFP document was built (see warm_skills_cache)."""
+    if document.get("boondUpdatedAt"):
+        stored_dt = _parse_update_date({"attributes": {"updateDate": document["boondUpdatedAt"]}})
+        current_dt = _parse_update_date(opportunity.get("data", {}))
+        if current_dt is None or current_dt <= stored_dt:
+            return False
+    # Newer updateDate (possibly a cosmetic edit: unchanged opportunities are not re-saved) or legacy document
+    recorded = fingerprints.recorded("boond", reference) if fingerprints is not None else None
+    if recorded is not None:
+        return recorded != opportunity_fingerprint(opportunity)
+    return bool(document.get("boondUpdatedAt"))
+
+
+def warm_skills_cache(job_enhancer, inserter, fingerprints=None, session: requests.Session = None) -> int:
+    """Fill the skills/languages and analysis caches from RFPs already stored in MongoDB, without any ChatGPT call.
+
+    The cache key is computed from the Boond criteria/description (fetched for every open
+    opportunity that has a document in MongoDB), and the value from the document's stored
+    skills/languages (plus RFP_type and enhanced job_desc for the analysis cache).
+    An opportunity edited since its document was stored would get stale skills/RFP_type
+    cached under the new text: it is primed only if its updateDate is not newer than the
+    document's boondUpdatedAt, or else if its fingerprint still matches the one recorded
+    at load time (`fingerprints`, FingerprintStore source "boond"). Documents stored before
+    boondUpdatedAt existed and never fingerprinted are primed as is.
+    Opportunities that carry their own Boond skills or languages are skipped:
+    their stored lists did not come from ChatGPT.
+    Returns the number of opportunities primed.
+    """
+    data = fetch_boond_opportunities(session=session)
+    if not data:
+        print("[ERROR] No data from Boond Manager API")
+        return 0
+
+    ids_by_reference = {}
+    for item in data.get("data", []):
+        attributes = item.get("attributes", {})
+        if attributes.get("reference") and attributes.get("state") in (0, "0"):
+            ids_by_reference[attributes["reference"]] = item["id"]
+
+    stored = inserter.find_by_job_ids(ids_by_reference, {"job_id": 1, "skills": 1, "languages": 1, "RFP_type": 1,
+                                                         "job_desc": 1, "boondUpdatedAt": 1})
+    print(f"[CACHE] {len(stored)} open Boond opportunities found in MongoDB")
+
+    references = list(stored)
+    fetched = fetch_opportunity_details([ids_by_reference[ref] for ref in references], session=session)
+
+    primed = 0
+    stale = 0
+    for reference, (item_id, opportunity) in zip(references, fetched):
+        if opportunity is None:
+            continue
+        attributes = opportunity.get("data", {}).get("attributes", {})
+        if attributes.get("skills") or attributes.get("languages"):
+            continue
+
+        criteria_text = attributes.get("criteria", "")
+        description_text = attributes.get("description", "")
+        if not (criteria_text or description_text):
+            continue
+
+        document = stored[reference]
+        if _changed_since_stored(reference, opportunity, document, fingerprints):
+            stale += 1
+            continue
+
+        skills = [s.get("name") if isinstance(s, dict) else s for s in document.get("skills", [])]
+        languages = [l.get("language") if isinstance(l, dict) else l for l in document.get("languages", [])]
+        if not job_enhancer.prime_skills_cache(criteria_text, description_text, skills, languages):
+            continue
+        if description_text and document.get("RFP_type") and document.get("job_desc"):
+            job_enhancer.prime_analysis_cache(description_text, criteria_text, {
+                "skills": skills,
+                "languages": languages,
+                "RFP_type": document["RFP_type"],
+                "job_description": document["job_desc"]
+            })
+        primed += 1
+
+    if stale:
+        print(f"[CACHE] {stale} opportunities changed since their document was stored, not primed")
+    print(f"[CACHE] Skills cache warmed with {primed} entries")
+    return primed
 
 
 def transform_boond_to_mongo_format(opportunity: dict) -> dict:
@@ -129,11 +482,139 @@ def transform_boond_to_mongo_format(opportunity: dict) -> dict:
 
 
 
+###############################################################################
+# asyncio variant (--mode async)
+###############################################################################
+
+def create_boond_async_client(max_connections: int = BOOND_MAX_IN_FLIGHT) -> httpx.AsyncClient:
+    """Async counterpart of create_boond_session (pre-authenticated, bounded pool)."""
+    return build_async_client(max_connections=max_connections, headers=build_boond_headers())
+
+
+async def fetch_boond_opportunities_async(cutoff_date: datetime = None, client: httpx.AsyncClient = None,
+                                          page_size: int = None, base_url: str = None):
+    """Async fetch_boond_opportunities: same paging and cutoff, returns {"data": [...]} or None on error."""
+    base_url = base_url or BOOND_API_URL
+    page_size = page_size or BOOND_PAGE_SIZE
+    query = _opportunity_listing_query(cutoff_date, page_size)
+
+    own_client = client is None
+    if own_client:
+        client = create_boond_async_client(max_connections=1)
+
+    items = []
+    try:
+        page_number = 1
+        seen = 0
+        while True:
+            response = await request_async(
+                client, "GET", f"{base_url}/opportunities", params={**query, "page": page_number}
+            )
+            print(f"Status Code: {response.status_code} (page {page_number})")
+            if response.status_code != 200:
+                print(f"Error: received status code {response.status_code}")
+                return None
+
+            body = response.json()
+            page, last_page = _cut_listing_page(body, cutoff_date, page_size, seen)
+            items.extend(page)
+            seen += len(body.get("data", []))
+            if last_page:
+                break
+            page_number += 1
+    except (httpx.HTTPError, ValueError) as e:
+        print(f"Error: {e}")
+        return None
+    finally:
+        if own_client:
+            await client.aclose()
+
+    print(f"[BOOND] Listed {len(items)} opportunities")
+    return {"data": items}
+
+
+async def fetch_opportunity_details_async(
+    item_ids: list,
+    client: httpx.AsyncClient,
+    base_url: str = None,
+    max_in_flight: int = None,
+    rate_per_second: float = None,
+) -> list:
+    """Async fetch_opportunity_details: [(item_id, opportunity dict or None)] in item_ids order."""
+    base_url = base_url or BOOND_API_URL
+    if rate_per_second is None:
+        rate_per_second = BOOND_RATE_PER_SECOND
+    urls = [f"{base_url}/opportunities/{item_id}/information" for item_id in item_ids]
+    responses = await fetch_concurrently_async(
+        client,
+        urls,
+        max_in_flight=max_in_flight or BOOND_MAX_IN_FLIGHT,
+        rate_limiter=RateLimiter(rate_per_second)
+    )
+    return [(item_id, _parse_detail_response(item_id, response)) for item_id, response in zip(item_ids, responses)]
+
+
+async def analyze_opportunity_async(opportunity: dict, job_enhancer, item_id=None) -> dict:
+    """Async analyze_opportunity (JobDescriptionEnhancer.analyze_job_async)."""
+    attributes = opportunity.get("data", {}).get("attributes", {})
+    item_id = item_id or opportunity.get("data", {}).get("id")
+    criteria_text = attributes.get("criteria", "")
+    description_text = attributes.get("description", "")
+
+    if not (criteria_text or description_text):
+        return opportunity
+
+    print(f"[CHATGPT] Analyzing opportunity {item_id}...")
+    try:
+        analysis = await job_enhancer.analyze_job_async(description_text, criteria_text)
+    except Exception as e:
+        print(f"[ERROR] Error analyzing opportunity {item_id}: {e}")
+        attributes["analysis_fallback"] = True
+        return opportunity
+    return _store_analysis(opportunity, analysis, description_text)
+
+
+async def filter_recent_opportunities_async(data: dict, cutoff_date: datetime, job_enhancer=None,
+                                            client: httpx.AsyncClient = None, max_concurrency: int = 4,
+                                            semaphore: asyncio.Semaphore = None, fingerprints=None,
+                                            checkpoints=None) -> list:
+    """Async filter_recent_opportunities: details fetched concurrently on `client`, then at most
+    `max_concurrency` ChatGPT analyses in flight (or as many as `semaphore` allows, when the
+    slots are shared with other callers). Results keep the listing order.
+    """
+    filtered_ids = select_recent_ids(data, cutoff_date)
+
+    if not job_enhancer:
+        print("[WARN] No job enhancer provided, ChatGPT analysis will be skipped")
+
+    own_client = client is None
+    if own_client:
+        client = create_boond_async_client()
+    try:
+        fetched = await fetch_opportunity_details_async(filtered_ids, client)
+    finally:
+        if own_client:
+            await client.aclose()
+
+    opportunities = [(item_id, opportunity) for item_id, opportunity in fetched if opportunity is not None]
+    opportunities = skip_unchanged_opportunities(opportunities, fingerprints, checkpoints)
+    if not job_enhancer:
+        return [opportunity for _, opportunity in opportunities]
+
+    semaphore = semaphore or asyncio.Semaphore(max(1, max_concurrency))
+
+    async def analyze(item_id, opportunity):
+        async with semaphore:
+            return await analyze_opportunity_async(opportunity, job_enhancer, item_id)
+
+    analyzed = await asyncio.gather(*(analyze(item_id, opportunity) for item_id, opportunity in opportunities))
+    return forget_degraded_fingerprints(list(analyzed), fingerprints)
+
 
 if __name__ == "__main__":
-    data = fetch_boond_opportunities()
+    cutoff = datetime(2025, 11, 21, tzinfo=timezone.utc)
+    data = fetch_boond_opportunities(cutoff_date=cutoff)
     if data:
-        cutoff = datetime(2025, 11, 21, tzinfo=timezone.utc)
         # Note: filter_recent_opportunities now requires job_enhancer parameter
         # For standalone testing, pass None to skip skills/languages extraction
         recent_opportunities = filter_recent_opportunities(data, cutoff, job_enhancer=None)
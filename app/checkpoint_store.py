@@ -0,0 +1,153 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Iterable, Optional
+
+
+class CheckpointStore:
+    """
+    Points de reprise (SQLite) de l'ETL : un watermark par source et l'état des éléments traités.
+
+    Le watermark d'une source (mail, boond) est la date à partir de laquelle le prochain
+    run la relit ; chaque source avance le sien dès qu'elle a réussi, indépendamment des
+    autres. Entre deux watermarks, chaque élément sauvegardé est enregistré avec sa
+    version et le document écrit : après un crash, check() reconnaît les éléments déjà
+    terminés, qui ne repassent ni par ChatGPT ni par l'écriture ; les documents pas encore
+    notifiés (voir mark_notified) sont rendus par take_resumed() pour les notifications.
+    Avancer un watermark efface, dans la même transaction, les éléments de la source.
+    Chaque écriture est une transaction SQLite (journal WAL) : un arrêt brutal laisse
+    l'état d'avant ou d'après, jamais un état partiel.
+    Thread-safe : une seule connexion protégée par un verrou.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.resumed = {}
+        self._pending = {}
+        self._resumed_docs = {}
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=FULL")
+        with self._conn:
+            self._conn.execute(
+                """CREATE TABLE IF NOT EXISTS watermarks (
+                    source TEXT PRIMARY KEY,
+                    value TEXT NOT NULL,
+                    updated_at REAL NOT NULL
+                )"""
+            )
+            self._conn.execute(
+                """CREATE TABLE IF NOT EXISTS items (
+                    source TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    version TEXT NOT NULL,
+                    document TEXT NOT NULL,
+                    notified INTEGER NOT NULL DEFAULT 0,
+                    done_at REAL NOT NULL,
+                    PRIMARY KEY (source, key)
+                )"""
+            )
+
+    def get_watermark(self, source: str, default: Optional[datetime] = None) -> Optional[datetime]:
+        """Return the watermark of `source` (timezone-aware UTC), or `default` if none was saved."""
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM watermarks WHERE source = ?", (source,)).fetchone()
+        if row is None:
+            return default
+        value = datetime.fromisoformat(row[0])
+        return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+    def set_watermark(self, source: str, value: datetime):
+        """Save the watermark of `source` and forget its processed items, in one transaction."""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO watermarks (source, value, updated_at) VALUES (?, ?, ?)",
+                (source, value.isoformat(), time.time())
+            )
+            self._conn.execute("DELETE FROM items WHERE source = ?", (source,))
+            for key in [key for key in self._pending if key[0] == source]:
+                del self._pending[key]
+
+    def watermarks(self) -> dict:
+        """Return {source: (watermark ISO string, items done since)} for every saved source."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT w.source, w.value, COUNT(i.key) FROM watermarks w "
+                "LEFT JOIN items i ON i.source = w.source GROUP BY w.source ORDER BY w.source"
+            ).fetchall()
+        return {source: (value, count) for source, value, count in rows}
+
+    def check(self, source: str, key: str, version: str) -> bool:
+        """Return True if `key` was already saved with this version since the watermark (skip it),
+        else keep the version pending for mark_done()."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT version, document, notified FROM items WHERE source = ? AND key = ?", (source, key)
+            ).fetchone()
+            if row is not None and row[0] == version:
+                self.resumed[source] = self.resumed.get(source, 0) + 1
+                if not row[2]:
+                    self._resumed_docs.setdefault(source, []).append(json.loads(row[1]))
+                return True
+            self._pending[(source, key)] = version
+            return False
+
+    def mark_done(self, source: str, documents: Iterable[dict], key_field: str = "job_id") -> int:
+        """Record the saved `documents` whose key was checked by this run. Returns the number recorded."""
+        now = time.time()
+        with self._lock:
+            rows = []
+            for document in documents:
+                key = document.get(key_field)
+                version = self._pending.pop((source, key), None)
+                if version is not None:
+                    rows.append((source, key, version, json.dumps(document, default=str, ensure_ascii=False), now))
+            if rows:
+                with self._conn:
+                    self._conn.executemany(
+                        "INSERT OR REPLACE INTO items (source, key, version, document, done_at) VALUES (?, ?, ?, ?, ?)",
+                        rows
+                    )
+        return len(rows)
+
+    def take_resumed(self, source: str) -> list:
+        """Return (and forget) the stored documents of the not yet notified items check() skipped for `source`."""
+        with self._lock:
+            return self._resumed_docs.pop(source, [])
+
+    def mark_notified(self, source: str):
+        """Flag the items of `source` saved so far as notified: a resumed run does not notify them again."""
+        with self._lock, self._conn:
+            self._conn.execute("UPDATE items SET notified = 1 WHERE source = ?", (source,))
+
+    def migrate_legacy_file(self, path, sources: Iterable[str]) -> bool:
+        """
+        Seed the watermarks of `sources` from a legacy single-timestamp file (.last_execution),
+        then rename it to <name>.migrated. Only done while the store has no watermark.
+        Returns True if the file was migrated.
+        """
+        path = Path(path)
+        if not path.exists():
+            return False
+        with self._lock:
+            if self._conn.execute("SELECT COUNT(*) FROM watermarks").fetchone()[0]:
+                return False
+        value = datetime.fromisoformat(path.read_text().strip())
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO watermarks (source, value, updated_at) VALUES (?, ?, ?)",
+                [(source, value.isoformat(), time.time()) for source in sources]
+            )
+        os.replace(path, path.with_name(path.name + ".migrated"))
+        return True
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -1,8 +1,10 @@
 import logging
-from typing import Optional
+from datetime import date, datetime
+from typing import Iterable, Optional
 
-from pymongo import MongoClient
-from pymongo.errors import ConnectionFailure, DuplicateKeyError, PyMongoError
+from pymongo import MongoClient, ReplaceOne, UpdateOne
+from pymongo.write_concern import WriteConcern
+from pymongo.errors import BulkWriteError, ConnectionFailure, DuplicateKeyError, PyMongoError
 
 logger = logging.getLogger(__name__)
 
@@ -12,18 +14,24 @@ class MongoJsonInserter:
 
     Notes:
     - The constructor attempts to connect (ping) and will raise RuntimeError on failure.
-    - The collection will have a unique index on `job_id` (created if missing).
+    - The collection will have a unique index on `job_id` and an index on `deadlineAt`
+      (used by delete_expired), created if missing.
     - Use `close()` to explicitly close the MongoDB client or use the class as a context manager.
+    - `write_concern` (e.g. {"w": 1, "j": False} or {"w": "majority"}) applies to every write.
+    - `client` lets callers inject an existing client (e.g. mongomock.MongoClient() in tests);
+      an injected client is not closed by `close()`.
     """
 
-    def __init__(self, uri: str, db_name: str = "FuturScam", collection_name: str = "RFP"):
+    def __init__(self, uri: str, db_name: str = "FuturScam", collection_name: str = "RFP",
+                 write_concern: Optional[dict] = None, client: Optional[MongoClient] = None):
         self.uri = uri
         self.db_name = db_name
         self.collection_name = collection_name
+        self._owns_client = client is None
 
         # attempt to connect and ping the server; raise a clear error on failure
         try:
-            self.client = MongoClient(self.uri, serverSelectionTimeoutMS=5000)
+            self.client = client if client is not None else MongoClient(self.uri, serverSelectionTimeoutMS=5000)
             self.client.admin.command("ping")
             logger.info("Connected to MongoDB")
         except ConnectionFailure as exc:
@@ -31,6 +39,8 @@ class MongoJsonInserter:
 
         self.db = self.client[self.db_name]
         self.collection = self.db[self.collection_name]
+        if write_concern:
+            self.collection = self.collection.with_options(write_concern=WriteConcern(**write_concern))
 
         # Ensure unique index on job_id; log a warning if index creation fails
         try:
@@ -38,6 +48,11 @@ class MongoJsonInserter:
             logger.debug("Ensured unique index on 'job_id'")
         except PyMongoError as exc:
             logger.warning("Could not create index on 'job_id': %s", exc)
+        try:
+            self.collection.create_index("deadlineAt")
+            logger.debug("Ensured index on 'deadlineAt'")
+        except PyMongoError as exc:
+            logger.warning("Could not create index on 'deadlineAt': %s", exc)
 
     def insert_json(self, data: dict) -> str:
         """Insert or replace a document by its 'job_id'.
@@ -69,3 +84,169 @@ class MongoJsonInserter:
 
         return job_id
 
+    def close(self):
+        """Close the MongoDB client (unless it was injected by the caller)."""
+        if self._owns_client:
+            self.client.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def bulk_upsert(self, documents: Iterable[dict], batch_size: int = 500) -> dict:
+        """Insert or replace many documents by 'job_id' with unordered bulk_write batches.
+
+        Each batch is one round-trip of ReplaceOne(upsert=True) operations; a failing
+        document does not stop the others. Documents without a job_id are reported as
+        failed and never sent.
+
+        Returns a report dict:
+            - results: [{"job_id", "status": "created"|"updated"|"failed"|"unacknowledged", "error"}]
+              in input order ("unacknowledged" only with a w=0 write concern)
+            - created / updated / failed / unacknowledged: counts per status
+            - matched / upserted / modified: server-side counts summed over all batches
+        """
+        results = []
+        batch = []
+        counts = {"matched": 0, "upserted": 0, "modified": 0}
+
+        for data in documents:
+            job_id = data.get("job_id") if isinstance(data, dict) else None
+            if not job_id:
+                results.append({"job_id": job_id, "status": "failed", "error": "missing 'job_id'"})
+                continue
+            batch.append((len(results), data))
+            results.append({"job_id": job_id, "status": None, "error": None})
+            if len(batch) >= batch_size:
+                self._write_upsert_batch(batch, results, counts)
+                batch = []
+
+        if batch:
+            self._write_upsert_batch(batch, results, counts)
+
+        report = {"results": results, "created": 0, "updated": 0, "failed": 0, "unacknowledged": 0, **counts}
+        for entry in results:
+            report[entry["status"]] += 1
+        logger.info(
+            "Bulk upsert: %d created, %d updated, %d failed (matched=%d, upserted=%d, modified=%d)",
+            report["created"], report["updated"], report["failed"],
+            report["matched"], report["upserted"], report["modified"]
+        )
+        return report
+
+    def _write_upsert_batch(self, batch: list, results: list, counts: dict):
+        """Send one bulk_write for [(result_index, document)], fill in results and add to counts."""
+        operations = [ReplaceOne({"job_id": data["job_id"]}, data, upsert=True) for _, data in batch]
+
+        upserted_indexes = set()
+        errors = {}
+        try:
+            outcome = self.collection.bulk_write(operations, ordered=False)
+            if not outcome.acknowledged:
+                # w=0: the server reports nothing back, per-document status is unknown
+                for result_index, _ in batch:
+                    results[result_index]["status"] = "unacknowledged"
+                return
+            upserted_indexes = set(outcome.upserted_ids)
+            counts["matched"] += outcome.matched_count
+            counts["upserted"] += outcome.upserted_count
+            counts["modified"] += outcome.modified_count
+        except BulkWriteError as exc:
+            details = exc.details or {}
+            upserted_indexes = {entry["index"] for entry in details.get("upserted", [])}
+            errors = {entry["index"]: entry.get("errmsg", "write error") for entry in details.get("writeErrors", [])}
+            counts["matched"] += details.get("nMatched", 0)
+            counts["upserted"] += details.get("nUpserted", 0)
+            counts["modified"] += details.get("nModified", 0)
+            logger.error("Bulk upsert batch had %d write error(s)", len(errors))
+        except PyMongoError as exc:
+            logger.exception("MongoDB error during bulk upsert of %d documents", len(batch))
+            errors = {op_index: str(exc) for op_index in range(len(batch))}
+
+        for op_index, (result_index, _) in enumerate(batch):
+            entry = results[result_index]
+            if op_index in errors:
+                entry["status"] = "failed"
+                entry["error"] = errors[op_index]
+            elif op_index in upserted_indexes:
+                entry["status"] = "created"
+            else:
+                entry["status"] = "updated"
+
+    def bulk_set_fields(self, updates: dict, batch_size: int = 500) -> dict:
+        """Set some fields of existing documents with unordered UpdateOne($set) batches.
+
+        `updates` is {job_id: {field: value}}; the other fields are left untouched and no
+        document is created. Returns {"matched", "modified", "failed"} summed over all batches.
+        """
+        operations = [UpdateOne({"job_id": job_id}, {"$set": fields}) for job_id, fields in updates.items()]
+        report = {"matched": 0, "modified": 0, "failed": 0}
+        for start in range(0, len(operations), batch_size):
+            batch = operations[start:start + batch_size]
+            try:
+                outcome = self.collection.bulk_write(batch, ordered=False)
+                report["matched"] += outcome.matched_count
+                report["modified"] += outcome.modified_count
+            except BulkWriteError as exc:
+                details = exc.details or {}
+                report["matched"] += details.get("nMatched", 0)
+                report["modified"] += details.get("nModified", 0)
+                report["failed"] += len(details.get("writeErrors", []))
+                logger.error("Bulk update batch had %d write error(s)", len(details.get("writeErrors", [])))
+            except PyMongoError:
+                logger.exception("MongoDB error during bulk update of %d documents", len(batch))
+                report["failed"] += len(batch)
+        return report
+
+    def delete_expired(self, today: Optional[date] = None, dry_run: bool = False) -> int:
+        """Delete, server-side, every document whose deadlineAt is before `today` (default: today).
+
+        deadlineAt is stored as an ISO string ("2025-11-20T23:59:59"), which compares
+        lexicographically: any value starting with a day before today sorts below
+        "YYYY-MM-DD" of today. Only values that start with an ISO date are considered,
+        and BSON dates are matched too. With dry_run the matching documents are only counted.
+
+        Returns the number of documents deleted (or that would be deleted).
+        """
+        today = today or date.today()
+        expiry_filter = {
+            "$or": [
+                {"deadlineAt": {"$lt": today.isoformat(), "$regex": r"^\d{4}-\d{2}-\d{2}"}},
+                {"deadlineAt": {"$lt": datetime(today.year, today.month, today.day)}},
+            ]
+        }
+
+        try:
+            if dry_run:
+                return self.collection.count_documents(expiry_filter)
+            return self.collection.delete_many(expiry_filter).deleted_count
+        except PyMongoError as exc:
+            logger.exception("MongoDB error while deleting expired documents")
+            raise RuntimeError(f"MongoDB error: {exc}") from exc
+
+    def delete_by_job_ids(self, job_ids: Iterable[str], batch_size: int = 1000) -> int:
+        """Delete every document whose job_id is in `job_ids`, with one delete_many per batch.
+
+        Returns the number of documents deleted.
+        """
+        job_ids = list(job_ids)
+        deleted = 0
+        try:
+            for start in range(0, len(job_ids), batch_size):
+                chunk = job_ids[start:start + batch_size]
+                deleted += self.collection.delete_many({"job_id": {"$in": chunk}}).deleted_count
+        except PyMongoError as exc:
+            logger.exception("MongoDB error while deleting %d job_ids", len(job_ids))
+            raise RuntimeError(f"MongoDB error: {exc}") from exc
+        return deleted
+
+    def find_by_job_ids(self, job_ids: Iterable[str], projection: Optional[dict] = None) -> dict:
+        """Return {job_id: document} for the documents whose job_id is in `job_ids`."""
+        try:
+            cursor = self.collection.find({"job_id": {"$in": list(job_ids)}}, projection)
+            return {doc["job_id"]: doc for doc in cursor}
+        except PyMongoError as exc:
+            logger.exception("MongoDB error while reading documents by job_id")
+            raise RuntimeError(f"MongoDB error: {exc}") from exc
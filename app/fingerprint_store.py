@@ -0,0 +1,109 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Iterable, Optional
+
+
+def make_fingerprint(payload) -> str:
+    """SHA-256 of the canonical JSON of `payload` (key order does not matter)."""
+    canonical = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class FingerprintStore:
+    """
+    Empreintes (SQLite) des éléments déjà chargés, pour ignorer ceux qui n'ont pas changé.
+
+    check() compare l'empreinte courante d'un élément (source, clé) à celle enregistrée
+    lors du dernier chargement réussi : identique, l'élément peut sauter l'enrichissement
+    et le chargement. Une empreinte nouvelle ou différente reste en attente jusqu'à
+    commit(), appelé avec les clés effectivement sauvegardées : un échec d'écriture
+    laisse l'élément à retraiter au prochain run.
+    Au-delà de `max_age_seconds` une empreinte est ignorée, ce qui force un
+    rafraîchissement périodique. Les compteurs skipped/changed sont tenus par source.
+    Thread-safe : une seule connexion protégée par un verrou.
+    """
+
+    def __init__(self, path, max_age_seconds: Optional[float] = None):
+        self.path = Path(path)
+        self.max_age_seconds = max_age_seconds
+        self.skipped = {}
+        self.changed = {}
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        with self._conn:
+            self._conn.execute(
+                """CREATE TABLE IF NOT EXISTS fingerprints (
+                    source TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    fingerprint TEXT NOT NULL,
+                    recorded_at REAL NOT NULL,
+                    PRIMARY KEY (source, key)
+                )"""
+            )
+
+    def check(self, source: str, key: str, fingerprint: str) -> bool:
+        """Return True if `key` was loaded with this fingerprint (skip it), else keep it pending for commit()."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT fingerprint, recorded_at FROM fingerprints WHERE source = ? AND key = ?", (source, key)
+            ).fetchone()
+            fresh = row is not None and (self.max_age_seconds is None or row[1] + self.max_age_seconds >= time.time())
+            if fresh and row[0] == fingerprint:
+                self.skipped[source] = self.skipped.get(source, 0) + 1
+                return True
+            self.changed[source] = self.changed.get(source, 0) + 1
+            self._pending[(source, key)] = fingerprint
+            return False
+
+    def recorded(self, source: str, key: str) -> Optional[str]:
+        """Return the fingerprint recorded for `key` by the last successful load (whatever its age), or None."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT fingerprint FROM fingerprints WHERE source = ? AND key = ?", (source, key)
+            ).fetchone()
+        return row[0] if row is not None else None
+
+    def commit(self, source: str, keys: Iterable[str]) -> int:
+        """Record the pending fingerprints of `keys` (items saved by this run). Returns the number recorded."""
+        now = time.time()
+        with self._lock:
+            rows = [
+                (source, key, self._pending.pop((source, key)), now)
+                for key in keys if (source, key) in self._pending
+            ]
+            if rows:
+                with self._conn:
+                    self._conn.executemany(
+                        "INSERT OR REPLACE INTO fingerprints (source, key, fingerprint, recorded_at) VALUES (?, ?, ?, ?)",
+                        rows
+                    )
+        return len(rows)
+
+    def forget(self, source: str, keys: Iterable[str]) -> int:
+        """Delete the recorded fingerprints of `keys`, so they are reprocessed next time. Returns the number deleted."""
+        keys = list(keys)
+        with self._lock:
+            for key in keys:
+                self._pending.pop((source, key), None)
+            with self._conn:
+                cursor = self._conn.executemany(
+                    "DELETE FROM fingerprints WHERE source = ? AND key = ?", [(source, key) for key in keys]
+                )
+        return cursor.rowcount
+
+    def stats(self) -> dict:
+        """Return {source: {"skipped": n, "changed": n}} for this process."""
+        sources = set(self.skipped) | set(self.changed)
+        return {
+            source: {"skipped": self.skipped.get(source, 0), "changed": self.changed.get(source, 0)}
+            for source in sorted(sources)
+        }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
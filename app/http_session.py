@@ -0,0 +1,236 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, List, Optional
+from urllib.parse import urlsplit
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Statuses worth retrying: throttling and transient server errors
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+def build_session(
+    pool_size: int = 10,
+    retries: int = 3,
+    backoff_factor: float = 0.5,
+    status_forcelist: Iterable[int] = RETRY_STATUSES,
+    allowed_methods: Iterable[str] = Retry.DEFAULT_ALLOWED_METHODS,
+    headers: Optional[dict] = None,
+) -> requests.Session:
+    """
+    Build a keep-alive requests.Session with a bounded connection pool and retry policy.
+
+    Retries use exponential backoff and honor the Retry-After header on 429/503.
+    By default only idempotent methods are retried (POST is not).
+
+    Args:
+        pool_size: Max pooled connections per host (match it to the caller's concurrency)
+        retries: Max retries per request
+        backoff_factor: Base delay for exponential backoff, in seconds
+        status_forcelist: HTTP statuses that trigger a retry
+        allowed_methods: HTTP methods that may be retried
+        headers: Default headers sent with every request
+    """
+    retry = Retry(
+        total=retries,
+        backoff_factor=backoff_factor,
+        status_forcelist=tuple(status_forcelist),
+        allowed_methods=frozenset(allowed_methods),
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    if headers:
+        session.headers.update(headers)
+    return session
+
+
+class RateLimiter:
+    """
+    Thread-safe token bucket, with one independent bucket per key (e.g. per host).
+
+    RateLimiter(5) allows 5 acquisitions per second per key; RateLimiter(500, per=60)
+    allows 500 per minute. A rate of 0 or None disables limiting.
+    """
+
+    def __init__(self, rate: Optional[float], per: float = 1.0, burst: Optional[float] = None):
+        self.rate = (rate / per) if rate else 0.0
+        self.capacity = burst if burst is not None else max(float(rate or 0), 1.0)
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def _try_acquire(self, key: str, cost: float) -> float:
+        """Consume `cost` tokens and return 0, or return the seconds to wait before trying again."""
+        # A request costlier than the whole bucket only waits for a full bucket
+        needed = min(cost, self.capacity)
+        with self._lock:
+            now = time.monotonic()
+            tokens, last = self._buckets.get(key, (self.capacity, now))
+            tokens = min(self.capacity, tokens + (now - last) * self.rate)
+            if tokens >= needed:
+                self._buckets[key] = (tokens - cost, now)
+                return 0.0
+            self._buckets[key] = (tokens, now)
+            return (needed - tokens) / self.rate
+
+    def acquire(self, key: str = "default", cost: float = 1.0):
+        """Block until `cost` tokens are available for `key`, then consume them."""
+        if not self.rate:
+            return
+        while True:
+            wait = self._try_acquire(key, cost)
+            if not wait:
+                return
+            time.sleep(wait)
+
+    async def acquire_async(self, key: str = "default", cost: float = 1.0):
+        """Like acquire, but waits with asyncio.sleep (same buckets as the blocking callers)."""
+        if not self.rate:
+            return
+        while True:
+            wait = self._try_acquire(key, cost)
+            if not wait:
+                return
+            await asyncio.sleep(wait)
+
+    def acquire_for_url(self, url: str, cost: float = 1.0):
+        """Acquire from the bucket of the URL's host."""
+        self.acquire(urlsplit(url).netloc, cost)
+
+    async def acquire_for_url_async(self, url: str, cost: float = 1.0):
+        await self.acquire_async(urlsplit(url).netloc, cost)
+
+
+def fetch_concurrently(
+    session: requests.Session,
+    urls: List[str],
+    max_in_flight: int = 8,
+    rate_limiter: Optional[RateLimiter] = None,
+    timeout: float = 30,
+) -> list:
+    """
+    GET every URL over a shared session with at most `max_in_flight` requests at once.
+
+    Returns a list aligned with `urls`: each entry is the requests.Response, or the
+    exception raised for that URL (the other requests are not affected).
+    """
+    def fetch_one(url):
+        try:
+            if rate_limiter:
+                rate_limiter.acquire_for_url(url)
+            return session.get(url, timeout=timeout)
+        except requests.RequestException as e:
+            return e
+
+    if not urls:
+        return []
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_in_flight, len(urls)))) as executor:
+        return list(executor.map(fetch_one, urls))
+
+
+###############################################################################
+# asyncio variant (--mode async)
+###############################################################################
+
+# Methods retried by request_async without an explicit retry_methods (urllib3's default set)
+IDEMPOTENT_METHODS = frozenset(Retry.DEFAULT_ALLOWED_METHODS)
+
+
+def build_async_client(
+    max_connections: int = 100,
+    timeout: float = 30,
+    headers: Optional[dict] = None,
+) -> httpx.AsyncClient:
+    """
+    Build a keep-alive httpx.AsyncClient with a bounded connection pool.
+
+    One client serves every coroutine of an event loop: up to `max_connections`
+    requests are in flight at once, the others wait for a free connection.
+    Retries are not done by the client but by request_async.
+    """
+    return httpx.AsyncClient(
+        limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+        timeout=timeout,
+        headers=headers,
+    )
+
+
+def _retry_after_delay(response: httpx.Response, attempt: int, backoff_factor: float) -> float:
+    """Retry-After (seconds) when the server sent one, else exponential backoff like urllib3."""
+    retry_after = response.headers.get("Retry-After")
+    if retry_after:
+        try:
+            return max(0.0, float(retry_after))
+        except ValueError:
+            pass
+    return backoff_factor * (2 ** attempt)
+
+
+async def request_async(
+    client: httpx.AsyncClient,
+    method: str,
+    url: str,
+    retries: int = 3,
+    backoff_factor: float = 0.5,
+    status_forcelist: Iterable[int] = RETRY_STATUSES,
+    retry_methods: Iterable[str] = IDEMPOTENT_METHODS,
+    rate_limiter: Optional[RateLimiter] = None,
+    **kwargs,
+) -> httpx.Response:
+    """
+    Send one request on `client` with the retry policy of build_session.
+
+    Statuses in status_forcelist and transport errors are retried with exponential
+    backoff (Retry-After honored) for methods in retry_methods only; the last
+    response is returned, and the last transport error is raised (httpx.HTTPError).
+    """
+    retry_methods = {m.upper() for m in retry_methods}
+    attempt = 0
+    while True:
+        if rate_limiter:
+            await rate_limiter.acquire_for_url_async(url)
+        retryable = method.upper() in retry_methods and attempt < retries
+        try:
+            response = await client.request(method, url, **kwargs)
+        except httpx.TransportError:
+            if not retryable:
+                raise
+            await asyncio.sleep(backoff_factor * (2 ** attempt))
+            attempt += 1
+            continue
+        if response.status_code not in status_forcelist or not retryable:
+            return response
+        await asyncio.sleep(_retry_after_delay(response, attempt, backoff_factor))
+        attempt += 1
+
+
+async def fetch_concurrently_async(
+    client: httpx.AsyncClient,
+    urls: List[str],
+    max_in_flight: int = 8,
+    rate_limiter: Optional[RateLimiter] = None,
+) -> list:
+    """
+    Async counterpart of fetch_concurrently: GET every URL with at most `max_in_flight`
+    requests at once. Returns the httpx.Response or exception of each URL, in order.
+    """
+    semaphore = asyncio.Semaphore(max(1, max_in_flight))
+
+    async def fetch_one(url):
+        async with semaphore:
+            try:
+                return await request_async(client, "GET", url, rate_limiter=rate_limiter)
+            except httpx.HTTPError as e:
+                return e
+
+    return list(await asyncio.gather(*(fetch_one(url) for url in urls)))
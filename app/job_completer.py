@@ -1,15 +1,191 @@
+import asyncio
 import json
+import os
+import random
 import re 
-from openai import OpenAI
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Iterable, List, Optional
+
+import openai
+from openai import AsyncOpenAI, OpenAI
+
+from app.http_session import RateLimiter, build_session
+from app.llm_cache import LLMResultCache, normalize_text
+from app.prompt_budget import TokenCounter, prepare_text
+
+# À incrémenter à chaque modification du prompt correspondant
+# (invalide les résultats mis en cache avec l'ancien prompt)
+HTML_PROMPT_VERSION = "1"
+SKILLS_PROMPT_VERSION = "1"
+ANALYSIS_PROMPT_VERSION = "1"
+
+DEFAULT_OPENAI_BASE_URL = "https://api.openai.com/v1"
+
+# Statuts terminaux d'un batch OpenAI
+BATCH_TERMINAL_STATUSES = ("completed", "failed", "expired", "cancelled")
+
 
 class JobDescriptionEnhancer:
     """
     Classe pour enrichir et traduire un JSON d'offre d'emploi
     à l'aide de l'API ChatGPT (GPT-4).
+
+    analyze_job regroupe en un seul appel l'extraction des compétences/langues, le
+    RFP_type et le HTML enrichi ; extract_skills_and_languages et
+    enhance_job_description_html restent disponibles pour les usages isolés.
+
+    Si un LLMResultCache est fourni, les résultats de enhance_job_description_html
+    (namespace "enhance_html"), de extract_skills_and_languages (namespace "skills")
+    et de analyze_job (namespace "analysis") sont mis en cache par hash
+    (version du prompt, modèle, texte normalisé).
+
+    Tous les appels passent par _chat_json, qui applique les limites requêtes/minute
+    et tokens/minute (partagées entre threads) et réessaie les 429/5xx avec un
+    backoff exponentiel à jitter. L'instance peut donc être utilisée depuis
+    plusieurs threads (voir EnrichmentStage).
+
+    Les textes envoyés sont d'abord réduits par prepare_description (HTML retiré, espaces
+    et lignes répétées supprimés, troncature à `max_input_tokens` tokens) ; les tokens
+    réellement consommés (usage renvoyé par l'API) sont cumulés dans `usage`.
+
+    analyze_job_async est la variante asyncio (AsyncOpenAI) de analyze_job, pour le mode
+    --mode async ; aclose() ferme son client avant la fin de la boucle asyncio.
     """
-    def __init__(self, api_key: str, model: str = "gpt-4o"):
-        self.client = OpenAI(api_key=api_key)
+    def __init__(self, api_key: str, model: str = "gpt-4o", cache: LLMResultCache = None,
+                 requests_per_minute: int = None, tokens_per_minute: int = None,
+                 max_retries: int = 5, expected_output_tokens: int = 1000, base_url: str = None,
+                 max_input_tokens: int = 3000):
+        # Les retries sont gérés ici (avec jitter), pas par le client OpenAI
+        self.client = OpenAI(api_key=api_key, base_url=base_url, max_retries=0)
+        # Client AsyncOpenAI des méthodes *_async, créé dans la boucle asyncio qui l'utilise
+        self._async_client = None
+        # Conservés pour BatchAnalysisJob (base_url remplaçable par un stub local)
+        self.api_key = api_key
+        self.base_url = (base_url or DEFAULT_OPENAI_BASE_URL).rstrip("/")
         self.model = model
+        self.cache = cache
+        self.max_retries = max_retries
+        self.expected_output_tokens = expected_output_tokens
+        self.request_limiter = RateLimiter(requests_per_minute, per=60)
+        self.token_limiter = RateLimiter(tokens_per_minute, per=60)
+        self.max_input_tokens = max_input_tokens
+        self.token_counter = TokenCounter(model)
+        self.usage = {"calls": 0, "prompt_tokens": 0, "completion_tokens": 0}
+        self._usage_lock = threading.Lock()
+
+    def _estimate_tokens(self, prompt: str) -> int:
+        """Coût estimé d'un appel (tokens du prompt + sortie attendue), pour le limiteur tokens/minute."""
+        return self.token_counter.count(prompt) + self.expected_output_tokens
+
+    def prepare_description(self, text: str, max_tokens: int = None) -> str:
+        """Texte réduit à envoyer au modèle (voir app.prompt_budget.prepare_text)."""
+        return prepare_text(text, self.token_counter, max_tokens or self.max_input_tokens)
+
+    def _record_usage(self, response):
+        """Cumule les tokens consommés par un appel (champ usage de la réponse)."""
+        usage = getattr(response, "usage", None)
+        prompt_tokens = getattr(usage, "prompt_tokens", 0) or 0
+        completion_tokens = getattr(usage, "completion_tokens", 0) or 0
+        with self._usage_lock:
+            self.usage["calls"] += 1
+            self.usage["prompt_tokens"] += prompt_tokens
+            self.usage["completion_tokens"] += completion_tokens
+        print(f"[USAGE] {self.model}: {prompt_tokens} prompt tokens, {completion_tokens} completion tokens")
+
+    def _chat_json(self, prompt: str) -> dict:
+        """
+        Envoie le prompt et retourne la réponse JSON parsée.
+
+        Attend le quota requêtes/tokens par minute avant chaque tentative, et réessaie
+        les erreurs 429/5xx/timeouts (Retry-After si fourni, sinon backoff exponentiel
+        à jitter complet). Lève la dernière exception une fois les retries épuisés, et
+        immédiatement un 429 insufficient_quota (quota épuisé : réessayer ne sert à rien).
+        """
+        attempt = 0
+        while True:
+            self.request_limiter.acquire(self.model)
+            self.token_limiter.acquire(self.model, cost=self._estimate_tokens(prompt))
+            try:
+                response = self.client.chat.completions.create(
+                    model=self.model,
+                    messages=[{"role": "user", "content": prompt}],
+                    response_format={"type": "json_object"}
+                )
+                self._record_usage(response)
+                return json.loads(response.choices[0].message.content)
+            except (openai.RateLimitError, openai.InternalServerError, openai.APIConnectionError) as e:
+                if self._is_quota_exhausted(e):
+                    print("[ERROR] OpenAI quota exhausted (insufficient_quota), not retrying")
+                    raise
+                attempt += 1
+                if attempt > self.max_retries:
+                    raise
+                delay = self._retry_delay(e, attempt)
+                print(f"[RETRY] OpenAI {type(e).__name__}, retry {attempt}/{self.max_retries} in {delay:.1f}s")
+                time.sleep(delay)
+
+    @staticmethod
+    def _is_quota_exhausted(error: Exception) -> bool:
+        """True pour un 429 insufficient_quota (crédit épuisé), qui ne se résout pas en réessayant."""
+        code = getattr(error, "code", None)
+        body = getattr(error, "body", None)
+        if code is None and isinstance(body, dict):
+            code = body.get("code") or (body.get("error") or {}).get("code")
+        return code == "insufficient_quota"
+
+    @staticmethod
+    def _retry_delay(error: Exception, attempt: int) -> float:
+        """Retry-After de la réponse si fourni, sinon backoff exponentiel à jitter complet."""
+        headers = getattr(getattr(error, "response", None), "headers", None) or {}
+        if headers.get("retry-after"):
+            try:
+                return float(headers["retry-after"])
+            except ValueError:
+                pass
+        return random.uniform(0, min(60.0, 2.0 ** attempt))
+
+    @property
+    def async_client(self) -> AsyncOpenAI:
+        if self._async_client is None:
+            self._async_client = AsyncOpenAI(api_key=self.api_key, base_url=self.base_url, max_retries=0)
+        return self._async_client
+
+    async def aclose(self):
+        """Ferme le client AsyncOpenAI (à appeler avant la fin de la boucle asyncio qui l'a utilisé)."""
+        if self._async_client is not None:
+            await self._async_client.close()
+            self._async_client = None
+
+    async def _chat_json_async(self, prompt: str) -> dict:
+        """
+        Version asyncio de _chat_json (AsyncOpenAI) : mêmes limites requêtes/tokens par
+        minute, partagées avec les appels synchrones, et même politique de retry.
+        """
+        attempt = 0
+        while True:
+            await self.request_limiter.acquire_async(self.model)
+            await self.token_limiter.acquire_async(self.model, cost=self._estimate_tokens(prompt))
+            try:
+                response = await self.async_client.chat.completions.create(
+                    model=self.model,
+                    messages=[{"role": "user", "content": prompt}],
+                    response_format={"type": "json_object"}
+                )
+                self._record_usage(response)
+                return json.loads(response.choices[0].message.content)
+            except (openai.RateLimitError, openai.InternalServerError, openai.APIConnectionError) as e:
+                if self._is_quota_exhausted(e):
+                    print("[ERROR] OpenAI quota exhausted (insufficient_quota), not retrying")
+                    raise
+                attempt += 1
+                if attempt > self.max_retries:
+                    raise
+                delay = self._retry_delay(e, attempt)
+                print(f"[RETRY] OpenAI {type(e).__name__}, retry {attempt}/{self.max_retries} in {delay:.1f}s")
+                await asyncio.sleep(delay)
 
     def extract_skills_and_languages(self, criteria: str, description: str = "") -> dict:
         """
@@ -24,8 +200,16 @@ class JobDescriptionEnhancer:
                 - skills: Liste des compétences techniques extraites
                 - languages: Liste des langues extraites
         """
-        combined_text = f"{criteria}\n{description}".strip()
+        cache_key = None
+        if self.cache is not None:
+            cache_key = self._skills_cache_key(criteria, description)
+            cached = self.cache.get("skills", cache_key)
+            if cached is not None:
+                print("[CACHE] Skills and languages served from cache")
+                return cached
         
+        combined_text = self.prepare_description(f"{criteria}\n{description}".strip())
+
         prompt = f"""Tu es un expert en extraction d'informations pour des missions IT.
 
 À partir du texte ci-dessous, tu dois extraire :
@@ -55,16 +239,14 @@ TEXTE À ANALYSER :
 """
         
         try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[{"role": "user", "content": prompt}],
-                response_format={"type": "json_object"}
-            )
-            result = json.loads(response.choices[0].message.content)
-            return {
+            result = self._chat_json(prompt)
+            extracted = {
                 "skills": result.get("skills", []),
                 "languages": result.get("languages", [])
             }
+            if cache_key is not None:
+                self.cache.set("skills", cache_key, extracted)
+            return extracted
         except Exception as e:
             print(f"[ERROR] Error extracting skills and languages: {e}")
             return {
@@ -72,6 +254,27 @@ TEXTE À ANALYSER :
                 "languages": []
             }
 
+    def _skills_cache_key(self, criteria: str, description: str = "") -> str:
+        combined_text = f"{criteria}\n{description}".strip()
+        return LLMResultCache.make_key(SKILLS_PROMPT_VERSION, self.model, normalize_text(combined_text))
+
+    def prime_skills_cache(self, criteria: str, description: str, skills: list, languages: list) -> bool:
+        """
+        Enregistre dans le cache un résultat connu de extract_skills_and_languages
+        (ex: compétences déjà stockées dans MongoDB), sans appel à l'API.
+
+        Returns:
+            True si le cache est actif et l'entrée a été écrite
+        """
+        if self.cache is None:
+            return False
+        self.cache.set(
+            "skills",
+            self._skills_cache_key(criteria, description),
+            {"skills": list(skills), "languages": list(languages)}
+        )
+        return True
+
     def enhance_job_description_html(self, job_description: str) -> dict:
         """
         Enrichit une job description brute et retourne un HTML structuré + RFP_type.
@@ -84,6 +287,14 @@ TEXTE À ANALYSER :
                 - RFP_type: Catégorie du RFP
                 - enhanced_job_description_html: HTML structuré et enrichi
         """
+        cache_key = None
+        if self.cache is not None:
+            cache_key = LLMResultCache.make_key(HTML_PROMPT_VERSION, self.model, normalize_text(job_description))
+            cached = self.cache.get("enhance_html", cache_key)
+            if cached is not None:
+                print("[CACHE] Job description enhancement served from cache")
+                return cached
+
         prompt = f"""Tu es un expert RH spécialisé dans la rédaction d'offres de mission pour freelances IT.
 
 À partir de la job_description ci-dessous, tu dois produire une version :
@@ -172,16 +383,13 @@ Le HTML doit être safe, bien indenté, sans script, sans style inline.
 
 Voici la job_description brute dont tu dois t'inspirer :
 
-{job_description}
+{self.prepare_description(job_description)}
 """
         
         try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[{"role": "user", "content": prompt}],
-                response_format={"type": "json_object"}
-            )
-            result = json.loads(response.choices[0].message.content)
+            result = self._chat_json(prompt)
+            if cache_key is not None:
+                self.cache.set("enhance_html", cache_key, result)
             return result
         except Exception as e:
             print(f"[ERROR] Error while enhancing job description: {e}")
@@ -190,35 +398,494 @@ Voici la job_description brute dont tu dois t'inspirer :
                 "job_description": f"<section><p>{job_description}</p></section>"
             }
 
+    def analyze_job(self, job_description: str, criteria: str = "") -> dict:
+        """
+        Analyse complète d'une mission en un seul appel ChatGPT : compétences, langues,
+        RFP_type et job description enrichie en HTML.
+
+        Remplace la paire extract_skills_and_languages + enhance_job_description_html
+        (même texte envoyé deux fois) : une seule requête et un seul parsing de réponse.
+
+        Args:
+            job_description: La description de poste brute
+            criteria: Le texte des critères de la mission (optionnel, ex: Boond)
+
+        Returns:
+            dict avec:
+                - skills: Liste des compétences techniques extraites
+                - languages: Liste des langues extraites
+                - RFP_type: Catégorie du RFP
+                - job_description: HTML structuré et enrichi
+        """
+        cache_key = None
+        if self.cache is not None:
+            cache_key = self._analysis_cache_key(job_description, criteria)
+            cached = self.cache.get("analysis", cache_key)
+            if cached is not None:
+                print("[CACHE] Job analysis served from cache")
+                return cached
+
+        prompt = self.build_analysis_prompt(job_description, criteria)
+
+        try:
+            analysis = self.parse_analysis(self._chat_json(prompt), job_description)
+            if cache_key is not None:
+                self.cache.set("analysis", cache_key, analysis)
+            return analysis
+        except Exception as e:
+            print(f"[ERROR] Error while analyzing job: {e}")
+            return self._fallback_analysis(job_description)
+
+    async def analyze_job_async(self, job_description: str, criteria: str = "") -> dict:
+        """Version asyncio de analyze_job (même cache "analysis", même format de retour)."""
+        cache_key = None
+        if self.cache is not None:
+            cache_key = self._analysis_cache_key(job_description, criteria)
+            cached = self.cache.get("analysis", cache_key)
+            if cached is not None:
+                print("[CACHE] Job analysis served from cache")
+                return cached
+
+        prompt = self.build_analysis_prompt(job_description, criteria)
+
+        try:
+            analysis = self.parse_analysis(await self._chat_json_async(prompt), job_description)
+            if cache_key is not None:
+                self.cache.set("analysis", cache_key, analysis)
+            return analysis
+        except Exception as e:
+            print(f"[ERROR] Error while analyzing job: {e}")
+            return self._fallback_analysis(job_description)
+
+    @staticmethod
+    def _fallback_analysis(job_description: str) -> dict:
+        """Résultat par défaut quand l'appel ChatGPT échoue (marqué "fallback", jamais mis en cache)."""
+        return {
+            "skills": [],
+            "languages": [],
+            "RFP_type": "Autre",
+            "job_description": f"<section><p>{job_description}</p></section>",
+            "fallback": True
+        }
+
+    def build_analysis_prompt(self, job_description: str, criteria: str = "") -> str:
+        """Construit le prompt de analyze_job (réutilisé tel quel par BatchAnalysisJob)."""
+        criteria = self.prepare_description(criteria, max(1, self.max_input_tokens // 4))
+        job_description = self.prepare_description(job_description)
+        criteria_block = f"""
+Critères de la mission :
+
+{criteria}
+""" if criteria else ""
+
+        prompt = f"""Tu es un expert RH spécialisé dans les missions pour freelances IT.
+
+À partir de la mission ci-dessous, tu dois produire en une seule réponse :
+1. **skills** : les compétences techniques requises
+2. **languages** : les langues requises
+3. **RFP_type** : la catégorie de la mission
+4. **job_description** : une version améliorée, enrichie et structurée de la description, en HTML propre
+   compatible avec un front React. Le nom du client ne doit apparaitre d'aucune façon.
+
+---
+
+## 🎯 1. skills
+
+- Compétences techniques, technologies, frameworks, outils mentionnés
+- Sois précis (ex: "Python", "React", "AWS", "Docker", "Kubernetes")
+- Ne mets que les compétences techniques, pas les soft skills
+- Maximum 20 compétences les plus pertinentes
+- Format: liste de mots-clés courts
+
+## 🎯 2. languages
+
+- Format: ["Français", "Anglais", "Néerlandais", etc.]
+- Uniquement les langues explicitement mentionnées
+
+## 🎯 3. RFP_type
+
+Déduis la catégorie la plus pertinente parmi :
+
+- Go-To-Market, Sales B2B  
+- Data, AI, BI  
+- Integration, API, Architecture
+- Cybersecurity  
+- Cloud, Infrastructure  
+- Software Engineering  
+- PMO, Project Management  
+- Business Analysis  
+- Support & Operations  
+- Autre
+
+Retourne **uniquement** celle qui correspond le mieux.
+
+## 🎯 4. job_description (HTML)
+
+Le texte doit suivre cette structure HTML :
+
+<section>
+  <h2>Contexte de la mission</h2>
+  <p>…</p>
+</section>
+
+<section>
+  <h2>Responsabilités principales</h2>
+  <ul>
+    <li>…</li>
+  </ul>
+</section>
+
+<section>
+  <h2>Profil recherché</h2>
+  <ul>
+    <li>…</li>
+  </ul>
+</section>
+
+<section>
+  <h2>Compétences techniques</h2>
+  <ul>
+    <li>…</li>
+  </ul>
+</section>
+
+<section>
+  <h2>Soft Skills</h2>
+  <ul>
+    <li>…</li>
+  </ul>
+</section>
+
+Tu peux adapter les sections uniquement si absolument nécessaire, mais garde cette structure dès que possible.
+Le HTML doit être safe, bien indenté, sans script, sans style inline.
+
+---
+
+## 🎯 FORMAT DE SORTIE
+
+Réponds **uniquement** sous ce format JSON :
+
+{{
+  "skills": ["skill1", "skill2", ...],
+  "languages": ["Français", "Anglais", ...],
+  "RFP_type": "<catégorie>",
+  "job_description": "<section>…</section>"
+}}
+
+---
+
+## 🎯 CONTENU ENTRANT
+{criteria_block}
+Description de la mission :
+
+{job_description}
+"""
+        return prompt
+
+    @staticmethod
+    def parse_analysis(result: dict, job_description: str = "") -> dict:
+        """Normalise la réponse JSON du prompt d'analyse (clés manquantes -> valeurs par défaut)."""
+        return {
+            "skills": result.get("skills", []),
+            "languages": result.get("languages", []),
+            "RFP_type": result.get("RFP_type") or "Autre",
+            "job_description": result.get("job_description") or f"<section><p>{job_description}</p></section>"
+        }
+
+    def _analysis_cache_key(self, job_description: str, criteria: str = "") -> str:
+        return LLMResultCache.make_key(
+            ANALYSIS_PROMPT_VERSION, self.model, normalize_text(criteria), normalize_text(job_description)
+        )
+
+    def prime_analysis_cache(self, job_description: str, criteria: str, analysis: dict) -> bool:
+        """
+        Enregistre dans le cache un résultat connu de analyze_job (ex: document déjà
+        stocké dans MongoDB), sans appel à l'API.
+
+        Returns:
+            True si le cache est actif et l'entrée a été écrite
+        """
+        if self.cache is None:
+            return False
+        self.cache.set("analysis", self._analysis_cache_key(job_description, criteria), {
+            "skills": list(analysis.get("skills", [])),
+            "languages": list(analysis.get("languages", [])),
+            "RFP_type": analysis.get("RFP_type") or "Autre",
+            "job_description": analysis.get("job_description", "")
+        })
+        return True
+
     def complete_and_translate(self, job_json: dict) -> dict:
         """
         Complète les champs manquants du JSON et traduit en anglais.
         Retourne un dictionnaire mis à jour.
         """
 
-        job_desc = job_json.get("description", "")
-        prompt = f"""
-                        You are an HR data assistant.
-                        Given this job description, fill in or improve missing fields 
-                        in the following job JSON (skills, languages, region, etc.) 
-                        and then translate all text fields into English.
-                        Return a valid JSON object only.
-                        summarize skills if needed, if a skill is a sentence, convert it to keywords.
-                        
-                        Job description:
-                        {job_desc}
-
-                        Current job JSON:
-                        {json.dumps(job_json, indent=2, ensure_ascii=False)}
+        # La description n'est envoyée qu'une fois (dans le JSON), réduite, et le JSON est compact
+        compact_job = dict(job_json)
+        if compact_job.get("description"):
+            compact_job["description"] = self.prepare_description(compact_job["description"])
+        prompt = f"""You are an HR data assistant.
+Given this job JSON (the job description is its "description" field), fill in or improve missing fields
+(skills, languages, region, etc.) and then translate all text fields into English.
+Return a valid JSON object only.
+summarize skills if needed, if a skill is a sentence, convert it to keywords.
+
+Current job JSON:
+{json.dumps(compact_job, separators=(",", ":"), ensure_ascii=False, default=str)}
 """
         try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[{"role": "user", "content": prompt}],
-                response_format={"type": "json_object"}  
-            )
-            completed_json = json.loads(response.choices[0].message.content)
+            completed_json = self._chat_json(prompt)
             return completed_json
         except Exception as e:
             print(f"⚠️ Error while completing job JSON: {e}")
             return job_json
+
+
+class EnrichmentStage:
+    """
+    Étape d'enrichissement ChatGPT parallélisée.
+
+    Applique une fonction d'enrichissement (qui appelle JobDescriptionEnhancer) à une
+    liste d'éléments avec au plus `max_concurrency` appels simultanés, et retourne les
+    résultats dans l'ordre d'entrée. Les limites de débit et les retries sont portés
+    par le JobDescriptionEnhancer partagé.
+    """
+
+    def __init__(self, max_concurrency: int = 4):
+        self.max_concurrency = max(1, max_concurrency)
+
+    def map(self, enrich_fn: Callable, items: List) -> List:
+        """
+        Retourne [enrich_fn(item) for item in items], calculé en parallèle.
+        Si enrich_fn lève une exception, l'élément d'origine est conservé tel quel.
+        """
+        def safe_enrich(item):
+            try:
+                return enrich_fn(item)
+            except Exception as e:
+                print(f"[ERROR] Enrichment failed, keeping item unchanged: {e}")
+                return item
+
+        if not items:
+            return []
+        if self.max_concurrency == 1 or len(items) == 1:
+            return [safe_enrich(item) for item in items]
+
+        with ThreadPoolExecutor(max_workers=min(self.max_concurrency, len(items))) as executor:
+            return list(executor.map(safe_enrich, items))
+
+
+class BatchAnalysisJob:
+    """
+    Ré-analyse hors ligne via l'API Batch d'OpenAI (moitié prix, sans bloquer l'ETL horaire).
+
+    Écrit un JSONL de requêtes analyze_job (custom_id = rang de la requête), l'envoie
+    (/files puis /batches), attend la fin du batch et relit les résultats, indexés par
+    job_id d'origine (chaîne ou nombre, tel que stocké dans MongoDB).
+    L'état (batch_id, fichiers, custom_id -> job_id) est persisté dans `state_path` après
+    chaque étape : relancer le job reprend le batch en cours au lieu d'en soumettre un
+    nouveau. Les endpoints sont appelés en REST sur `enhancer.base_url`, qu'on peut
+    faire pointer vers un stub local pour tester sans réseau.
+
+    Les résultats ne sont pas mis en cache : le texte analysé est le job_desc stocké
+    (déjà enrichi), alors que le cache "analysis" de l'ETL est indexé sur le texte source.
+    """
+
+    def __init__(self, enhancer: JobDescriptionEnhancer, state_path, poll_interval: float = 60,
+                 timeout: float = 60):
+        self.enhancer = enhancer
+        self.state_path = Path(state_path)
+        self.input_path = self.state_path.with_suffix(".jsonl")
+        self.poll_interval = poll_interval
+        self.timeout = timeout
+        self.session = build_session(headers={"Authorization": f"Bearer {enhancer.api_key}"})
+        self.state = self._load_state()
+
+    # ------------------------------------------------------------------ state
+
+    def _load_state(self) -> dict:
+        try:
+            if self.state_path.exists():
+                with open(self.state_path, "r", encoding="utf-8") as f:
+                    return json.load(f)
+        except Exception as e:
+            print(f"[WARN] Error reading batch state {self.state_path}: {e}")
+        return {}
+
+    def _save_state(self):
+        tmp_file = self.state_path.with_suffix(".tmp")
+        with open(tmp_file, "w", encoding="utf-8") as f:
+            json.dump(self.state, f, indent=2)
+        os.replace(tmp_file, self.state_path)
+
+    def clear(self):
+        """Oublie le batch courant (état et JSONL d'entrée) une fois ses résultats appliqués."""
+        self.state = {}
+        for path in (self.state_path, self.input_path):
+            if path.exists():
+                path.unlink()
+
+    @property
+    def pending(self) -> bool:
+        """True si un batch a été soumis et que ses résultats n'ont pas encore été appliqués."""
+        return bool(self.state.get("batch_id"))
+
+    # ------------------------------------------------------------------ submit
+
+    def write_requests(self, documents: Iterable[dict]) -> int:
+        """
+        Écrit le JSONL du batch, une requête /v1/chat/completions par document
+        {"job_id", "job_desc", "criteria" (optionnel)}. Retourne le nombre de requêtes.
+        """
+        requests_by_id = {}
+        seen = set()
+        count = 0
+        tmp_file = self.input_path.with_suffix(".jsonl.tmp")
+        with open(tmp_file, "w", encoding="utf-8") as f:
+            for document in documents:
+                job_id = document.get("job_id")
+                job_desc = document.get("job_desc", "")
+                criteria = document.get("criteria", "")
+                if not job_id or not job_desc or (type(job_id).__name__, job_id) in seen:
+                    continue
+                seen.add((type(job_id).__name__, job_id))
+                custom_id = str(count)
+                request = {
+                    "custom_id": custom_id,
+                    "method": "POST",
+                    "url": "/v1/chat/completions",
+                    "body": {
+                        "model": self.enhancer.model,
+                        "messages": [{"role": "user", "content": self.enhancer.build_analysis_prompt(job_desc, criteria)}],
+                        "response_format": {"type": "json_object"}
+                    }
+                }
+                f.write(json.dumps(request, ensure_ascii=False) + "\n")
+                # custom_id is a string: keep the original job_id to query MongoDB with its own type
+                requests_by_id[custom_id] = job_id
+                count += 1
+        os.replace(tmp_file, self.input_path)
+        self.state = {"requests": requests_by_id}
+        return count
+
+    def submit(self, documents: Iterable[dict]) -> Optional[str]:
+        """
+        Soumet un batch d'analyses pour `documents`, ou reprend le batch déjà en cours.
+        Retourne le batch_id (None s'il n'y a rien à analyser).
+        """
+        if self.pending:
+            print(f"[BATCH] Resuming batch {self.state['batch_id']} (status: {self.state.get('status')})")
+            return self.state["batch_id"]
+
+        count = self.write_requests(documents)
+        if not count:
+            print("[BATCH] Nothing to analyze")
+            self.clear()
+            return None
+
+        with open(self.input_path, "rb") as f:
+            response = self.session.post(
+                f"{self.enhancer.base_url}/files",
+                data={"purpose": "batch"},
+                files={"file": (self.input_path.name, f, "application/jsonl")},
+                timeout=self.timeout
+            )
+        response.raise_for_status()
+        self.state["input_file_id"] = response.json()["id"]
+        self._save_state()
+
+        response = self.session.post(
+            f"{self.enhancer.base_url}/batches",
+            json={
+                "input_file_id": self.state["input_file_id"],
+                "endpoint": "/v1/chat/completions",
+                "completion_window": "24h"
+            },
+            timeout=self.timeout
+        )
+        response.raise_for_status()
+        batch = response.json()
+        self.state["batch_id"] = batch["id"]
+        self.state["status"] = batch.get("status")
+        self._save_state()
+
+        print(f"[BATCH] Submitted batch {batch['id']} with {count} requests")
+        return batch["id"]
+
+    # ------------------------------------------------------------------ poll
+
+    def poll(self, wait: bool = True) -> str:
+        """
+        Rafraîchit le statut du batch courant ; avec wait, boucle jusqu'à un statut terminal.
+        Retourne le dernier statut connu.
+        """
+        if not self.pending:
+            raise RuntimeError("No batch submitted")
+
+        while True:
+            response = self.session.get(f"{self.enhancer.base_url}/batches/{self.state['batch_id']}", timeout=self.timeout)
+            response.raise_for_status()
+            batch = response.json()
+            self.state["status"] = batch.get("status")
+            self.state["output_file_id"] = batch.get("output_file_id")
+            self.state["error_file_id"] = batch.get("error_file_id")
+            self._save_state()
+
+            counts = batch.get("request_counts") or {}
+            print(f"[BATCH] Batch {self.state['batch_id']}: {self.state['status']} "
+                  f"({counts.get('completed', 0)}/{counts.get('total', 0)} done, {counts.get('failed', 0)} failed)")
+
+            if not wait or self.state["status"] in BATCH_TERMINAL_STATUSES:
+                return self.state["status"]
+            time.sleep(self.poll_interval)
+
+    # ------------------------------------------------------------------ results
+
+    def results(self) -> dict:
+        """
+        Télécharge la sortie d'un batch terminé et retourne {job_id d'origine: analyse}.
+        Les requêtes en erreur et les lignes illisibles sont absentes du résultat (et
+        comptées dans le log). Les textes envoyés ne sont pas conservés dans l'état : seul
+        RFP_type est à appliquer, job_description n'a pas de texte de repli.
+        """
+        if not self.state.get("output_file_id"):
+            print(f"[BATCH] No output for batch {self.state.get('batch_id')} (status: {self.state.get('status')})")
+            return {}
+
+        response = self.session.get(
+            f"{self.enhancer.base_url}/files/{self.state['output_file_id']}/content", timeout=self.timeout
+        )
+        response.raise_for_status()
+
+        requests_by_id = self.state.get("requests", {})
+        analyses = {}
+        failed = 0
+        for line in response.text.splitlines():
+            if not line.strip():
+                continue
+            try:
+                entry = json.loads(line)
+                custom_id = entry.get("custom_id")
+                if custom_id is None:
+                    raise ValueError("missing custom_id")
+                body = (entry.get("response") or {}).get("body") or {}
+                if entry.get("error") or (entry.get("response") or {}).get("status_code", 200) != 200:
+                    raise ValueError(entry.get("error") or body.get("error"))
+                content = json.loads(body["choices"][0]["message"]["content"])
+            except Exception as e:
+                failed += 1
+                print(f"[WARN] Batch result unusable for {line[:80]}: {e}")
+                continue
+
+            analyses[requests_by_id.get(custom_id, custom_id)] = self.enhancer.parse_analysis(content)
+
+        print(f"[BATCH] {len(analyses)} analyses retrieved, {failed} failed")
+        return analyses
+
+    def run(self, documents: Iterable[dict]) -> dict:
+        """submit + poll(wait=True) + results : retourne {job_id: analyse}."""
+        if self.submit(documents) is None:
+            return {}
+        self.poll(wait=True)
+        return self.results()
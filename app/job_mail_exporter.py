@@ -1,11 +1,46 @@
 import os
-import requests
-from msal import ConfidentialClientApplication
+import json
+import asyncio
+import time
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import httpx
+from msal import ConfidentialClientApplication, SerializableTokenCache
+from urllib3.util.retry import Retry
 import base64
 from datetime import datetime, timezone
 
+from app.http_session import RETRY_STATUSES, build_async_client, build_session, request_async
+
+GRAPH_URL = "https://graph.microsoft.com/v1.0"
+
+# Graph accepts at most 20 sub-requests per JSON $batch
+GRAPH_BATCH_MAX_REQUESTS = 20
+
+# Graph allows 4 concurrent requests per mailbox, and every sub-request of a $batch counts
+GRAPH_MAILBOX_CONCURRENCY = 4
+
+# Renew the Graph token this many seconds before it expires
+TOKEN_RENEW_MARGIN = 300
+
+# MSAL apps kept for the life of the process, keyed by (client_id, authority, token_cache_path)
+_MSAL_APPS = {}
+_MSAL_APPS_LOCK = threading.Lock()
+
+# Statuses Graph returns when a delta token can no longer be used (expired or reset sync state)
+DELTA_EXPIRED_STATUSES = (410,)
+
+
+class MailFetchError(Exception):
+    """Mails or their attachments could not be downloaded: the mail source must not advance past them."""
+
+
 class JobMailExporter:
-    def __init__(self, client_id: str, authority: str, scopes: list, client_secret: str = None, user_email: str = None, attachments_dir: str = "attachments", init: bool = False):
+    def __init__(self, client_id: str, authority: str, scopes: list, client_secret: str = None, user_email: str = None, attachments_dir: str = "attachments", init: bool = False, page_size: int = 50,
+                 graph_url: str = GRAPH_URL, delta_state_path: str = None, mail_folder: str = "inbox",
+                 batch_concurrency: int = 1, batch_retries: int = 3, timeout: float = 30,
+                 token_cache_path: str = None):
         self.client_id = client_id
         self.authority = authority
         self.scopes = scopes
@@ -13,20 +48,82 @@ class JobMailExporter:
         self.user_email = user_email
         print(f"[DEBUG] JobMailExporter initialized with user_email: {self.user_email}")
         base_dir = os.path.dirname(os.path.abspath(__file__)) 
+        # Only used by the opt-in disk spool (save_attachments / iter_spooled_attachments)
         self.attachments_dir = os.path.join(base_dir, attachments_dir)
-        os.makedirs(self.attachments_dir, exist_ok=True)
         self.access_token = None
         self.headers = {}
+        # Tokens are renewed by ensure_token() before they expire; the MSAL cache is
+        # persisted to token_cache_path (if set) so restarts reuse a still-valid token
+        self.token_cache_path = token_cache_path
+        self.token_expires_at = 0.0
+        self._token_lock = threading.Lock()
         self.init = init
+        # Messages per Graph page when listing the mailbox
+        self.page_size = page_size
+        # Replaceable by a local fake Graph server
+        self.graph_url = graph_url.rstrip("/")
+        # Delta sync: the deltaLink of each mailbox folder is persisted here (None: timestamp listing)
+        self.delta_state_path = delta_state_path
+        self.mail_folder = mail_folder
+        self._pending_delta_link = None
+        # Attachments are fetched with $batch requests, at most batch_concurrency in flight.
+        # Graph counts each sub-request against the mailbox limit, so batches are sized to keep
+        # batch_concurrency * batch_size <= GRAPH_MAILBOX_CONCURRENCY sub-requests in flight.
+        # $batch is a POST that only wraps GETs, so it is safe to retry on 429/5xx.
+        self.batch_concurrency = max(1, min(batch_concurrency, GRAPH_MAILBOX_CONCURRENCY))
+        self.batch_size = min(GRAPH_BATCH_MAX_REQUESTS, GRAPH_MAILBOX_CONCURRENCY // self.batch_concurrency)
+        self.batch_retries = batch_retries
+        self.timeout = timeout
+        self.session = build_session(
+            pool_size=self.batch_concurrency,
+            allowed_methods=Retry.DEFAULT_ALLOWED_METHODS | {"POST"}
+        )
+
+    def _get_msal_app(self):
+        """Return the process-wide MSAL app for this client, creating it (and loading its disk cache) once."""
+        key = (self.client_id, self.authority, self.token_cache_path)
+        with _MSAL_APPS_LOCK:
+            app = _MSAL_APPS.get(key)
+            if app is None:
+                cache = SerializableTokenCache()
+                if self.token_cache_path and os.path.exists(self.token_cache_path):
+                    try:
+                        with open(self.token_cache_path, "r", encoding="utf-8") as f:
+                            cache.deserialize(f.read())
+                    except Exception as e:
+                        print(f"[WARN] Error reading token cache, starting empty: {e}")
+                app = ConfidentialClientApplication(
+                    self.client_id,
+                    authority=self.authority,
+                    client_credential=self.client_secret,
+                    token_cache=cache
+                )
+                _MSAL_APPS[key] = app
+            return app
+
+    def _save_token_cache(self, app):
+        """Write the MSAL cache to token_cache_path if it changed (owner-only permissions)."""
+        cache = app.token_cache
+        if not self.token_cache_path or not cache.has_state_changed:
+            return
+        try:
+            tmp_file = self.token_cache_path + ".tmp"
+            fd = os.open(tmp_file, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(cache.serialize())
+            os.replace(tmp_file, self.token_cache_path)
+            cache.has_state_changed = False
+        except Exception as e:
+            print(f"[WARN] Error saving token cache: {e}")
 
     def authenticate(self):
-        """Authenticate using client credentials flow (application permissions)"""
-        app = ConfidentialClientApplication(
-            self.client_id,
-            authority=self.authority,
-            client_credential=self.client_secret
-        )
-        
+        """
+        Authenticate using client credentials flow (application permissions).
+
+        MSAL serves a cached token while it is valid (in memory or from token_cache_path),
+        so only the first call of a token lifetime reaches the authority.
+        """
+        app = self._get_msal_app()
         result = app.acquire_token_for_client(scopes=self.scopes)
 
         if "access_token" not in result:
@@ -34,78 +131,233 @@ class JobMailExporter:
         
         self.access_token = result["access_token"]
         self.headers = {"Authorization": f"Bearer {self.access_token}"}
-        print("[OK] Authentification réussie.")
+        self.token_expires_at = time.time() + int(result.get("expires_in", 0))
+        self._save_token_cache(app)
+        source = "cache" if result.get("token_source") == "cache" else "authority"
+        print(f"[OK] Authentification réussie (token from {source}).")
+
+    def ensure_token(self):
+        """Authenticate again if the token is missing or expires within TOKEN_RENEW_MARGIN seconds."""
+        if self.access_token and time.time() < self.token_expires_at - TOKEN_RENEW_MARGIN:
+            return
+        with self._token_lock:
+            if not self.access_token or time.time() >= self.token_expires_at - TOKEN_RENEW_MARGIN:
+                print("[AUTH] Renewing Graph token...")
+                self.authenticate()
+
+    def build_message_query(self, subject_prefix="[JOB EXPORT]", cutoff_datetime=None, page_size=None) -> dict:
+        """
+        OData query parameters for the filtered messages listing.
+
+        Graph requires $orderby properties to appear first in $filter, so the
+        receivedDateTime condition comes before startswith(subject, ...).
+        """
+        if self.init:
+            received_after = None
+        elif cutoff_datetime:
+            received_after = cutoff_datetime
+        else:
+            # Fallback: only today's emails if no cutoff provided
+            received_after = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+
+        escaped_prefix = subject_prefix.replace("'", "''")
+        conditions = [f"startswith(subject,'{escaped_prefix}')"]
+        query = {
+            "$top": page_size or self.page_size,
+            "$select": "id,subject,hasAttachments,receivedDateTime",
+        }
+        if received_after is not None:
+            received_after = received_after.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+            # gt for an explicit cutoff (strictly after the last run), ge for the start of today
+            operator = "gt" if cutoff_datetime else "ge"
+            conditions.insert(0, f"receivedDateTime {operator} {received_after}")
+            query["$orderby"] = "receivedDateTime desc"
+        query["$filter"] = " and ".join(conditions)
+        return query
 
-    def get_filtered_emails(self, subject_prefix="[JOB EXPORT]", max_emails=250, cutoff_datetime=None):
+    def get_filtered_emails(self, subject_prefix="[JOB EXPORT]", max_emails=None, cutoff_datetime=None, page_size=None):
         """
         Get filtered emails by subject prefix and optionally by received datetime.
+
+        Both conditions are sent as an OData $filter, so only matching messages are
+        returned, and every page is read by following @odata.nextLink. A failing page
+        raises MailFetchError: a partial listing would only hold the newest mails.
         
         Args:
             subject_prefix: Filter emails starting with this prefix
-            max_emails: Maximum number of emails to fetch
+            max_emails: Maximum number of emails to fetch (None: all matching emails)
             cutoff_datetime: Only return emails received after this datetime (timezone-aware)
+            page_size: Messages per Graph page (defaults to self.page_size)
         """
+        self.ensure_token()
         user_path = f"users/{self.user_email}" if self.user_email else "me"
+        url = f"{self.graph_url}/{user_path}/messages"
+        query = self.build_message_query(subject_prefix, cutoff_datetime, page_size)
         
-        if not self.init:
-            url = f"https://graph.microsoft.com/v1.0/{user_path}/messages?$top={max_emails}&$select=id,subject,hasAttachments,receivedDateTime"
-        else:
-            url = f"https://graph.microsoft.com/v1.0/{user_path}/messages?$top={max_emails}&$select=id,subject,hasAttachments"
-        
-        print(f"[DEBUG] Fetching emails from: {url}")
+        print(f"[DEBUG] Fetching emails from: {url} with filter: {query['$filter']}")
         print(f"[DEBUG] User email: {self.user_email}")
         
+        filtered = []
+        pages = 0
         try:
-            response = requests.get(url, headers=self.headers)
-            response.raise_for_status()
-            emails = response.json().get("value", [])
+            while url:
+                # nextLink already carries the query string
+                response = self.session.get(url, headers=self.headers, params=query, timeout=self.timeout)
+                response.raise_for_status()
+                payload = response.json()
+                pages += 1
+
+                for mail in payload.get("value", []):
+                    # Graph's startswith is case-insensitive: keep the exact prefix check
+                    if mail.get("subject", "").startswith(subject_prefix):
+                        filtered.append(mail)
+
+                if max_emails is not None and len(filtered) >= max_emails:
+                    filtered = filtered[:max_emails]
+                    break
+                url = payload.get("@odata.nextLink")
+                query = None
         except Exception as e:
             print(f"[ERROR] Error fetching emails: {e}")
             if hasattr(e, 'response') and e.response is not None:
                 print(f"[ERROR] Response content: {e.response.text}")
-            return []
+            # Pages come newest first: the older mails of the unread pages would be skipped for good
+            raise MailFetchError(f"Email listing failed after {pages} pages: {e}") from e
         
-        # Filter by subject prefix and datetime
+        if cutoff_datetime:
+            print(f"[MAIL] {len(filtered)} emails matching '{subject_prefix}' after {cutoff_datetime.isoformat()} ({pages} pages)")
+        else:
+            print(f"[MAIL] {len(filtered)} emails matching '{subject_prefix}' ({pages} pages)")
+        
+        return filtered
+
+    # ------------------------------------------------------------------ delta sync
+
+    def _delta_key(self) -> str:
+        return f"{self.user_email or 'me'}/{self.mail_folder}"
+
+    def _load_delta_state(self) -> dict:
+        try:
+            if self.delta_state_path and os.path.exists(self.delta_state_path):
+                with open(self.delta_state_path, "r", encoding="utf-8") as f:
+                    return json.load(f)
+        except Exception as e:
+            print(f"[WARN] Error reading delta state: {e}")
+        return {}
+
+    def get_delta_emails(self, subject_prefix="[JOB EXPORT]", cutoff_datetime=None):
+        """
+        Get new or changed emails of self.mail_folder through Graph messages/delta.
+
+        With a stored deltaLink only the changes since the previous sync are returned.
+        Without one, an initial sync lists the folder from cutoff_datetime on (server-side
+        receivedDateTime filter). The new deltaLink is kept pending until
+        commit_delta_token() is called, so a failed run replays the same changes.
+        Falls back to get_filtered_emails if the stored token has expired (HTTP 410); any
+        other error raises MailFetchError, leaving the stored deltaLink untouched.
+        
+        Args:
+            subject_prefix: Filter emails starting with this prefix
+            cutoff_datetime: Skip emails received before this datetime (timezone-aware),
+                             e.g. older messages that were only flagged or moved
+        """
+        self.ensure_token()
+        user_path = f"users/{self.user_email}" if self.user_email else "me"
+        key = self._delta_key()
+        url = self._load_delta_state().get(key)
+        query = None
+        if url:
+            print(f"[MAIL] Delta sync of {key} from stored token")
+        else:
+            url = f"{self.graph_url}/{user_path}/mailFolders/{self.mail_folder}/messages/delta"
+            query = {"$select": "id,subject,hasAttachments,receivedDateTime"}
+            if cutoff_datetime:
+                received_after = cutoff_datetime.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+                query["$filter"] = f"receivedDateTime ge {received_after}"
+            print(f"[MAIL] Initial delta sync of {key}")
+
+        headers = dict(self.headers)
+        headers["Prefer"] = f"odata.maxpagesize={self.page_size}"
+
+        changes = []
+        pages = 0
+        delta_link = None
+        try:
+            while url:
+                # nextLink/deltaLink already carry the query string
+                response = self.session.get(url, headers=headers, params=query, timeout=self.timeout)
+                if response.status_code in DELTA_EXPIRED_STATUSES:
+                    print(f"[WARN] Delta token for {key} expired, falling back to timestamp listing")
+                    self.reset_delta_token()
+                    return self.get_filtered_emails(subject_prefix=subject_prefix, cutoff_datetime=cutoff_datetime)
+                response.raise_for_status()
+                payload = response.json()
+                pages += 1
+                changes.extend(payload.get("value", []))
+                url = payload.get("@odata.nextLink")
+                delta_link = payload.get("@odata.deltaLink", delta_link)
+                query = None
+        except Exception as e:
+            print(f"[ERROR] Error during delta sync: {e}")
+            if hasattr(e, 'response') and e.response is not None:
+                print(f"[ERROR] Response content: {e.response.text}")
+            # The stored deltaLink stays as is: the next run replays these changes
+            self._pending_delta_link = None
+            raise MailFetchError(f"Delta sync of {key} failed after {pages} pages: {e}") from e
+
         filtered = []
-        for mail in emails:
-            # Check subject prefix
-            if not mail.get("subject", "").startswith(subject_prefix):
+        for mail in changes:
+            # Deleted messages come back as {"id": ..., "@removed": {...}}
+            if "@removed" in mail or not mail.get("subject", "").startswith(subject_prefix):
                 continue
-            
-            # If cutoff_datetime is provided, filter by received datetime
-            if cutoff_datetime and not self.init:
+            if cutoff_datetime and mail.get("receivedDateTime"):
                 try:
-                    received_dt = datetime.fromisoformat(mail.get("receivedDateTime"))
-                    # Ensure received_dt is timezone-aware
-                    if received_dt.tzinfo is None:
-                        received_dt = received_dt.replace(tzinfo=timezone.utc)
-                    
-                    # Only include emails received after cutoff
+                    received_dt = datetime.fromisoformat(mail["receivedDateTime"].replace("Z", "+00:00"))
                     if received_dt <= cutoff_datetime:
                         continue
                 except (ValueError, TypeError) as e:
                     print(f"[WARN] Error parsing receivedDateTime for email: {e}")
-                    continue
-            elif not self.init and not cutoff_datetime:
-                # Fallback: filter by today if no cutoff provided
-                try:
-                    today = datetime.now(timezone.utc).date()
-                    received_date = datetime.fromisoformat(mail.get("receivedDateTime")).date()
-                    if received_date != today:
-                        continue
-                except (ValueError, TypeError):
-                    continue
-            
             filtered.append(mail)
-        
-        if cutoff_datetime:
-            print(f"[MAIL] Total emails found: {len(emails)}, Filtered by '{subject_prefix}' after {cutoff_datetime.isoformat()}: {len(filtered)}")
-        else:
-            print(f"[MAIL] Total emails found: {len(emails)}, Filtered by '{subject_prefix}': {len(filtered)}")
-        
+
+        self._pending_delta_link = delta_link
+        print(f"[MAIL] Delta sync: {len(changes)} changes ({pages} pages), {len(filtered)} new emails matching '{subject_prefix}'")
         return filtered
 
-    def save_attachments(self, mail):
+    def commit_delta_token(self):
+        """Persist the deltaLink of the last get_delta_emails call (call once its emails are saved)."""
+        if not self.delta_state_path or not self._pending_delta_link:
+            return
+        state = self._load_delta_state()
+        state[self._delta_key()] = self._pending_delta_link
+        tmp_file = self.delta_state_path + ".tmp"
+        with open(tmp_file, "w", encoding="utf-8") as f:
+            json.dump(state, f, indent=2)
+        os.replace(tmp_file, self.delta_state_path)
+        self._pending_delta_link = None
+
+    def reset_delta_token(self):
+        """Forget the stored deltaLink of self.mail_folder (the next delta sync starts over)."""
+        state = self._load_delta_state()
+        if state.pop(self._delta_key(), None) is not None:
+            tmp_file = self.delta_state_path + ".tmp"
+            with open(tmp_file, "w", encoding="utf-8") as f:
+                json.dump(state, f, indent=2)
+            os.replace(tmp_file, self.delta_state_path)
+
+    def list_new_emails(self, subject_prefix="[JOB EXPORT]", cutoff_datetime=None):
+        """Delta sync when a delta state file is configured, else the timestamp listing."""
+        if self.delta_state_path and not self.init:
+            return self.get_delta_emails(subject_prefix=subject_prefix, cutoff_datetime=cutoff_datetime)
+        return self.get_filtered_emails(subject_prefix=subject_prefix, cutoff_datetime=cutoff_datetime)
+
+    def fetch_json_attachments(self, mail, attachments=None):
+        """
+        Yield (attachment_name, raw_bytes) for each JSON attachment of `mail`.
+        Non-JSON attachments and attachments without content are skipped.
+        `attachments` (the Graph attachment list, e.g. from fetch_attachments_batch)
+        avoids a GET for this mail. Raises MailFetchError if that GET fails, so the mail
+        is retried next run instead of being skipped.
+        """
         mail_id = mail["id"]
         subject = mail.get("subject", "No_Subject")
         has_attachments = mail.get("hasAttachments", False)
@@ -118,15 +370,22 @@ class JobMailExporter:
 
         user_path = f"users/{self.user_email}" if self.user_email else "me"
         
-        try:
-            attachments_url = f"https://graph.microsoft.com/v1.0/{user_path}/messages/{mail_id}/attachments"
-            response = requests.get(attachments_url, headers=self.headers)
-            response.raise_for_status()
-            attachments = response.json().get("value", [])
-        except Exception as e:
-            print(f"[ERROR] Error fetching attachments: {e}")
-            return
+        if attachments is None:
+            self.ensure_token()
+            try:
+                attachments_url = f"{self.graph_url}/{user_path}/messages/{mail_id}/attachments"
+                response = self.session.get(attachments_url, headers=self.headers, timeout=self.timeout)
+                response.raise_for_status()
+                attachments = response.json().get("value", [])
+            except Exception as e:
+                print(f"[ERROR] Error fetching attachments: {e}")
+                raise MailFetchError(f"Attachments of mail {mail_id} could not be fetched: {e}") from e
+
+        yield from self._decode_json_attachments(mail_id, attachments)
 
+    @staticmethod
+    def _decode_json_attachments(mail_id, attachments):
+        """Yield (attachment_name, raw_bytes) for the JSON attachments of a Graph attachment list."""
         if not attachments:
             print(f"[WARN] No attachments returned from API for {mail_id}")
             return
@@ -144,28 +403,271 @@ class JobMailExporter:
             if not att_content_bytes:
                 print(f"[WARN] Impossible de récupérer la pièce jointe : {att_name}")
                 continue
-            
-            # Enregistrement du fichier JSON
-            file_path = os.path.join(self.attachments_dir, att_name)
+
             try:
-                with open(file_path, "wb") as f:
-                    f.write(base64.b64decode(att_content_bytes))
-                print(f"[OK] Pièce jointe JSON enregistrée : {file_path}")
+                yield att_name, base64.b64decode(att_content_bytes)
+            except (ValueError, TypeError) as e:
+                print(f"[ERROR] Error decoding attachment {att_name}: {e}")
+
+    def _post_attachment_batch(self, mail_ids: list) -> dict:
+        """
+        Fetch the attachments of up to batch_size mails in one $batch request.
+
+        Sub-requests throttled by Graph (429/5xx inside the batch response) are sent again
+        in a smaller batch after their Retry-After delay, up to batch_retries times.
+        Returns {mail_id: [attachment dicts]} for the sub-requests that succeeded; the other
+        mails are fetched again one by one by fetch_json_attachments, which raises
+        MailFetchError if that fails too.
+        """
+        user_path = f"users/{self.user_email}" if self.user_email else "me"
+        results = {}
+        pending = list(mail_ids)
+        for attempt in range(self.batch_retries + 1):
+            self.ensure_token()
+            body = {"requests": [
+                {"id": str(index), "method": "GET", "url": f"/{user_path}/messages/{mail_id}/attachments"}
+                for index, mail_id in enumerate(pending)
+            ]}
+            try:
+                response = self.session.post(f"{self.graph_url}/$batch", json=body, headers=self.headers,
+                                             timeout=self.timeout)
+                response.raise_for_status()
+                responses = response.json().get("responses", [])
             except Exception as e:
-                print(f"[ERROR] Error saving file {att_name}: {e}")
+                print(f"[ERROR] Error fetching attachments batch: {e}")
+                return results
+
+            throttled = []
+            delay = 0.0
+            for sub in responses:
+                mail_id = pending[int(sub["id"])]
+                status = sub.get("status")
+                if status == 200:
+                    results[mail_id] = (sub.get("body") or {}).get("value", [])
+                elif status in RETRY_STATUSES:
+                    throttled.append(mail_id)
+                    retry_after = (sub.get("headers") or {}).get("Retry-After")
+                    try:
+                        delay = max(delay, float(retry_after))
+                    except (TypeError, ValueError):
+                        delay = max(delay, 2.0 ** attempt)
+                else:
+                    print(f"[WARN] Attachments of {mail_id} not returned (status {status})")
+
+            if not throttled:
+                break
+            if attempt < self.batch_retries:
+                print(f"[RETRY] {len(throttled)} attachment requests throttled, retrying in {delay:.1f}s")
+                time.sleep(delay)
+                pending = throttled
+            else:
+                print(f"[WARN] {len(throttled)} attachment requests still throttled, fetched one by one")
+        return results
+
+    def fetch_attachments_batch(self, mails: list) -> dict:
+        """
+        Fetch the attachments of `mails` with JSON $batch requests (batch_size mails per batch,
+        batch_concurrency batches in flight). Returns {mail_id: [attachment dicts]};
+        mails without attachments or whose sub-request failed are absent.
+        """
+        mail_ids = [mail["id"] for mail in mails if mail.get("hasAttachments")]
+        chunks = [mail_ids[i:i + self.batch_size] for i in range(0, len(mail_ids), self.batch_size)]
+        results = {}
+        if not chunks:
+            return results
+        with ThreadPoolExecutor(max_workers=min(self.batch_concurrency, len(chunks))) as executor:
+            for chunk_results in executor.map(self._post_attachment_batch, chunks):
+                results.update(chunk_results)
+        return results
+
+    def iter_mails_with_attachments(self, mails: list):
+        """
+        Yield (mail, attachments) in order, fetching attachments window by window
+        (batch_size * batch_concurrency mails per window).
+        attachments is None when the batch did not return them (fetched again one by one).
+        """
+        window = self.batch_size * self.batch_concurrency
+        for start in range(0, len(mails), window):
+            chunk = mails[start:start + window]
+            fetched = self.fetch_attachments_batch(chunk)
+            for mail in chunk:
+                yield mail, fetched.get(mail["id"])
+
+    def iter_attachments(self, mail, attachments=None):
+        """Yield the parsed JSON attachments of `mail` as dicts, without touching the disk."""
+        for att_name, content in self.fetch_json_attachments(mail, attachments):
+            try:
+                yield json.loads(content)
+            except ValueError as e:
+                print(f"[WARN] Invalid JSON in attachment {att_name}: {e}")
+
+    def iter_job_exports(self, cutoff_datetime=None):
+        """
+        Yield the parsed JSON attachments of every filtered email, mail by mail.
+
+        Attachments are downloaded with $batch requests one window of mails at a time,
+        when the consumer asks for the next item, so mapping starts while the remaining
+        mails are still being fetched.
+        
+        Args:
+            cutoff_datetime: Only process emails received after this datetime (timezone-aware)
+        """
+        filtered_emails = self.list_new_emails(cutoff_datetime=cutoff_datetime)
+        print(f"[EMAIL] Processing {len(filtered_emails)} emails...")
+        for mail, attachments in self.iter_mails_with_attachments(filtered_emails):
+            yield from self.iter_attachments(mail, attachments)
+        print("[OK] Tous les mails filtrés et pièces jointes traités.")
+
+    def save_attachments(self, mail, attachments=None):
+        """
+        Spool the JSON attachments of `mail` to attachments_dir (opt-in disk mode).
+
+        File names are prefixed with a hash of the mail id and attachment position, so
+        two emails carrying the same attachment name do not overwrite each other.
+        Each file is written to a temporary name, then renamed: an interrupted run never
+        leaves a truncated .json behind, and complete files are picked up by the next run.
+        """
+        os.makedirs(self.attachments_dir, exist_ok=True)
+        for index, (att_name, content) in enumerate(self.fetch_json_attachments(mail, attachments)):
+            self._spool_attachment(mail["id"], index, att_name, content)
+
+    def _spool_attachment(self, mail_id: str, index: int, att_name: str, content: bytes):
+        prefix = hashlib.sha1(f"{mail_id}:{index}".encode("utf-8")).hexdigest()[:12]
+        file_path = os.path.join(self.attachments_dir, f"{prefix}_{os.path.basename(att_name)}")
+        tmp_path = file_path + ".part"
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(content)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, file_path)
+            print(f"[OK] Pièce jointe JSON enregistrée : {file_path}")
+        except Exception as e:
+            print(f"[ERROR] Error saving file {att_name}: {e}")
+
+    def iter_spooled_attachments(self):
+        """
+        Yield (file_path, parsed dict) for every JSON file in the spool directory,
+        including files left over by an interrupted run. Callers delete each file
+        once its document has been saved.
+        """
+        if not os.path.isdir(self.attachments_dir):
+            return
+        for filename in sorted(os.listdir(self.attachments_dir)):
+            if not filename.endswith(".json"):
+                continue
+            file_path = os.path.join(self.attachments_dir, filename)
+            try:
+                with open(file_path, "r", encoding="utf-8") as f:
+                    yield file_path, json.load(f)
+            except ValueError as e:
+                # Set aside so it is not retried on every run, but kept for inspection
+                print(f"[WARN] Invalid JSON in {filename}, renamed to {filename}.invalid: {e}")
+                os.replace(file_path, file_path + ".invalid")
+            except OSError as e:
+                print(f"[WARN] Error reading {filename}: {e}")
 
     def process_emails(self, cutoff_datetime=None):
         """
-        Process emails and save attachments.
+        Process emails and spool their attachments to attachments_dir.
         
         Args:
             cutoff_datetime: Only process emails received after this datetime (timezone-aware)
         """
-        filtered_emails = self.get_filtered_emails(cutoff_datetime=cutoff_datetime)
+        filtered_emails = self.list_new_emails(cutoff_datetime=cutoff_datetime)
         print(f"[EMAIL] Processing {len(filtered_emails)} emails...")
-        for mail in filtered_emails:
-            self.save_attachments(mail)
+        for mail, attachments in self.iter_mails_with_attachments(filtered_emails):
+            self.save_attachments(mail, attachments)
         print("[OK] Tous les mails filtrés et pièces jointes traités.")
 
+    # ------------------------------------------------------------------ asyncio variant (--mode async)
+
+    def create_async_client(self) -> httpx.AsyncClient:
+        """Pooled httpx client for the *_async methods (GRAPH_MAILBOX_CONCURRENCY connections, as Graph allows)."""
+        return build_async_client(max_connections=GRAPH_MAILBOX_CONCURRENCY, timeout=self.timeout)
+
+    async def _graph_get_async(self, client: httpx.AsyncClient, url: str, params=None) -> dict:
+        # MSAL is synchronous: a token renewal runs in a worker thread, not on the event loop
+        await asyncio.to_thread(self.ensure_token)
+        response = await request_async(client, "GET", url, headers=self.headers, params=params)
+        response.raise_for_status()
+        return response.json()
+
+    async def get_filtered_emails_async(self, client: httpx.AsyncClient, subject_prefix="[JOB EXPORT]",
+                                        max_emails=None, cutoff_datetime=None, page_size=None):
+        """Async get_filtered_emails: same OData query and nextLink paging, on an httpx client."""
+        user_path = f"users/{self.user_email}" if self.user_email else "me"
+        url = f"{self.graph_url}/{user_path}/messages"
+        query = self.build_message_query(subject_prefix, cutoff_datetime, page_size)
+        print(f"[DEBUG] Fetching emails from: {url} with filter: {query['$filter']}")
+
+        filtered = []
+        pages = 0
+        try:
+            while url:
+                payload = await self._graph_get_async(client, url, params=query)
+                pages += 1
+                for mail in payload.get("value", []):
+                    # Graph's startswith is case-insensitive: keep the exact prefix check
+                    if mail.get("subject", "").startswith(subject_prefix):
+                        filtered.append(mail)
+                if max_emails is not None and len(filtered) >= max_emails:
+                    filtered = filtered[:max_emails]
+                    break
+                url = payload.get("@odata.nextLink")
+                query = None
+        except httpx.HTTPError as e:
+            print(f"[ERROR] Error fetching emails: {e}")
+            raise MailFetchError(f"Email listing failed after {pages} pages: {e}") from e
+
+        print(f"[MAIL] {len(filtered)} emails matching '{subject_prefix}' ({pages} pages)")
+        return filtered
+
+    async def list_new_emails_async(self, client: httpx.AsyncClient, subject_prefix="[JOB EXPORT]",
+                                    cutoff_datetime=None):
+        """Async list_new_emails; delta sync keeps its synchronous implementation, run in a worker thread."""
+        if self.delta_state_path and not self.init:
+            return await asyncio.to_thread(
+                self.get_delta_emails, subject_prefix=subject_prefix, cutoff_datetime=cutoff_datetime
+            )
+        return await self.get_filtered_emails_async(client, subject_prefix=subject_prefix,
+                                                    cutoff_datetime=cutoff_datetime)
+
+    async def fetch_json_attachments_async(self, client: httpx.AsyncClient, mail) -> list:
+        """Async fetch_json_attachments: [(attachment_name, raw_bytes)] of the JSON attachments of `mail`."""
+        if not mail.get("hasAttachments", False):
+            print(f"[SKIP] No attachments for this email")
+            return []
+        user_path = f"users/{self.user_email}" if self.user_email else "me"
+        try:
+            payload = await self._graph_get_async(
+                client, f"{self.graph_url}/{user_path}/messages/{mail['id']}/attachments"
+            )
+        except httpx.HTTPError as e:
+            print(f"[ERROR] Error fetching attachments: {e}")
+            raise MailFetchError(f"Attachments of mail {mail['id']} could not be fetched: {e}") from e
+        return list(self._decode_json_attachments(mail["id"], payload.get("value", [])))
 
+    async def get_job_exports_async(self, client: httpx.AsyncClient, cutoff_datetime=None) -> list:
+        """Parsed JSON attachments of every filtered email; attachments are fetched concurrently
+        (at most GRAPH_MAILBOX_CONCURRENCY requests in flight, the client's pool size)."""
+        mails = await self.list_new_emails_async(client, cutoff_datetime=cutoff_datetime)
+        print(f"[EMAIL] Processing {len(mails)} emails...")
+        per_mail = await asyncio.gather(*(self.fetch_json_attachments_async(client, mail) for mail in mails))
+        exports = []
+        for att_name, content in (attachment for attachments in per_mail for attachment in attachments):
+            try:
+                exports.append(json.loads(content))
+            except ValueError as e:
+                print(f"[WARN] Invalid JSON in attachment {att_name}: {e}")
+        print("[OK] Tous les mails filtrés et pièces jointes traités.")
+        return exports
 
+    async def save_attachments_async(self, client: httpx.AsyncClient, mail):
+        """Async save_attachments: download on the event loop, atomic file writes in a worker thread."""
+        attachments = await self.fetch_json_attachments_async(client, mail)
+        if not attachments:
+            return
+        os.makedirs(self.attachments_dir, exist_ok=True)
+        for index, (att_name, content) in enumerate(attachments):
+            await asyncio.to_thread(self._spool_attachment, mail["id"], index, att_name, content)
@@ -0,0 +1,105 @@
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+
+def normalize_text(text: str) -> str:
+    """Collapse whitespace so cosmetic reformatting does not change cache keys."""
+    return re.sub(r"\s+", " ", text or "").strip()
+
+
+class LLMResultCache:
+    """
+    Cache persistant (SQLite) des réponses ChatGPT, indexé par hash de contenu.
+
+    Les entrées sont rangées par namespace (ex: "enhance_html", "skills") et évincées
+    en LRU au-delà de `max_entries` par namespace. `ttl_seconds` fixe une durée de vie
+    par namespace ({"skills": 30 * 86400}) ; sans TTL une entrée n'expire pas.
+    Les compteurs hits/misses sont tenus par namespace pour le résumé de fin de run.
+    Thread-safe : une seule connexion protégée par un verrou.
+    """
+
+    def __init__(self, path, max_entries: int = 5000, ttl_seconds: Optional[dict] = None):
+        self.path = Path(path)
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds or {}
+        self.hits = {}
+        self.misses = {}
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        with self._conn:
+            self._conn.execute(
+                """CREATE TABLE IF NOT EXISTS llm_cache (
+                    namespace TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    value TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_access REAL NOT NULL,
+                    PRIMARY KEY (namespace, key)
+                )"""
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_llm_cache_ns_access ON llm_cache (namespace, last_access)"
+            )
+
+    @staticmethod
+    def make_key(*parts: str) -> str:
+        """SHA-256 of the parts (e.g. prompt version, model, normalized text)."""
+        digest = hashlib.sha256()
+        for part in parts:
+            digest.update(str(part).encode("utf-8"))
+            digest.update(b"\x1f")
+        return digest.hexdigest()
+
+    def get(self, namespace: str, key: str) -> Optional[dict]:
+        """Return the cached value or None (absent or expired), and count the hit/miss."""
+        now = time.time()
+        ttl = self.ttl_seconds.get(namespace)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created_at FROM llm_cache WHERE namespace = ? AND key = ?", (namespace, key)
+            ).fetchone()
+            if row is not None and ttl is not None and row[1] + ttl < now:
+                with self._conn:
+                    self._conn.execute("DELETE FROM llm_cache WHERE namespace = ? AND key = ?", (namespace, key))
+                row = None
+            if row is None:
+                self.misses[namespace] = self.misses.get(namespace, 0) + 1
+                return None
+            with self._conn:
+                self._conn.execute(
+                    "UPDATE llm_cache SET last_access = ? WHERE namespace = ? AND key = ?",
+                    (now, namespace, key)
+                )
+            self.hits[namespace] = self.hits.get(namespace, 0) + 1
+            return json.loads(row[0])
+
+    def set(self, namespace: str, key: str, value: dict):
+        """Store a value, then evict the namespace's least recently used entries beyond max_entries."""
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (namespace, key, value, created_at, last_access) VALUES (?, ?, ?, ?, ?)",
+                (namespace, key, json.dumps(value, ensure_ascii=False), now, now)
+            )
+            self._conn.execute(
+                """DELETE FROM llm_cache WHERE rowid IN (
+                    SELECT rowid FROM llm_cache WHERE namespace = ?
+                    ORDER BY last_access DESC LIMIT -1 OFFSET ?
+                )""",
+                (namespace, self.max_entries)
+            )
+
+    def stats(self) -> dict:
+        """Return {namespace: {"hits": n, "misses": n}} for this process."""
+        namespaces = set(self.hits) | set(self.misses)
+        return {ns: {"hits": self.hits.get(ns, 0), "misses": self.misses.get(ns, 0)} for ns in sorted(namespaces)}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
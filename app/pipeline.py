@@ -0,0 +1,182 @@
+import queue
+import threading
+import time
+import traceback
+from typing import Callable, Iterable, List
+
+# Marks the end of a queue for one consumer worker
+_DONE = object()
+
+
+class Stage:
+    """
+    One pipeline step: `workers` threads reading from a bounded input queue.
+
+    fn(item) returns the item for the next stage, or None to drop it. With batch_size > 1,
+    fn receives a list of up to batch_size items (whatever is available within
+    batch_wait seconds) and returns a list of items for the next stage.
+    An exception drops the item (or the batch): it is counted in the stage's errors and
+    kept in the pipeline's `failed_items`.
+    """
+
+    def __init__(self, name: str, fn: Callable, workers: int = 1, queue_size: int = 100,
+                 batch_size: int = 1, batch_wait: float = 0.5):
+        self.name = name
+        self.fn = fn
+        self.workers = max(1, workers)
+        self.queue_size = queue_size
+        self.batch_size = max(1, batch_size)
+        self.batch_wait = batch_wait
+
+
+class Pipeline:
+    """
+    Producer/consumer runner: sources -> stage 1 -> ... -> stage N.
+
+    Every source iterable is consumed in its own thread, so sources overlap. Stages are
+    connected by bounded queues: a full queue blocks its producers (backpressure) and
+    each stage runs its own worker count, so the run time approaches that of the
+    slowest stage instead of the sum of all stages. Items do not keep their order.
+
+    run() returns the items that came out of the last stage; per-stage counters
+    (in, out, errors, busy seconds) are kept in `stats`, exceptions raised by the
+    sources in `source_errors`, and the (stage name, item) pairs a stage failed on in
+    `failed_items`.
+    """
+
+    def __init__(self, sources: dict, stages: List[Stage]):
+        self.sources = sources
+        self.stages = stages
+        self.stats = {stage.name: {"in": 0, "out": 0, "errors": 0, "busy_seconds": 0.0} for stage in stages}
+        self.source_errors = {}
+        self.failed_items = []
+        self._lock = threading.Lock()
+
+    def _count(self, stage_name: str, key: str, value=1):
+        with self._lock:
+            self.stats[stage_name][key] += value
+
+    def _fail(self, stage_name: str, items: list):
+        with self._lock:
+            self.stats[stage_name]["errors"] += len(items)
+            self.failed_items.extend((stage_name, item) for item in items)
+
+    def run(self) -> list:
+        queues = [queue.Queue(maxsize=stage.queue_size) for stage in self.stages]
+        results = []
+        # Number of producers still writing to each queue (sources for the first one)
+        remaining = [len(self.sources)] + [stage.workers for stage in self.stages[:-1]]
+
+        def producer_done(index: int):
+            """Called by each producer of queues[index]; the last one closes the queue."""
+            if index == len(queues):
+                return
+            with self._lock:
+                remaining[index] -= 1
+                closing = remaining[index] == 0
+            if closing:
+                for _ in range(self.stages[index].workers):
+                    queues[index].put(_DONE)
+
+        def emit(index: int, item):
+            if index == len(queues):
+                with self._lock:
+                    results.append(item)
+            else:
+                queues[index].put(item)
+
+        def run_source(name: str, iterable: Iterable):
+            try:
+                for item in iterable:
+                    emit(0, item)
+            except Exception as e:
+                print(f"[ERROR] Pipeline source {name} failed: {e}")
+                traceback.print_exc()
+                with self._lock:
+                    self.source_errors[name] = e
+            finally:
+                producer_done(0)
+
+        def next_batch(stage: Stage, in_queue: queue.Queue):
+            """Block for one item, then take what arrives within batch_wait (up to batch_size)."""
+            first = in_queue.get()
+            if first is _DONE:
+                return [], True
+            batch = [first]
+            deadline = time.monotonic() + stage.batch_wait
+            while len(batch) < stage.batch_size:
+                try:
+                    item = in_queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if item is _DONE:
+                    return batch, True
+                batch.append(item)
+            return batch, False
+
+        def run_stage(index: int, stage: Stage):
+            in_queue = queues[index]
+            try:
+                while True:
+                    if stage.batch_size > 1:
+                        batch, done = next_batch(stage, in_queue)
+                        if batch:
+                            self._count(stage.name, "in", len(batch))
+                            started = time.monotonic()
+                            try:
+                                outputs = stage.fn(batch) or []
+                            except Exception as e:
+                                print(f"[ERROR] Pipeline stage {stage.name} failed on a batch of {len(batch)}: {e}")
+                                traceback.print_exc()
+                                self._fail(stage.name, batch)
+                                outputs = []
+                            self._count(stage.name, "busy_seconds", time.monotonic() - started)
+                            for output in outputs:
+                                self._count(stage.name, "out")
+                                emit(index + 1, output)
+                        if done:
+                            return
+                        continue
+
+                    item = in_queue.get()
+                    if item is _DONE:
+                        return
+                    self._count(stage.name, "in")
+                    started = time.monotonic()
+                    try:
+                        output = stage.fn(item)
+                    except Exception as e:
+                        print(f"[ERROR] Pipeline stage {stage.name} failed: {e}")
+                        traceback.print_exc()
+                        self._fail(stage.name, [item])
+                        output = None
+                    self._count(stage.name, "busy_seconds", time.monotonic() - started)
+                    if output is not None:
+                        self._count(stage.name, "out")
+                        emit(index + 1, output)
+            finally:
+                producer_done(index + 1)
+
+        threads = [
+            threading.Thread(target=run_stage, args=(index, stage), name=f"{stage.name}-{worker}", daemon=True)
+            for index, stage in enumerate(self.stages)
+            for worker in range(stage.workers)
+        ]
+        threads += [
+            threading.Thread(target=run_source, args=(name, iterable), name=f"source-{name}", daemon=True)
+            for name, iterable in self.sources.items()
+        ]
+        if not self.sources and queues:
+            for _ in range(self.stages[0].workers):
+                queues[0].put(_DONE)
+
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results
+
+    def print_stats(self):
+        for name, counters in self.stats.items():
+            print(f"  - Stage {name}: {counters['in']} in, {counters['out']} out, {counters['errors']} errors, "
+                  f"{counters['busy_seconds']:.1f}s busy")
@@ -0,0 +1,107 @@
+import html
+import re
+from typing import Optional
+
+try:
+    import tiktoken
+except ImportError:  # optional: falls back to a ~4 chars/token estimate
+    tiktoken = None
+
+# Block-level tags that end a line once the markup is stripped
+_BLOCK_TAG_RE = re.compile(r"<\s*(br|/p|/div|/li|/h[1-6]|/tr|/section|/ul|/ol)\b[^>]*>", re.IGNORECASE)
+_LIST_ITEM_RE = re.compile(r"<\s*li\b[^>]*>", re.IGNORECASE)
+_DROP_BLOCK_RE = re.compile(r"<\s*(script|style)\b[^>]*>.*?<\s*/\s*\1\s*>", re.IGNORECASE | re.DOTALL)
+_TAG_RE = re.compile(r"<[^>]+>")
+_SPACES_RE = re.compile(r"[ \t\f\v\u00a0]+")
+
+# Lines this short are kept even when repeated (bullets, "-", section separators)
+_MIN_DEDUPE_LINE_LENGTH = 20
+
+
+def strip_markup(text: str) -> str:
+    """Turn HTML into plain text: drop tags (keeping line breaks at block ends), unescape entities."""
+    if not text or ("<" not in text and "&" not in text):
+        return text or ""
+    text = _DROP_BLOCK_RE.sub(" ", text)
+    text = _LIST_ITEM_RE.sub("\n- ", text)
+    text = _BLOCK_TAG_RE.sub("\n", text)
+    text = _TAG_RE.sub(" ", text)
+    return html.unescape(text)
+
+
+def compact_lines(text: str) -> str:
+    """Collapse whitespace inside lines, drop empty lines and repeated boilerplate lines."""
+    seen = set()
+    lines = []
+    for line in text.splitlines():
+        line = _SPACES_RE.sub(" ", line).strip()
+        if not line:
+            continue
+        if len(line) >= _MIN_DEDUPE_LINE_LENGTH:
+            key = line.casefold()
+            if key in seen:
+                continue
+            seen.add(key)
+        lines.append(line)
+    return "\n".join(lines)
+
+
+class TokenCounter:
+    """
+    Compteur de tokens local pour un modèle OpenAI.
+
+    Utilise tiktoken si le paquet et l'encodage du modèle sont disponibles (l'encodage
+    est téléchargé une fois puis mis en cache par tiktoken), sinon une estimation à
+    ≈ 4 caractères par token : le budget reste appliqué, avec une marge d'erreur.
+    """
+
+    def __init__(self, model: str = "gpt-4o"):
+        self.model = model
+        self.encoding = None
+        if tiktoken is not None:
+            try:
+                self.encoding = tiktoken.encoding_for_model(model)
+            except KeyError:
+                self.encoding = self._load_encoding("o200k_base")
+            except Exception as e:
+                print(f"[WARN] tiktoken encoding unavailable for {model}, estimating tokens: {e}")
+
+    @staticmethod
+    def _load_encoding(name: str):
+        try:
+            return tiktoken.get_encoding(name)
+        except Exception as e:
+            print(f"[WARN] tiktoken encoding {name} unavailable, estimating tokens: {e}")
+            return None
+
+    def count(self, text: str) -> int:
+        if not text:
+            return 0
+        if self.encoding is not None:
+            return len(self.encoding.encode(text, disallowed_special=()))
+        return len(text) // 4 + 1
+
+    def truncate(self, text: str, max_tokens: int) -> str:
+        """Cut `text` to at most `max_tokens` tokens, on a line or word boundary when possible."""
+        if not text or max_tokens is None or self.count(text) <= max_tokens:
+            return text
+        if self.encoding is not None:
+            cut = self.encoding.decode(self.encoding.encode(text, disallowed_special=())[:max_tokens])
+        else:
+            cut = text[:max_tokens * 4]
+        # Prefer dropping the partial last line/word over sending half a sentence
+        boundary = max(cut.rfind("\n"), cut.rfind(" "))
+        if boundary > len(cut) * 0.8:
+            cut = cut[:boundary]
+        return cut.rstrip()
+
+
+def prepare_text(text: str, counter: TokenCounter, max_tokens: Optional[int] = None) -> str:
+    """
+    Shrink a job description before it goes into a prompt: strip markup, collapse
+    whitespace, drop repeated boilerplate lines, then truncate to `max_tokens`.
+    """
+    text = compact_lines(strip_markup(text or ""))
+    if max_tokens:
+        text = counter.truncate(text, max_tokens)
+    return text
@@ -1,7 +1,11 @@
+import asyncio
+import httpx
 import requests
 from typing import List, Dict
 from datetime import datetime, timezone
 
+from app.api_client import AsyncFuturScamApiClient, FuturScamApiClient
+
 
 class SubscriptionNotifier:
     """
@@ -9,14 +13,19 @@ class SubscriptionNotifier:
     avec les nouvelles offres correspondant à leurs abonnements.
     """
     
-    def __init__(self, api_url: str = "http://localhost:8000"):
+    def __init__(self, api_url: str = "http://localhost:8000", api_client: FuturScamApiClient = None,
+                 async_api_client: AsyncFuturScamApiClient = None):
         """
         Initialise le notificateur d'abonnements.
         
         Args:
-            api_url: URL de l'API backend
+            api_url: URL de l'API backend (ignorée si api_client est fourni)
+            api_client: Client API partagé (session HTTP persistante) ; créé à partir de api_url si absent
+            async_api_client: Client asyncio utilisé par les méthodes *_async (mode --mode async)
         """
-        self.api_url = api_url
+        self.api_client = api_client or FuturScamApiClient(api_url=api_url)
+        self.async_api_client = async_api_client
+        self.api_url = self.api_client.api_url
         print(f"[INIT] SubscriptionNotifier initialized with API: {self.api_url}")
 
     def get_users_with_subscriptions(self) -> List[Dict]:
@@ -24,33 +33,38 @@ class SubscriptionNotifier:
         Récupère tous les utilisateurs ayant des abonnements (metadata avec role='abonnements').
         
         Returns:
-            Liste des utilisateurs avec leurs abonnements
+            Liste des utilisateurs avec leurs abonnements, None si la requête a échoué
         """
         try:
-            response = requests.get(f"{self.api_url}/users", timeout=30)
-            
-            if response.status_code != 200:
-                print(f"[ERROR] Failed to fetch users: status {response.status_code}")
-                return []
-            
-            all_users = response.json() if isinstance(response.json(), list) else response.json().get("data", [])
+            response = self.api_client.list_users()
             
-            # Filtrer les utilisateurs avec des abonnements
-            users_with_subs = []
-            for user in all_users:
-                metadata = user.get("metadata", [])
-                subscriptions = [m for m in metadata if m.get("role") == "abonnements"]
-                
-                if subscriptions:
-                    user["subscriptions"] = subscriptions
-                    users_with_subs.append(user)
-            
-            print(f"[OK] Found {len(users_with_subs)} users with subscriptions")
-            return users_with_subs
+            return self._parse_users_response(response)
             
         except requests.RequestException as e:
             print(f"[ERROR] Error fetching users: {e}")
-            return []
+            return None
+
+    @staticmethod
+    def _parse_users_response(response) -> List[Dict]:
+        """Garde les utilisateurs ayant des abonnements dans la réponse de /users (requests ou httpx), None en cas d'erreur."""
+        if response.status_code != 200:
+            print(f"[ERROR] Failed to fetch users: status {response.status_code}")
+            return None
+        
+        all_users = response.json() if isinstance(response.json(), list) else response.json().get("data", [])
+        
+        # Filtrer les utilisateurs avec des abonnements
+        users_with_subs = []
+        for user in all_users:
+            metadata = user.get("metadata", [])
+            subscriptions = [m for m in metadata if m.get("role") == "abonnements"]
+            
+            if subscriptions:
+                user["subscriptions"] = subscriptions
+                users_with_subs.append(user)
+        
+        print(f"[OK] Found {len(users_with_subs)} users with subscriptions")
+        return users_with_subs
 
     def get_new_rfps_for_subscription(self, subscription_name: str, all_new_rfps: List[Dict]) -> List[Dict]:
         """
@@ -182,54 +196,55 @@ class SubscriptionNotifier:
             True si l'envoi a réussi, False sinon
         """
         try:
-            # Préparer les données pour l'endpoint /mail
-            data = {
-                "to_addresses": to_email,
-                "subject": subject,
-                "body": body_html,
-                "is_html": True
-            }
-            
-            response = requests.post(
-                f"{self.api_url}/mail",
-                data=data,
-                timeout=30
-            )
-            
-            if response.status_code == 200:
-                print(f"[OK] Email sent successfully to {to_email}")
-                return True
-            else:
-                print(f"[ERROR] Failed to send email: status {response.status_code}")
-                print(f"Response: {response.text}")
-                return False
+            response = self.api_client.send_mail(self._mail_data(to_email, subject, body_html))
+            return self._check_mail_response(response, to_email)
                 
         except requests.RequestException as e:
             print(f"[ERROR] Error sending email: {e}")
             return False
 
-    def notify_all_subscribers(self, new_rfps: List[Dict]):
+    async def send_email_async(self, to_email: str, subject: str, body_html: str) -> bool:
         """
-        Envoie des notifications à tous les utilisateurs abonnés avec les nouvelles offres.
-        Envoie 1 seul email par utilisateur avec toutes les RFPs de tous ses abonnements.
+        Version asyncio de send_email, via async_api_client (AsyncFuturScamApiClient).
         
-        Args:
-            new_rfps: Liste des RFPs ajoutées/modifiées dans le run actuel
+        Returns:
+            True si l'envoi a réussi, False sinon
         """
-        if not new_rfps:
-            print("[INFO] No new RFPs to notify about")
-            return
-        
-        print(f"[INFO] Processing {len(new_rfps)} new RFPs for subscription notifications")
-        
-        # Récupérer les utilisateurs avec abonnements
-        users = self.get_users_with_subscriptions()
+        try:
+            response = await self.async_api_client.send_mail(self._mail_data(to_email, subject, body_html))
+            return self._check_mail_response(response, to_email)
         
-        if not users:
-            print("[INFO] No users with subscriptions found")
-            return
+        except httpx.HTTPError as e:
+            print(f"[ERROR] Error sending email: {e}")
+            return False
+
+    @staticmethod
+    def _mail_data(to_email: str, subject: str, body_html: str) -> dict:
+        # Données attendues par l'endpoint /mail
+        return {
+            "to_addresses": to_email,
+            "subject": subject,
+            "body": body_html,
+            "is_html": True
+        }
+
+    @staticmethod
+    def _check_mail_response(response, to_email: str) -> bool:
+        if response.status_code == 200:
+            print(f"[OK] Email sent successfully to {to_email}")
+            return True
+        print(f"[ERROR] Failed to send email: status {response.status_code}")
+        print(f"Response: {response.text}")
+        return False
+
+    def build_notifications(self, users: List[Dict], new_rfps: List[Dict]) -> List[tuple]:
+        """
+        Prépare 1 seul email par utilisateur avec toutes les RFPs de tous ses abonnements.
         
-        total_emails_sent = 0
+        Returns:
+            Liste de (email du destinataire, sujet, corps HTML)
+        """
+        notifications = []
         
         # Pour chaque utilisateur
         for user in users:
@@ -260,16 +275,87 @@ class SubscriptionNotifier:
                     total_user_rfps += len(matching_rfps)
                     print(f"[INFO] Found {len(matching_rfps)} new RFPs for {user_name} ({subscription_name})")
             
-            # Si l'utilisateur a des nouvelles offres, envoyer UN SEUL email avec tout
+            # Si l'utilisateur a des nouvelles offres, préparer UN SEUL email avec tout
             if subscriptions_rfps and total_user_rfps > 0:
                 print(f"[MAIL] Sending 1 email to {user_name} with {total_user_rfps} RFPs from {len(subscriptions_rfps)} subscription(s)")
                 
                 subject = f"[FuturScam] {total_user_rfps} nouvelle(s) offre(s) pour vous"
                 body = self.generate_email_body(user_name, subscriptions_rfps)
-                
-                if self.send_email(user_email, subject, body):
-                    total_emails_sent += 1
+                notifications.append((user_email, subject, body))
             else:
                 print(f"[INFO] No new RFPs for {user_name}")
         
+        return notifications
+
+    def notify_all_subscribers(self, new_rfps: List[Dict]) -> bool:
+        """
+        Envoie des notifications à tous les utilisateurs abonnés avec les nouvelles offres.
+        Envoie 1 seul email par utilisateur avec toutes les RFPs de tous ses abonnements.
+        
+        Args:
+            new_rfps: Liste des RFPs ajoutées/modifiées dans le run actuel
+            
+        Returns:
+            True si tous les emails ont été envoyés (ou s'il n'y avait rien à envoyer), False sinon
+        """
+        if not new_rfps:
+            print("[INFO] No new RFPs to notify about")
+            return True
+        
+        print(f"[INFO] Processing {len(new_rfps)} new RFPs for subscription notifications")
+        
+        # Récupérer les utilisateurs avec abonnements
+        users = self.get_users_with_subscriptions()
+        
+        if users is None:
+            return False
+        if not users:
+            print("[INFO] No users with subscriptions found")
+            return True
+        
+        notifications = self.build_notifications(users, new_rfps)
+        total_emails_sent = 0
+        for user_email, subject, body in notifications:
+            if self.send_email(user_email, subject, body):
+                total_emails_sent += 1
+        
+        print(f"[SUMMARY] Sent {total_emails_sent} subscription notification email(s) to {total_emails_sent} user(s)")
+        return total_emails_sent == len(notifications)
+
+    async def notify_all_subscribers_async(self, new_rfps: List[Dict]) -> bool:
+        """
+        Version asyncio de notify_all_subscribers : les emails sont envoyés en parallèle
+        via async_api_client (toujours 1 seul email par utilisateur).
+        
+        Args:
+            new_rfps: Liste des RFPs ajoutées/modifiées dans le run actuel
+            
+        Returns:
+            True si tous les emails ont été envoyés (ou s'il n'y avait rien à envoyer), False sinon
+        """
+        if not new_rfps:
+            print("[INFO] No new RFPs to notify about")
+            return True
+        
+        print(f"[INFO] Processing {len(new_rfps)} new RFPs for subscription notifications")
+        
+        try:
+            users = self._parse_users_response(await self.async_api_client.list_users())
+        except httpx.HTTPError as e:
+            print(f"[ERROR] Error fetching users: {e}")
+            users = None
+        
+        if users is None:
+            return False
+        if not users:
+            print("[INFO] No users with subscriptions found")
+            return True
+        
+        results = await asyncio.gather(*(
+            self.send_email_async(user_email, subject, body)
+            for user_email, subject, body in self.build_notifications(users, new_rfps)
+        ))
+        total_emails_sent = sum(1 for sent in results if sent)
+        
         print(f"[SUMMARY] Sent {total_emails_sent} subscription notification email(s) to {total_emails_sent} user(s)")
+        return total_emails_sent == len(results)
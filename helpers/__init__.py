@@ -3,50 +3,70 @@ from datetime import datetime
 from typing import Any, Dict, Optional
 import re 
 
-def get_by_path(data: dict, path: str) -> Any:
-    """Get a nested value using dot notation and [index]. Returns KeyError/IndexError if absent."""
-    parts = re.split(r'\.(?![^\[]*\])', path)
-    cur = data
-    for p in parts:
-        m = re.match(r'(\w+)\[(\d+)\]', p)
+_PATH_SPLIT_RE = re.compile(r'\.(?![^\[]*\])')
+_INDEXED_KEY_RE = re.compile(r'(\w+)\[(\d+)\]')
+
+
+def compile_path(path: str) -> tuple:
+    """Pre-parse a dot/[index] path into a flat tuple of keys and list indexes.
+
+    'roleInfo.roles[0].name' -> ('roleInfo', 'roles', 0, 'name')
+    """
+    steps = []
+    for p in _PATH_SPLIT_RE.split(path):
+        m = _INDEXED_KEY_RE.match(p)
         if m:
-            key, idx = m.group(1), int(m.group(2))
-            cur = cur[key][idx]
+            steps.append(m.group(1))
+            steps.append(int(m.group(2)))
         else:
-            cur = cur[p]
+            steps.append(p)
+    return tuple(steps)
+
+def get_by_steps(data: dict, steps: tuple) -> Any:
+    """Get a nested value from a path compiled by compile_path. Raises KeyError/IndexError if absent."""
+    cur = data
+    for step in steps:
+        cur = cur[step]
     return cur
 
-def ensure_path_exists(data: dict, path: str):
-    """Ensure intermediate dicts exist for a dot path (for set_by_path)."""
-    parts = path.split(".")
+def get_by_path(data: dict, path: str) -> Any:
+    """Get a nested value using dot notation and [index]. Returns KeyError/IndexError if absent."""
+    return get_by_steps(data, compile_path(path))
+
+def ensure_parents_exist(data: dict, parents: tuple) -> dict:
+    """Ensure intermediate dicts exist for pre-split parent keys and return the innermost one."""
     cur = data
-    for p in parts[:-1]:
+    for p in parents:
         if p not in cur or not isinstance(cur[p], dict):
             cur[p] = {}
         cur = cur[p]
     return cur
 
+def ensure_path_exists(data: dict, path: str):
+    """Ensure intermediate dicts exist for a dot path (for set_by_path)."""
+    return ensure_parents_exist(data, path.split(".")[:-1])
+
 def set_by_path(data: dict, path: str, value: Any):
     """Set a nested value using dot notation. Creates intermediate dicts as needed."""
     cur = ensure_path_exists(data, path)
     last = path.split(".")[-1]
     cur[last] = value
 
+def append_to_list_by_parts(data: dict, parents: tuple, last: str, value: Any):
+    """Same as append_to_list_by_path, with the path already split into parents + last key."""
+    cur = ensure_parents_exist(data, parents)
+    if last not in cur or not isinstance(cur[last], list):
+        cur[last] = []
+    cur[last].append(value)
+
 def append_to_list_by_path(data: dict, path: str, value: Any):
     """
     Append a value to a list at `path`. Creates list and intermediate dicts as needed.
     path is dot notation to the list (e.g. 'skills' or 'company.skills').
     """
     parts = path.split(".")
-    cur = data
-    for p in parts[:-1]:
-        if p not in cur or not isinstance(cur[p], dict):
-            cur[p] = {}
-        cur = cur[p]
-    last = parts[-1]
-    if last not in cur or not isinstance(cur[last], list):
-        cur[last] = []
-    cur[last].append(value)
+    append_to_list_by_parts(data, parts[:-1], parts[-1], value)
+
 def parse_datetime(dt_str: Optional[str]) -> Optional[datetime]:
     if dt_str is None:
         return None
@@ -5,6 +5,8 @@ Transforms Boond opportunity structure into MissionRequestPending format.
 Uses mapper_to_mongo.py generic mapper engine with transformation functions.
 """
 
+from mappers import identity_transform
+
 ###############################################################################
 # Enumerations
 ###############################################################################
@@ -35,6 +37,17 @@ def transform_origin_type(origin_type_id):
         return "Unknown"
     return ORIGIN_TYPE_ENUM.get(origin_type_id, f"Unknown ({origin_type_id})")
 
+# List item transforms are module-level functions (not lambdas) so that the
+# mapping dicts stay picklable for map_many's process pool.
+
+def chatgpt_skill_transform(src, dst):
+    """Wrap a skill name extracted by ChatGPT into {name, seniority}"""
+    return {"name": src, "seniority": "Required"} if isinstance(src, str) else src
+
+def chatgpt_language_transform(src, dst):
+    """Wrap a language name extracted by ChatGPT into {language, level}"""
+    return {"language": src, "level": "Required"} if isinstance(src, str) else src
+
 ###############################################################################
 # Mapping dictionaries for mapper_to_mongo.py engine
 ###############################################################################
@@ -59,10 +72,16 @@ BOOND_TO_MONGO_MAPPING = {
     "data.attributes.title": "roleTitle",
     "data.attributes.description": "job_desc",
     "data.attributes.url": "job_url",
+
+    # ChatGPT analysis (set by filter_recent_opportunities) - overrides the raw description when present
+    "data.attributes.enhanced_description": "job_desc",
+    "data.attributes.extracted_rfp_type": "RFP_type",
     
     # dates
     "data.attributes.creationDate": "publishedAt",
     "data.attributes.deadline": "deadlineAt",
+    # Boond version the document was built from (compared by warm_skills_cache)
+    "data.attributes.updateDate": "boondUpdatedAt",
 
     # status
     "data.attributes.isActive": "isActive",
@@ -78,16 +97,16 @@ BOOND_TO_MONGO_MAPPING = {
 
 BOOND_LIST_MAPPINGS = {
     # skills: try from data.attributes.skills first
-    "data.attributes.skills": ("skills", {"name": "name", "level": "seniority"}, lambda src, dst: dst),
+    "data.attributes.skills": ("skills", {"name": "name", "level": "seniority"}, identity_transform),
 
     # skills from extracted_skills (parsed by ChatGPT) - will be merged in apply_boond_defaults
-    "data.attributes.extracted_skills": ("skills_from_chatgpt", {}, lambda src, dst: {"name": src, "seniority": "Required"} if isinstance(src, str) else src),
+    "data.attributes.extracted_skills": ("skills_from_chatgpt", {}, chatgpt_skill_transform),
 
     # languages: try from data.attributes.languages first
-    "data.attributes.languages": ("languages", {"language": "language", "level": "level"}, lambda src, dst: dst),
+    "data.attributes.languages": ("languages", {"language": "language", "level": "level"}, identity_transform),
     
     # languages from extracted_languages (parsed by ChatGPT) - will be merged in apply_boond_defaults  
-    "data.attributes.extracted_languages": ("languages_from_chatgpt", {}, lambda src, dst: {"language": src, "level": "Required"} if isinstance(src, str) else src),
+    "data.attributes.extracted_languages": ("languages_from_chatgpt", {}, chatgpt_language_transform),
 }
 
 
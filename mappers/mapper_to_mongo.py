@@ -1,64 +1,204 @@
-from helpers import get_by_path, set_by_path, append_to_list_by_path
-from typing import Any
+from helpers import (
+    compile_path,
+    get_by_steps,
+    ensure_parents_exist,
+    append_to_list_by_parts,
+)
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Any, Callable, Iterable, Iterator, Optional
 
 ###############################################################################
 # Mapper engine
 ###############################################################################
 
-def map_json(source: dict, mapping: dict, list_mappings: dict) -> dict:
-    result = {}
-
-    # 1) scalars/simple mappings
-    for src_path, dst_path in mapping.items():
-        try:
-            value = get_by_path(source, src_path)
-            # si on mappe isClosed -> isActive (bool invert), traitement possible ici
-            # Si besoin d'adaptations, on peut ajouter des règles spécifiques.
-            set_by_path(result, dst_path, value)
-        except Exception:
-            # champ absent -> on ignore (ou log)
-            continue
-
-    # 2) list mappings dynamiques
-    for src_list_path, (dst_list_path, item_map, transform_fn) in list_mappings.items():
-        try:
-            src_list = get_by_path(source, src_list_path)
-            # src_list peut être une liste d'items, ou pour languageGroups : une liste de groupes contenant 'languages' sub-lists
-            if not isinstance(src_list, list):
+LANGUAGE_GROUPS_PATH = "languageInfo.languageGroups"
+
+
+class CompiledMapper:
+    """
+    Plan pré-compilé pour un couple (mapping, list_mappings).
+
+    Les chemins source sont parsés une seule fois en tuples clé/index et les
+    chemins destination découpés en (parents, clé finale), ce qui sort re.split,
+    re.match et str.split de la boucle par document. Les dicts intermédiaires
+    du résultat restent créés à la demande : une section absente de la source
+    reste absente du résultat (apply_*_defaults s'appuie dessus).
+    """
+
+    def __init__(self, mapping: dict, list_mappings: dict = None):
+        self.mapping = mapping
+        self.list_mappings = list_mappings
+
+        self.scalar_plan = []
+        for src_path, dst_path in mapping.items():
+            dst_parts = dst_path.split(".")
+            self.scalar_plan.append((compile_path(src_path), tuple(dst_parts[:-1]), dst_parts[-1]))
+
+        self.list_plan = []
+        for src_list_path, (dst_list_path, item_map, transform_fn) in (list_mappings or {}).items():
+            dst_parts = dst_list_path.split(".")
+            self.list_plan.append((
+                compile_path(src_list_path),
+                tuple(dst_parts[:-1]),
+                dst_parts[-1],
+                tuple(item_map.items()),
+                transform_fn,
+                src_list_path == LANGUAGE_GROUPS_PATH,
+            ))
+
+    def map(self, source: dict) -> dict:
+        result = {}
+
+        # 1) scalars/simple mappings
+        for src_steps, dst_parents, dst_key in self.scalar_plan:
+            try:
+                value = get_by_steps(source, src_steps)
+                ensure_parents_exist(result, dst_parents)[dst_key] = value
+            except Exception:
+                # champ absent -> on ignore (ou log)
                 continue
 
-            # cas spécial: language groups -> on veut une liste plate de {language, level}
-            if src_list_path == "languageInfo.languageGroups":
-                # parcourir tous les groupes
-                for group in src_list:
-                    languages = group.get("languages", [])
-                    level = group.get("languageLevel") or group.get("languageLevelLabel") or None
-                    for lang in languages:
-                        # chaque 'lang' peut être string ou dict
-                        if isinstance(lang, dict):
-                            lang_name = lang.get("language") or lang.get("name") or lang
-                        else:
-                            lang_name = lang
-                        mapped_item = {"language": lang_name, "level": level}
-                        append_to_list_by_path(result, dst_list_path, mapped_item)
+        # 2) list mappings dynamiques
+        for src_steps, dst_parents, dst_key, item_map, transform_fn, is_language_groups in self.list_plan:
+            try:
+                src_list = get_by_steps(source, src_steps)
+                # src_list peut être une liste d'items, ou pour languageGroups : une liste de groupes contenant 'languages' sub-lists
+                if not isinstance(src_list, list):
+                    continue
+
+                # cas spécial: language groups -> on veut une liste plate de {language, level}
+                if is_language_groups:
+                    for group in src_list:
+                        languages = group.get("languages", [])
+                        level = group.get("languageLevel") or group.get("languageLevelLabel") or None
+                        for lang in languages:
+                            # chaque 'lang' peut être string ou dict
+                            if isinstance(lang, dict):
+                                lang_name = lang.get("language") or lang.get("name") or lang
+                            else:
+                                lang_name = lang
+                            mapped_item = {"language": lang_name, "level": level}
+                            append_to_list_by_parts(result, dst_parents, dst_key, mapped_item)
+                    continue
+
+                # cas général: src_list est liste d'objets simples (skills)
+                for item in src_list:
+                    mapped_item = {}
+                    # copier les champs selon item_map
+                    if isinstance(item, dict):
+                        for src_key, item_dst_key in item_map:
+                            if src_key in item:
+                                mapped_item[item_dst_key] = item[src_key]
+                    # appel du transform_fn pour modifications éventuelles
+                    mapped_item = transform_fn(item, mapped_item) or mapped_item
+                    append_to_list_by_parts(result, dst_parents, dst_key, mapped_item)
+
+            except Exception:
+                # si la liste n'existe pas ou autre erreur, on skip
                 continue
 
-            # cas général: src_list est liste d'objets simples (skills)
-            for item in src_list:
-                mapped_item = {}
-                # copier les champs selon item_map
-                for src_key, dst_key in item_map.items():
-                    # si src_key est présent dans item
-                    if isinstance(item, dict) and src_key in item:
-                        mapped_item[dst_key] = item[src_key]
-                # appel du transform_fn pour modifications éventuelles
-                mapped_item = transform_fn(item, mapped_item) or mapped_item
-                append_to_list_by_path(result, dst_list_path, mapped_item)
+        return result
+
+
+# Plans compilés, indexés par l'identité des dicts de mapping
+_COMPILED_MAPPERS = {}
+
+
+def compile_mapping(mapping: dict, list_mappings: dict = None) -> CompiledMapper:
+    """
+    Return the cached CompiledMapper for (mapping, list_mappings), compiling it on first use.
+
+    The cache is keyed by object identity: a mapping dict mutated in place after its
+    first use keeps its old plan, so build a new dict instead of editing one.
+    """
+    key = (id(mapping), id(list_mappings))
+    compiled = _COMPILED_MAPPERS.get(key)
+    # id() can be recycled once a dict is garbage collected, so double check identity
+    if compiled is None or compiled.mapping is not mapping or compiled.list_mappings is not list_mappings:
+        compiled = CompiledMapper(mapping, list_mappings)
+        _COMPILED_MAPPERS[key] = compiled
+    return compiled
+
+
+def map_json(source: dict, mapping: dict, list_mappings: dict) -> dict:
+    return compile_mapping(mapping, list_mappings).map(source)
+
+
+###############################################################################
+# Batch mapping
+###############################################################################
+
+# Set in each ProcessPoolExecutor worker by _init_map_worker
+_worker_plan = None
+
+
+def _apply_plan(compiled: CompiledMapper, source: dict, post: Optional[Callable]) -> dict:
+    mapped = compiled.map(source)
+    if post is not None:
+        mapped = post(mapped, source)
+    return mapped
+
+
+def _init_map_worker(mapping: dict, list_mappings: dict, post: Optional[Callable]):
+    global _worker_plan
+    _worker_plan = (compile_mapping(mapping, list_mappings), post)
+
+
+def _map_chunk(chunk: list) -> list:
+    compiled, post = _worker_plan
+    return [_apply_plan(compiled, source, post) for source in chunk]
+
+
+def map_many(
+    sources: Iterable[dict],
+    mapping: dict,
+    list_mappings: dict,
+    post: Optional[Callable[[dict, dict], dict]] = None,
+    workers: Optional[int] = None,
+    chunksize: int = 64,
+) -> Iterator[dict]:
+    """
+    Map a stream of source documents, yielding results in input order.
 
-        except Exception:
-            # si la liste n'existe pas ou autre erreur, on skip
-            continue
+    Each result is exactly `post(map_json(source, mapping, list_mappings), source)`
+    (post is typically apply_pro_unity_defaults or apply_boond_defaults).
 
-    return result
+    Args:
+        sources: Any iterable of source dicts; it is consumed lazily
+        mapping: Scalar mapping {src_path: dst_path}
+        list_mappings: List mappings {src_list_path: (dst_path, item_map, transform_fn)}
+        post: Optional post-mapping hook called as post(mapped, source)
+        workers: Fan out over a ProcessPoolExecutor with this many processes when > 1.
+                 mapping, list_mappings and post must then be picklable (module-level
+                 functions, no lambdas).
+        chunksize: Number of documents sent to a worker per task
 
+    Yields:
+        Mapped documents, in the same order as `sources`
+    """
+    if not workers or workers <= 1:
+        compiled = compile_mapping(mapping, list_mappings)
+        for source in sources:
+            yield _apply_plan(compiled, source, post)
+        return
 
+    source_iter = iter(sources)
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_map_worker,
+        initargs=(mapping, list_mappings, post),
+    ) as executor:
+        # Keep a bounded window of chunks in flight so huge inputs are streamed, not loaded
+        pending = deque()
+        max_pending = workers * 2
+        while True:
+            while len(pending) < max_pending:
+                chunk = list(islice(source_iter, chunksize))
+                if not chunk:
+                    break
+                pending.append(executor.submit(_map_chunk, chunk))
+            if not pending:
+                break
+            yield from pending.popleft().result()
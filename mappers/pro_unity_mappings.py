@@ -1,3 +1,4 @@
+from mappers import identity_transform
 
 
 MAPPING = {
@@ -45,10 +46,10 @@ MAPPING = {
 
 LIST_MAPPINGS = {
     # skills: transform chaque élément {'name':..., 'seniority':...} -> same structure in dest 'skills'
-    "skillInfo.skills": ("skills", {"name": "name", "seniority": "seniority"}, lambda src, dst: dst),
+    "skillInfo.skills": ("skills", {"name": "name", "seniority": "seniority"}, identity_transform),
 
 
-    "languageInfo.languageGroups": ("languages", {"language": "language", "level": "level"}, lambda src, dst: dst),
+    "languageInfo.languageGroups": ("languages", {"language": "language", "level": "level"}, identity_transform),
 
 }
 
@@ -7,37 +7,173 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 from app.job_mail_exporter import JobMailExporter  
 from app.subscription_notifier import SubscriptionNotifier
 from app.boond_manager_extractor import (
+    BOOND_MAX_IN_FLIGHT,
+    analyze_opportunity,
+    create_boond_async_client,
+    create_boond_session,
     fetch_boond_opportunities,
+    fetch_boond_opportunities_async,
+    fetch_opportunity_details,
     filter_recent_opportunities,
-    transform_boond_to_mongo_format
+    filter_recent_opportunities_async,
+    forget_degraded_fingerprints,
+    select_recent_ids,
+    skip_unchanged_opportunities,
+    transform_boond_to_mongo_format,
+    warm_skills_cache
 )
-from app.job_completer import JobDescriptionEnhancer
+from app.job_completer import BatchAnalysisJob, EnrichmentStage, JobDescriptionEnhancer
+from app.pipeline import Pipeline, Stage
+from app.llm_cache import LLMResultCache
+from app.fingerprint_store import FingerprintStore, make_fingerprint
+from app.checkpoint_store import CheckpointStore
+from app.api_client import AsyncFuturScamApiClient, FuturScamApiClient
+from app.connect_to_mongo import MongoJsonInserter
 import mappers.pro_unity_mappings as pum
 import mappers.mapper_to_mongo as ftm
-from helpers import to_serializable
 import os
 import json
+import time
+import asyncio
+import signal
+import argparse
+import threading
+import traceback
+import httpx
+from contextlib import contextmanager
 import requests
 from datetime import datetime, timezone, date, timedelta
 import params
 
 
-# Path to last execution timestamp file
+# Where RFP documents are written: "api" (REST /mongodb endpoint) or "mongo" (direct bulk_write)
+ETL_SINK = getattr(params, "ETL_SINK", "api")
+
+# Number of documents per bulk_write batch when upserting directly through MongoJsonInserter
+MONGO_BULK_BATCH_SIZE = getattr(params, "MONGO_BULK_BATCH_SIZE", 500)
+
+# Write concern for the "mongo" sink, e.g. {"w": 1} or {"w": "majority", "j": True}
+MONGO_WRITE_CONCERN = getattr(params, "MONGO_WRITE_CONCERN", {"w": 1})
+
+# Write mail attachments to app/attachments before mapping them (crash-safe spool) instead of streaming them
+MAIL_SPOOL_TO_DISK = getattr(params, "MAIL_SPOOL_TO_DISK", False)
+
+# Incremental mailbox sync through Graph messages/delta; deltaLinks are kept in GRAPH_DELTA_STATE_FILE
+MAIL_DELTA_SYNC = getattr(params, "MAIL_DELTA_SYNC", False)
+GRAPH_DELTA_STATE_FILE = Path(__file__).parent.parent / ".graph_delta_tokens.json"
+
+# Serialized MSAL token cache: a run started while the previous Graph token is still valid reuses it
+MSAL_TOKEN_CACHE_FILE = Path(__file__).parent.parent / ".msal_token_cache.json"
+
+# Lock held by a running ETL (single run or daemon) so two runs never overlap
+ETL_LOCK_FILE = Path(__file__).parent.parent / ".etl.lock"
+
+# --daemon: minutes between two runs of each source
+DAEMON_INTERVALS_MINUTES = {
+    "mail": getattr(params, "DAEMON_MAIL_INTERVAL_MINUTES", 15),
+    "boond": getattr(params, "DAEMON_BOOND_INTERVAL_MINUTES", 60),
+    "cleanup": getattr(params, "DAEMON_CLEANUP_INTERVAL_MINUTES", 24 * 60),
+}
+
+# Run mode of a single ETL run: "sequential" (mail, then Boond), "pipeline" (staged, sources overlap)
+# or "async" (asyncio, every HTTP call on one event loop)
+ETL_MODE = getattr(params, "ETL_MODE", "sequential")
+
+# --mode pipeline: bounded queue size between stages, worker counts and load batch size
+PIPELINE_QUEUE_SIZE = getattr(params, "PIPELINE_QUEUE_SIZE", 100)
+PIPELINE_MAP_WORKERS = getattr(params, "PIPELINE_MAP_WORKERS", 2)
+PIPELINE_LOAD_BATCH_SIZE = getattr(params, "PIPELINE_LOAD_BATCH_SIZE", 50)
+
+# --mode async: max concurrent calls to the local REST API, and ChatGPT calls in flight
+ASYNC_API_MAX_CONNECTIONS = getattr(params, "ASYNC_API_MAX_CONNECTIONS", 100)
+ASYNC_OPENAI_MAX_CONCURRENCY = getattr(params, "ASYNC_OPENAI_MAX_CONCURRENCY", 16)
+
+# Per-source watermarks and items saved since them (SQLite): an interrupted run resumes where it stopped.
+# Opened by open_state_stores() (called by main), not on import.
+CHECKPOINT_FILE = Path(
+    getattr(params, "CHECKPOINT_FILE", Path(__file__).parent.parent / ".etl_checkpoints.sqlite3")
+).resolve()
+CHECKPOINT_SOURCES = ("mail", "boond")
+checkpoints = None
+
+# Single last execution timestamp of older versions, migrated into the checkpoint store on first read
 LAST_EXECUTION_FILE = Path(__file__).parent.parent / ".last_execution"
 
+# Boond references of closed opportunities already removed from MongoDB
+PURGED_REFERENCES_FILE = Path(__file__).parent.parent / ".boond_purged_references.json"
+
+# Shared client for the local REST API (/mongodb, /users, /mail): one pooled keep-alive session per run
+api_client = FuturScamApiClient(
+    api_url=getattr(params, "API_URL", "http://localhost:8000"),
+    pool_size=getattr(params, "API_POOL_SIZE", 10),
+    timeout=getattr(params, "API_TIMEOUT", 30),
+    retries=getattr(params, "API_RETRIES", 3)
+)
+
+# Persistent cache of ChatGPT results (unchanged descriptions skip the API call)
+LLM_CACHE_FILE = Path(__file__).parent.parent / ".llm_cache.sqlite3"
+
+# State of the OpenAI Batch re-analysis job (--batch-reclassify), kept across runs to resume it
+BATCH_STATE_FILE = Path(__file__).parent.parent / ".openai_batch_state.json"
+
 # Initialize Job Description Enhancer (only if API key is provided)
 job_enhancer = None
+llm_cache = None
 if params.OPENAI_API_KEY and params.OPENAI_API_KEY.strip():
     try:
-        job_enhancer = JobDescriptionEnhancer(api_key=params.OPENAI_API_KEY)
+        llm_cache = LLMResultCache(
+            LLM_CACHE_FILE,
+            max_entries=getattr(params, "LLM_CACHE_MAX_ENTRIES", 5000),
+            # Boond bumps updateDate on trivial edits: extracted skills stay valid for a while
+            ttl_seconds={
+                "skills": getattr(params, "SKILLS_CACHE_TTL_DAYS", 30) * 86400,
+                "analysis": getattr(params, "SKILLS_CACHE_TTL_DAYS", 30) * 86400
+            }
+        )
+        job_enhancer = JobDescriptionEnhancer(
+            api_key=params.OPENAI_API_KEY,
+            cache=llm_cache,
+            requests_per_minute=getattr(params, "OPENAI_REQUESTS_PER_MINUTE", 500),
+            tokens_per_minute=getattr(params, "OPENAI_TOKENS_PER_MINUTE", 30000),
+            max_retries=getattr(params, "OPENAI_MAX_RETRIES", 5),
+            base_url=getattr(params, "OPENAI_BASE_URL", None),
+            max_input_tokens=getattr(params, "OPENAI_MAX_INPUT_TOKENS", 3000)
+        )
         print("[INIT] ChatGPT Job Enhancer initialized")
     except Exception as e:
         print(f"[WARN] Could not initialize Job Enhancer: {e}")
 
+# Fingerprints of the loaded Boond opportunities: unchanged ones skip ChatGPT and the write.
+# Entries older than BOOND_FINGERPRINT_MAX_AGE_DAYS are ignored (periodic full refresh).
+# Opened by open_state_stores() (called by main), not on import.
+BOOND_FINGERPRINT_FILE = Path(
+    getattr(params, "BOOND_FINGERPRINT_FILE", Path(__file__).parent.parent / ".boond_fingerprints.sqlite3")
+).resolve()
+boond_fingerprints = None
+
+# Concurrent ChatGPT calls (rate limits and retries are enforced by the shared job_enhancer)
+enrichment_stage = EnrichmentStage(max_concurrency=getattr(params, "OPENAI_MAX_CONCURRENCY", 4))
+
+
+def open_state_stores():
+    """Open the SQLite state stores of a run (once per process) from their configured absolute paths."""
+    global checkpoints, boond_fingerprints
+    if checkpoints is None:
+        checkpoints = CheckpointStore(CHECKPOINT_FILE)
+    if boond_fingerprints is None and getattr(params, "BOOND_SKIP_UNCHANGED", True):
+        boond_fingerprints = FingerprintStore(
+            BOOND_FINGERPRINT_FILE,
+            max_age_seconds=getattr(params, "BOOND_FINGERPRINT_MAX_AGE_DAYS", 30) * 86400
+        )
+
 
 def enhance_rfp_with_chatgpt(rfp_document: dict) -> dict:
     """
     Enhance RFP document with ChatGPT to add RFP_type and replace job_desc with enriched HTML.
+    Uses the single-call JobDescriptionEnhancer.analyze_job, which also fills skills and
+    languages when the source did not provide any.
+    Documents that already carry an RFP_type (Boond opportunities analyzed in
+    filter_recent_opportunities) are returned unchanged.
     
     Args:
         rfp_document: The RFP document to enhance
@@ -49,105 +185,134 @@ def enhance_rfp_with_chatgpt(rfp_document: dict) -> dict:
         print("[SKIP] Job enhancement skipped (no OpenAI API key)")
         return rfp_document
     
+    if rfp_document.get("RFP_type"):
+        print(f"[SKIP] Job {rfp_document.get('job_id', 'unknown')} already analyzed")
+        return rfp_document
+    
     try:
         job_desc = rfp_document.get("job_desc", "")
         if not job_desc:
             print("[SKIP] No job_desc to enhance")
             return rfp_document
         
-        print(f"[CHATGPT] Enhancing job description for job_id: {rfp_document.get('job_id', 'unknown')}...")
+        print(f"[CHATGPT] Analyzing job description for job_id: {rfp_document.get('job_id', 'unknown')}...")
         
-        # Call ChatGPT to enhance the job description
-        enhanced_data = job_enhancer.enhance_job_description_html(job_desc)
-        
-        # Replace job_desc with enhanced version and add RFP_type
-        rfp_document["RFP_type"] = enhanced_data.get("RFP_type", "Autre")
-        rfp_document["job_desc"] = enhanced_data.get("job_description", job_desc)
-        
-        print(f"[OK] Job enhanced - RFP_type: {rfp_document['RFP_type']}")
+        # One ChatGPT call for RFP_type, enriched HTML, skills and languages
+        analysis = job_enhancer.analyze_job(job_desc)
+        return apply_job_analysis(rfp_document, analysis)
         
+    except Exception as e:
+        print(f"[ERROR] Error enhancing job description: {e}")
+        return rfp_document
+
+
+async def enhance_rfp_with_chatgpt_async(rfp_document: dict) -> dict:
+    """Async enhance_rfp_with_chatgpt (JobDescriptionEnhancer.analyze_job_async), same rules."""
+    if not job_enhancer:
+        print("[SKIP] Job enhancement skipped (no OpenAI API key)")
         return rfp_document
+    
+    if rfp_document.get("RFP_type"):
+        print(f"[SKIP] Job {rfp_document.get('job_id', 'unknown')} already analyzed")
+        return rfp_document
+    
+    try:
+        job_desc = rfp_document.get("job_desc", "")
+        if not job_desc:
+            print("[SKIP] No job_desc to enhance")
+            return rfp_document
         
+        print(f"[CHATGPT] Analyzing job description for job_id: {rfp_document.get('job_id', 'unknown')}...")
+        analysis = await job_enhancer.analyze_job_async(job_desc)
+        return apply_job_analysis(rfp_document, analysis)
+    
     except Exception as e:
         print(f"[ERROR] Error enhancing job description: {e}")
         return rfp_document
 
 
-def get_last_execution_time() -> datetime:
+def apply_job_analysis(rfp_document: dict, analysis: dict) -> dict:
+    """Copy an analyze_job result into the RFP document."""
+    job_desc = rfp_document.get("job_desc", "")
+    
+    # Replace job_desc with enhanced version and add RFP_type
+    rfp_document["RFP_type"] = analysis.get("RFP_type", "Autre")
+    rfp_document["job_desc"] = analysis.get("job_description", job_desc)
+    
+    # Only fill skills/languages the source did not provide
+    if not rfp_document.get("skills") and analysis.get("skills"):
+        rfp_document["skills"] = [{"name": skill, "seniority": "Required"} for skill in analysis["skills"]]
+    if not rfp_document.get("languages") and analysis.get("languages"):
+        rfp_document["languages"] = [{"language": lang, "level": "Required"} for lang in analysis["languages"]]
+    
+    print(f"[OK] Job enhanced - RFP_type: {rfp_document['RFP_type']}")
+    
+    return rfp_document
+
+
+def get_source_watermarks() -> dict:
     """
-    Read the last execution timestamp from file.
-    Returns the timestamp or current time - 1 hour if file doesn't exist.
+    Read the watermark of each source (mail, boond) from the checkpoint store.
+    A source without watermark starts from current time - 1 hour; the .last_execution
+    file of older versions seeds both sources on first read.
     All timestamps are timezone-aware (UTC).
     """
+    default = datetime.now(timezone.utc) - timedelta(hours=1)
     try:
-        if LAST_EXECUTION_FILE.exists():
-            with open(LAST_EXECUTION_FILE, "r") as f:
-                timestamp_str = f.read().strip()
-                dt = datetime.fromisoformat(timestamp_str)
-                
-                # Ensure the datetime is timezone-aware (UTC)
-                if dt.tzinfo is None:
-                    dt = dt.replace(tzinfo=timezone.utc)
-                
-                return dt
-        else:
-            # First run - default to 1 hour ago
-            return datetime.now(timezone.utc) - timedelta(hours=1)
+        if checkpoints.migrate_legacy_file(LAST_EXECUTION_FILE, CHECKPOINT_SOURCES):
+            print(f"[OK] {LAST_EXECUTION_FILE.name} migrated to {CHECKPOINT_FILE.name}")
+        return {source: checkpoints.get_watermark(source, default) for source in CHECKPOINT_SOURCES}
     except Exception as e:
-        print(f"[WARN] Error reading last execution time: {e}")
-        return datetime.now(timezone.utc) - timedelta(hours=1)
+        print(f"[WARN] Error reading checkpoints: {e}")
+        return {source: default for source in CHECKPOINT_SOURCES}
 
 
-def save_last_execution_time(timestamp: datetime):
+def save_source_watermark(source: str, timestamp: datetime):
     """
-    Save the execution timestamp to file.
+    Advance the watermark of `source`, which also clears the items saved since the previous one.
     Adds 1 millisecond to avoid processing the same data twice.
     """
     try:
-        # Add 1 millisecond to the timestamp
         next_timestamp = timestamp + timedelta(milliseconds=1)
+        checkpoints.set_watermark(source, next_timestamp)
+        print(f"[OK] {source} watermark saved: {next_timestamp.isoformat()}")
+    except Exception as e:
+        print(f"[ERROR] Error saving {source} watermark: {e}")
+
+
+def apply_budget_rule(rfp_document: dict) -> dict:
+    """Apply budget rule to the daily rate: -15% with min 65€ and max 120€."""
+    if "conditions" in rfp_document and "dailyRate" in rfp_document["conditions"]:
+        daily_rate = rfp_document["conditions"]["dailyRate"]
         
-        with open(LAST_EXECUTION_FILE, "w") as f:
-            f.write(next_timestamp.isoformat())
+        # Apply to min rate
+        if daily_rate.get("min") is not None:
+            original_min = daily_rate["min"]
+            calculated_min = original_min * 0.85  # -15%
+            rfp_document["conditions"]["dailyRate"]["min"] = max(65, min(120, calculated_min))
         
-        print(f"[OK] Last execution time saved: {next_timestamp.isoformat()}")
-    except Exception as e:
-        print(f"[ERROR] Error saving last execution time: {e}")
+        # Apply to max rate
+        if daily_rate.get("max") is not None:
+            original_max = daily_rate["max"]
+            calculated_max = original_max * 0.85  # -15%
+            rfp_document["conditions"]["dailyRate"]["max"] = max(65, min(120, calculated_max))
+    
+    return rfp_document
 
 
-def save_to_mongodb_api(rfp_document: dict, api_url: str = "http://localhost:8000") -> tuple:
-    """Save RFP document to MongoDB via API POST /mongodb endpoint. 
-    Falls back to UPDATE if document already exists (duplicate key error).
-    Returns: (success: bool, rfp_document: dict or None)
+def upsert_rfp_via_api(rfp_document: dict, api: FuturScamApiClient = None) -> str:
+    """POST the document to /mongodb, falling back to PUT if it already exists (duplicate key error).
+    Returns: "created", "updated" or "failed"
     """
+    api = api or api_client
     try:
-        # Apply budget rule: -15% with min 65€ and max 120€
-        if "conditions" in rfp_document and "dailyRate" in rfp_document["conditions"]:
-            daily_rate = rfp_document["conditions"]["dailyRate"]
-            
-            # Apply to min rate
-            if daily_rate.get("min") is not None:
-                original_min = daily_rate["min"]
-                calculated_min = original_min * 0.85  # -15%
-                rfp_document["conditions"]["dailyRate"]["min"] = max(65, min(120, calculated_min))
-            
-            # Apply to max rate
-            if daily_rate.get("max") is not None:
-                original_max = daily_rate["max"]
-                calculated_max = original_max * 0.85  # -15%
-                rfp_document["conditions"]["dailyRate"]["max"] = max(65, min(120, calculated_max))
-        
         # Try POST (create)
-        response = requests.post(
-            f"{api_url}/mongodb",
-            json=rfp_document,
-            timeout=30
-        )
+        response = api.create_rfp(rfp_document)
         
         if response.status_code == 200:
             result = response.json()
             print(f"[OK] RFP created successfully: {result.get('id', 'Unknown ID')}")
-            return (True, rfp_document)
+            return "created"
         elif response.status_code == 400:
             # Check if it's a duplicate key error
             response_text = response.text.lower()
@@ -157,40 +322,249 @@ def save_to_mongodb_api(rfp_document: dict, api_url: str = "http://localhost:800
                 # Try UPDATE instead
                 job_id = rfp_document.get('job_id')
                 if job_id:
-                    update_response = requests.put(
-                        f"{api_url}/mongodb/{job_id}",
-                        json=rfp_document,
-                        timeout=30
-                    )
+                    update_response = api.update_rfp(job_id, rfp_document)
                     
                     if update_response.status_code in [200, 204]:
                         print(f"[OK] RFP updated successfully: {job_id}")
-                        return (True, rfp_document)
+                        return "updated"
                     else:
                         print(f"[ERROR] Failed to update RFP: status {update_response.status_code}")
                         print(f"Response: {update_response.text}")
-                        return (False, None)
+                        return "failed"
                 else:
                     print(f"[ERROR] No job_id found for update fallback")
-                    return (False, None)
+                    return "failed"
             else:
                 print(f"[ERROR] MongoDB API error: status {response.status_code}")
                 print(f"Response: {response.text}")
-                return (False, None)
+                return "failed"
         else:
             print(f"[ERROR] MongoDB API error: status {response.status_code}")
             print(f"Response: {response.text}")
-            return (False, None)
+            return "failed"
     except requests.RequestException as e:
         print(f"[ERROR] Error connecting to MongoDB API: {e}")
+        return "failed"
+
+
+async def upsert_rfp_via_api_async(rfp_document: dict, api: AsyncFuturScamApiClient) -> str:
+    """Async upsert_rfp_via_api: POST to /mongodb, PUT on duplicate key.
+    Returns: "created", "updated" or "failed"
+    """
+    try:
+        response = await api.create_rfp(rfp_document)
+        
+        if response.status_code == 200:
+            print(f"[OK] RFP created successfully: {response.json().get('id', 'Unknown ID')}")
+            return "created"
+        
+        response_text = response.text.lower()
+        if response.status_code != 400 or not ("duplicate key" in response_text or "e11000" in response_text):
+            print(f"[ERROR] MongoDB API error: status {response.status_code}")
+            print(f"Response: {response.text}")
+            return "failed"
+        
+        job_id = rfp_document.get('job_id')
+        if not job_id:
+            print(f"[ERROR] No job_id found for update fallback")
+            return "failed"
+        
+        print(f"[RETRY] Document already exists, attempting UPDATE with job_id: {job_id}")
+        update_response = await api.update_rfp(job_id, rfp_document)
+        if update_response.status_code in [200, 204]:
+            print(f"[OK] RFP updated successfully: {job_id}")
+            return "updated"
+        print(f"[ERROR] Failed to update RFP: status {update_response.status_code}")
+        print(f"Response: {update_response.text}")
+        return "failed"
+    except httpx.HTTPError as e:
+        print(f"[ERROR] Error connecting to MongoDB API: {e}")
+        return "failed"
+    except ValueError as e:
+        # Non-JSON body: requests raises a RequestException there, so the sync version fails the document too
+        print(f"[ERROR] Invalid MongoDB API response: {e}")
+        return "failed"
+
+
+async def save_to_mongodb_api_async(rfp_document: dict, api: AsyncFuturScamApiClient) -> tuple:
+    """Async save_to_mongodb_api. Returns: (success: bool, rfp_document: dict or None)"""
+    apply_budget_rule(rfp_document)
+    status = await upsert_rfp_via_api_async(rfp_document, api)
+    if status == "failed":
         return (False, None)
+    return (True, rfp_document)
+
 
+def record_boond_fingerprints(saved_rfps: list):
+    """Record the fingerprints of the saved Boond RFPs (job_id is the Boond reference)."""
+    if boond_fingerprints is not None:
+        boond_fingerprints.commit("boond", [rfp_document.get("job_id") for rfp_document in saved_rfps])
 
-def cleanup_expired_rfps(api_url: str = "http://localhost:8000") -> int:
-    """Get all RFPs and delete those with deadlineAt < today()."""
+
+def record_saved_items(source: str, saved_rfps: list):
+    """Checkpoint the RFPs of `source` just saved (and record the Boond fingerprints)."""
+    checkpoints.mark_done(source, saved_rfps)
+    if source == "boond":
+        record_boond_fingerprints(saved_rfps)
+
+
+def iter_save_batches(rfp_documents: list, inserter: MongoJsonInserter = None):
+    """Split documents to enhance and save into chunks: one bulk batch (MONGO_BULK_BATCH_SIZE) for the
+    "mongo" sink, one round of concurrent ChatGPT calls for the REST API, which saves document by document."""
+    batch_size = MONGO_BULK_BATCH_SIZE if inserter is not None else enrichment_stage.max_concurrency
+    for start in range(0, len(rfp_documents), batch_size):
+        yield rfp_documents[start:start + batch_size]
+
+
+def skip_saved_mail_missions(email_missions: list) -> list:
+    """Drop the mapped mail RFPs that an interrupted run already saved since the mail watermark.
+    Checked before the ChatGPT enhancement; the version is the fingerprint of the mapped document."""
+    pending = []
+    for mission in email_missions:
+        job_id = mission.get("job_id")
+        if job_id and checkpoints.check("mail", job_id, make_fingerprint(mission)):
+            print(f"[SKIP] Mail RFP {job_id} already saved by the interrupted run")
+            continue
+        pending.append(mission)
+    return pending
+
+
+def with_resumed_items(source: str, saved_rfps: list) -> list:
+    """Append the RFPs of `source` saved by the interrupted run, so they are still notified."""
+    resumed = checkpoints.take_resumed(source)
+    if resumed:
+        print(f"[RESUME] {len(resumed)} {source} RFPs were already saved by the interrupted run")
+    return saved_rfps + resumed
+
+
+def save_to_mongodb_api(rfp_document: dict, api: FuturScamApiClient = None) -> tuple:
+    """Save RFP document to MongoDB via API POST /mongodb endpoint. 
+    Falls back to UPDATE if document already exists (duplicate key error).
+    Returns: (success: bool, rfp_document: dict or None)
+    """
+    apply_budget_rule(rfp_document)
+    status = upsert_rfp_via_api(rfp_document, api)
+    if status == "failed":
+        return (False, None)
+    return (True, rfp_document)
+
+
+def save_many_to_mongodb(rfp_documents: list, inserter: MongoJsonInserter = None, api: FuturScamApiClient = None,
+                         batch_size: int = MONGO_BULK_BATCH_SIZE, on_saved=None) -> dict:
+    """Save a list of RFP documents, applying the budget rule to each.
+    
+    With a MongoJsonInserter, documents are upserted by job_id in bulk_write batches
+    (one round-trip per batch). Without one, the REST API is the target and each
+    document takes the same POST-then-PUT path as save_to_mongodb_api.
+    on_saved(saved documents), when given, is called after every bulk batch (REST API:
+    every document), so the caller can checkpoint what is written before a later failure.
+    
+    Returns: report dict with results [{job_id, status, error}] in input order,
+    created/updated/failed counts and `saved`, the list of saved documents.
+    """
+    if inserter is not None:
+        report = {"results": [], "created": 0, "updated": 0, "failed": 0, "unacknowledged": 0,
+                  "matched": 0, "upserted": 0, "modified": 0}
+        for start in range(0, len(rfp_documents), batch_size):
+            batch = rfp_documents[start:start + batch_size]
+            for rfp_document in batch:
+                apply_budget_rule(rfp_document)
+            batch_report = inserter.bulk_upsert(batch, batch_size=batch_size)
+            for key, value in batch_report.items():
+                if key == "results":
+                    report["results"].extend(value)
+                else:
+                    report[key] = report.get(key, 0) + value
+            for entry in batch_report["results"]:
+                if entry["status"] == "failed":
+                    print(f"[ERROR] Failed to upsert RFP {entry['job_id']}: {entry['error']}")
+            if on_saved is not None:
+                on_saved([rfp_document for rfp_document, entry in zip(batch, batch_report["results"])
+                          if entry["status"] != "failed"])
+    else:
+        report = {"results": [], "created": 0, "updated": 0, "failed": 0, "unacknowledged": 0}
+        for rfp_document in rfp_documents:
+            apply_budget_rule(rfp_document)
+            status = upsert_rfp_via_api(rfp_document, api)
+            report["results"].append({"job_id": rfp_document.get("job_id"), "status": status, "error": None})
+            report[status] += 1
+            if on_saved is not None and status != "failed":
+                on_saved([rfp_document])
+        # The REST API does not tell whether an update changed anything: count every update as modified
+        report["matched"] = report["updated"]
+        report["upserted"] = report["created"]
+        report["modified"] = report["updated"]
+    
+    report["saved"] = [
+        rfp_document for rfp_document, entry in zip(rfp_documents, report["results"])
+        if entry["status"] != "failed"
+    ]
+    print(f"[MONGODB] {report['created']} created, {report['updated']} updated, {report['failed']} failed")
+    return report
+
+
+def open_sink_inserter(sink: str = ETL_SINK):
+    """Return a MongoJsonInserter for the "mongo" sink (to be closed by the caller), or None for "api"."""
+    if sink == "mongo":
+        print(f"[MONGODB] Writing directly to MongoDB (write concern: {MONGO_WRITE_CONCERN})")
+        return MongoJsonInserter(params.MONGO_URI, write_concern=MONGO_WRITE_CONCERN)
+    if sink != "api":
+        raise ValueError(f"Unknown sink '{sink}' (expected 'api' or 'mongo')")
+    return None
+
+
+@contextmanager
+def maintenance_inserter(inserter: MongoJsonInserter = None):
+    """Yield `inserter`, or (with the "api" sink) a MongoJsonInserter on params.MONGO_URI opened for
+    server-side deletions, whatever the sink. Yields None if MongoDB cannot be reached: the caller
+    then falls back to the REST API."""
+    if inserter is not None:
+        yield inserter
+        return
+    try:
+        owned = MongoJsonInserter(params.MONGO_URI)
+    except (AttributeError, RuntimeError) as e:
+        print(f"[WARN] MongoDB not reachable for the cleanup, using the REST API: {e}")
+        yield None
+        return
+    with owned:
+        yield owned
+
+
+def add_report_counts(totals: dict, report: dict):
+    """Accumulate the matched/upserted/modified counts of a save_many_to_mongodb report."""
+    for key in ("matched", "upserted", "modified"):
+        totals[key] = totals.get(key, 0) + report.get(key, 0)
+
+
+def cleanup_expired_rfps(api: FuturScamApiClient = None, inserter: MongoJsonInserter = None,
+                         dry_run: bool = False) -> int:
+    """Delete RFPs with deadlineAt < today().
+    
+    The deletion runs server-side as a single delete_many (indexed on deadlineAt), so its
+    cost does not grow with the collection; with the "api" sink a MongoJsonInserter is
+    opened for it (see maintenance_inserter). Only if MongoDB cannot be reached is every
+    RFP fetched from the REST API and expired ones deleted one by one.
+    With dry_run, expired RFPs are only counted.
+    Returns the number of RFPs deleted (or that would be deleted).
+    """
+    with maintenance_inserter(inserter) as cleanup_inserter:
+        if cleanup_inserter is not None:
+            try:
+                expired_count = cleanup_inserter.delete_expired(dry_run=dry_run)
+            except RuntimeError as e:
+                print(f"[WARN] Error during cleanup: {e}")
+                return 0
+            if dry_run:
+                print(f"[CLEANUP] Dry run: {expired_count} expired RFPs would be deleted")
+            elif expired_count > 0:
+                print(f"[CLEANUP] Deleted {expired_count} expired RFPs")
+            return expired_count
+    
+    api = api or api_client
     try:
         # Get all RFPs
-        response = requests.get(f"{api_url}/mongodb", timeout=30)
+        response = api.list_rfps()
         
         if response.status_code != 200:
             print(f"[WARN] Failed to get all RFPs: status {response.status_code}")
@@ -212,11 +586,15 @@ def cleanup_expired_rfps(api_url: str = "http://localhost:8000") -> int:
                 except (ValueError, AttributeError):
                     continue
         
+        if dry_run:
+            print(f"[CLEANUP] Dry run: {len(expired_ids)} expired RFPs would be deleted")
+            return len(expired_ids)
+        
         # Delete expired RFPs
         deleted_count = 0
         for rfp_id in expired_ids:
             try:
-                delete_response = requests.delete(f"{api_url}/mongodb/{rfp_id}", timeout=30)
+                delete_response = api.delete_rfp(rfp_id)
                 if delete_response.status_code in [200, 204]:
                     deleted_count += 1
                     print(f"[OK] Deleted expired RFP: {rfp_id}")
@@ -234,10 +612,46 @@ def cleanup_expired_rfps(api_url: str = "http://localhost:8000") -> int:
         return 0
 
 
-def cleanup_closed_boond_rfps(boond_data: dict, api_url: str = "http://localhost:8000") -> int:
-    """Delete RFPs from MongoDB if their Boond state != 'open' (0)."""
+def load_purged_references() -> set:
+    """Read the Boond references already removed from MongoDB by previous runs."""
     try:
-        deleted_count = 0
+        if PURGED_REFERENCES_FILE.exists():
+            with open(PURGED_REFERENCES_FILE, "r", encoding="utf-8") as f:
+                return set(json.load(f))
+    except Exception as e:
+        print(f"[WARN] Error reading purged Boond references: {e}")
+    return set()
+
+
+def save_purged_references(references: set):
+    """Persist the set of purged Boond references (written to a temp file, then swapped in)."""
+    try:
+        tmp_file = PURGED_REFERENCES_FILE.with_suffix(".tmp")
+        with open(tmp_file, "w", encoding="utf-8") as f:
+            json.dump(sorted(references), f)
+        os.replace(tmp_file, PURGED_REFERENCES_FILE)
+    except Exception as e:
+        print(f"[ERROR] Error saving purged Boond references: {e}")
+
+
+def cleanup_closed_boond_rfps(boond_data: dict, api: FuturScamApiClient = None,
+                              inserter: MongoJsonInserter = None) -> int:
+    """Delete RFPs from MongoDB if their Boond state != 'open' (0).
+    
+    `boond_data` must be the full listing (no cutoff): an opportunity closed before the
+    cutoff would otherwise never be seen. References purged by a previous run are skipped
+    (the set is kept in PURGED_REFERENCES_FILE, and a reference leaves it again if its
+    opportunity is reopened). The remaining ones are deleted with one batched delete_many
+    ($in on job_id), whatever the sink (see maintenance_inserter); one DELETE per reference
+    through the REST API only if MongoDB cannot be reached.
+    The fingerprints of references entering or leaving the purged set are forgotten, so a
+    reopened opportunity is always written back even if its content did not change.
+    """
+    api = api or api_client
+    try:
+        purged = load_purged_references()
+        purged_before = set(purged)
+        to_delete = {}
         
         for item in boond_data.get("data", []):
             # Get reference (maps to job_id in MongoDB)
@@ -249,23 +663,45 @@ def cleanup_closed_boond_rfps(boond_data: dict, api_url: str = "http://localhost
                 if not reference:
                     print(f"[WARN] Skipping item without reference (state: {state})")
                     continue
-                    
+                if reference not in purged:
+                    to_delete[reference] = state
+            elif reference in purged:
+                # Reopened opportunity: it must be purged again if it closes later
+                purged.discard(reference)
+        
+        deleted_count = 0
+        cleanup_inserter = None
+        if to_delete:
+            with maintenance_inserter(inserter) as cleanup_inserter:
+                if cleanup_inserter is not None:
+                    try:
+                        deleted_count = cleanup_inserter.delete_by_job_ids(to_delete)
+                        purged.update(to_delete)
+                        print(f"[OK] Batched delete of {len(to_delete)} closed Boond references ({deleted_count} found)")
+                    except RuntimeError as e:
+                        print(f"[WARN] Error deleting closed Boond RFPs: {e}")
+        if cleanup_inserter is None:
+            for reference, state in to_delete.items():
                 try:
                     # Delete by job_id (which is the Boond reference)
-                    delete_response = requests.delete(
-                        f"{api_url}/mongodb/{reference}",
-                        timeout=30
-                    )
+                    delete_response = api.delete_rfp(reference)
                     if delete_response.status_code in [200, 204]:
                         deleted_count += 1
+                        purged.add(reference)
                         print(f"[OK] Deleted closed Boond RFP: {reference} (state: {state})")
+                    elif delete_response.status_code == 404:
+                        # Already absent from MongoDB
+                        purged.add(reference)
                     else:
-                        # State might be closed, skip if not found
-                        if delete_response.status_code != 404:
-                            print(f"[WARN] Failed to delete Boond RFP {reference}: status {delete_response.status_code}")
+                        print(f"[WARN] Failed to delete Boond RFP {reference}: status {delete_response.status_code}")
                 except requests.RequestException as e:
                     print(f"[WARN] Error deleting Boond RFP {reference}: {e}")
         
+        if purged != purged_before:
+            save_purged_references(purged)
+            if boond_fingerprints is not None:
+                boond_fingerprints.forget("boond", purged ^ purged_before)
+        
         if deleted_count > 0:
             print(f"[CLEANUP] Deleted {deleted_count} closed Boond RFPs from MongoDB")
         return deleted_count
@@ -275,8 +711,11 @@ def cleanup_closed_boond_rfps(boond_data: dict, api_url: str = "http://localhost
         return 0
 
 
-def process_boond_opportunities(cutoff_date: datetime = None, api_url: str = "http://localhost:8000"):
+def process_boond_opportunities(cutoff_date: datetime = None, api: FuturScamApiClient = None,
+                                inserter: MongoJsonInserter = None, write_counts: dict = None):
     """Fetch and process Boond Manager opportunities.
+    Documents are saved in bulk through `inserter` when given, else through the REST API.
+    matched/upserted/modified counts are added to `write_counts` when given.
     Returns: (saved_count, list of saved RFP documents)
     """
     if cutoff_date is None:
@@ -284,22 +723,33 @@ def process_boond_opportunities(cutoff_date: datetime = None, api_url: str = "ht
     
     print("\n[DOWNLOAD] Fetching Boond Manager opportunities...")
     
-    data = fetch_boond_opportunities()
-    if not data:
-        print("[ERROR] No data from Boond Manager API")
-        return 0, []
-    
-    # First, cleanup all closed opportunities (state != 0) from MongoDB
-    print("[CLEANUP] Checking for closed opportunities (state != 0)...")
-    deleted_count = cleanup_closed_boond_rfps(data, api_url)
-    
-    print(f"[FILTER] Filtering opportunities updated after {cutoff_date.date()}...")
-    # Pass job_enhancer to filter_recent_opportunities for ChatGPT skills/languages extraction
-    recent_opportunities = filter_recent_opportunities(data, cutoff_date, job_enhancer=job_enhancer)
-    print(f"[OK] Found {len(recent_opportunities)} recent opportunities")
+    # One pooled session (and JWT) for the listing pages and the detail requests
+    with create_boond_session() as boond_session:
+        # Full listing (no cutoff): the purge must also see opportunities closed before cutoff_date,
+        # the recent ones are selected from it by filter_recent_opportunities
+        data = fetch_boond_opportunities(session=boond_session)
+        if not data:
+            print("[ERROR] No data from Boond Manager API")
+            return 0, []
+        
+        # First, cleanup closed opportunities (state != 0) from MongoDB.
+        print("[CLEANUP] Checking for closed opportunities (state != 0)...")
+        deleted_count = cleanup_closed_boond_rfps(data, api, inserter=inserter)
+        
+        print(f"[FILTER] Filtering opportunities updated after {cutoff_date.date()}...")
+        # Pass job_enhancer to filter_recent_opportunities for the single-call ChatGPT analysis
+        recent_opportunities = filter_recent_opportunities(
+            data,
+            cutoff_date,
+            job_enhancer=job_enhancer,
+            session=boond_session,
+            enrichment_stage=enrichment_stage,
+            fingerprints=boond_fingerprints,
+            checkpoints=checkpoints
+        )
+        print(f"[OK] Found {len(recent_opportunities)} recent opportunities")
     
-    saved_count = 0
-    saved_rfps = []
+    rfp_docs = []
     
     for opportunity in recent_opportunities:
         try:
@@ -313,130 +763,595 @@ def process_boond_opportunities(cutoff_date: datetime = None, api_url: str = "ht
                 continue
             
             # Opportunity is open (state == 0), process and add to DB
-            rfp_doc = transform_boond_to_mongo_format(opportunity)
-            
-            # Enhance job description with ChatGPT
-            rfp_doc = enhance_rfp_with_chatgpt(rfp_doc)
-            
-            # DEBUG: Print skills before API call
-            print(f"\n[DEBUG] Document skills: {rfp_doc.get('skills')}")
-            print(f"[DEBUG] Full RFP doc: {json.dumps(rfp_doc, indent=2, default=str)}")
-            
-            success, saved_doc = save_to_mongodb_api(rfp_doc, api_url)
-            if success and saved_doc:
-                saved_count += 1
-                saved_rfps.append(saved_doc)
+            rfp_docs.append(transform_boond_to_mongo_format(opportunity))
         except Exception as e:
             print(f"[WARN] Error processing Boond opportunity: {e}")
     
+    # Enhanced and saved chunk by chunk, each saved document is checkpointed as soon as it is written.
+    # Opportunities analyzed in filter_recent_opportunities already have their RFP_type and are skipped
+    saved_rfps = []
+    for batch in iter_save_batches(rfp_docs, inserter):
+        batch = enrichment_stage.map(enhance_rfp_with_chatgpt, batch)
+        report = save_many_to_mongodb(batch, inserter=inserter, api=api,
+                                      on_saved=lambda saved: record_saved_items("boond", saved))
+        saved_rfps.extend(report["saved"])
+        if write_counts is not None:
+            add_report_counts(write_counts, report)
+    saved_count = len(saved_rfps)
+    
     print(f"[OK] Successfully saved {saved_count}/{len(recent_opportunities)} Boond RFPs to MongoDB")
-    return saved_count, saved_rfps
+    return saved_count, with_resumed_items("boond", saved_rfps)
+
 
+def run_batch_reclassification(inserter: MongoJsonInserter, wait: bool = True) -> int:
+    """Re-compute RFP_type for every stored RFP through the OpenAI Batch API.
 
-def main():
+    Submits one batch with every RFP that has a job_desc, or resumes the batch recorded in
+    BATCH_STATE_FILE by a previous run. With wait=False the batch status is only checked
+    once, so the command can be scheduled until the batch completes.
+    Returns the number of RFPs whose RFP_type was updated.
     """
-    Main ETL execution with last execution tracking.
+    job = BatchAnalysisJob(
+        job_enhancer,
+        BATCH_STATE_FILE,
+        poll_interval=getattr(params, "OPENAI_BATCH_POLL_INTERVAL", 60)
+    )
+
+    if not job.pending:
+        documents = inserter.collection.find({"job_desc": {"$nin": [None, ""]}}, {"job_id": 1, "job_desc": 1})
+        if job.submit(documents) is None:
+            return 0
+
+    status = job.poll(wait=wait)
+    if status not in ("completed", "expired", "failed", "cancelled"):
+        print(f"[BATCH] Batch still {status}, run again later to apply its results")
+        return 0
+
+    analyses = job.results()
+    stored = inserter.find_by_job_ids(list(analyses), {"job_id": 1, "RFP_type": 1})
+    updates = {
+        job_id: {"RFP_type": analyses[job_id]["RFP_type"]}
+        for job_id, document in stored.items()
+        if job_id in analyses and document.get("RFP_type") != analyses[job_id]["RFP_type"]
+    }
+
+    # Only RFP_type is set: the other fields (and concurrent edits) are left untouched
+    report = inserter.bulk_set_fields(updates, batch_size=MONGO_BULK_BATCH_SIZE) if updates else {"modified": 0}
+    print(f"[BATCH] RFP_type updated for {report['modified']}/{len(analyses)} RFPs")
+    job.clear()
+    return report["modified"]
+
+
+def acquire_run_lock():
+    """Take the ETL lock without waiting. Returns the open lock file, or None if another run holds it.
+
+    The lock is an OS file lock (released by the OS if the process dies), not the mere
+    existence of the file, so a crash never leaves a stale lock behind.
+    """
+    handle = open(ETL_LOCK_FILE, "a+")
+    try:
+        if os.name == "nt":
+            import msvcrt
+            handle.seek(0)
+            msvcrt.locking(handle.fileno(), msvcrt.LK_NBLCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(handle.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        handle.close()
+        return None
+    return handle
+
+
+def release_run_lock(handle):
+    """Release a lock taken by acquire_run_lock."""
+    try:
+        if os.name == "nt":
+            import msvcrt
+            handle.seek(0)
+            msvcrt.locking(handle.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
+    finally:
+        handle.close()
+
+
+def create_mail_exporter() -> JobMailExporter:
+    """Build the Graph mail exporter from params (not authenticated yet)."""
+    return JobMailExporter(
+        client_id=params.AZURE_CLIENT,
+        authority=params.AZURE_URI,
+        scopes=["https://graph.microsoft.com/.default"],
+        client_secret=params.AZURE_SECRET,
+        user_email=params.AZURE_USER_EMAIL,
+        attachments_dir="attachments",
+        init=False,
+        page_size=getattr(params, "GRAPH_PAGE_SIZE", 50),
+        delta_state_path=str(GRAPH_DELTA_STATE_FILE) if MAIL_DELTA_SYNC else None,
+        batch_concurrency=getattr(params, "GRAPH_BATCH_CONCURRENCY", 1),
+        token_cache_path=str(MSAL_TOKEN_CACHE_FILE)
+    )
+
+
+def process_mail_exports(exporter: JobMailExporter, cutoff_date: datetime, inserter: MongoJsonInserter = None,
+                         write_counts: dict = None):
+    """Fetch the [JOB EXPORT] mails received after cutoff_date, map, enhance and save their RFPs.
+    matched/upserted/modified counts are added to `write_counts` when given.
+    Returns: (saved_count, list of saved RFP documents)
+    """
+    print(f"[EMAIL] Processing emails received after {cutoff_date.isoformat()}...")
+    spooled_files = []
+    if MAIL_SPOOL_TO_DISK:
+        # Opt-in: attachments go through app/attachments and are deleted only once saved
+        exporter.process_emails(cutoff_datetime=cutoff_date)
+        attachments = []
+        for file_path, data in exporter.iter_spooled_attachments():
+            spooled_files.append(file_path)
+            attachments.append(data)
+    else:
+        # Parsed attachments stream straight from the Graph responses into the mapper
+        attachments = exporter.iter_job_exports(cutoff_datetime=cutoff_date)
+
+    mapped_missions = list(ftm.map_many(
+        attachments,
+        pum.MAPPING,
+        pum.LIST_MAPPINGS,
+        post=pum.apply_pro_unity_defaults
+    ))
+    email_missions = skip_saved_mail_missions(mapped_missions)
     
-    This function:
-    1. Reads the last execution timestamp
-    2. Processes emails and Boond opportunities since that timestamp
-    3. Saves the current execution time for next run
+    # Enhance job descriptions with ChatGPT (concurrently, order preserved) and save them chunk by
+    # chunk (bulk when writing to MongoDB directly), checkpointing each document once written
+    email_saved_rfps = []
+    for batch in iter_save_batches(email_missions, inserter):
+        batch = enrichment_stage.map(enhance_rfp_with_chatgpt, batch)
+        email_report = save_many_to_mongodb(batch, inserter=inserter,
+                                            on_saved=lambda saved: record_saved_items("mail", saved))
+        if write_counts is not None:
+            add_report_counts(write_counts, email_report)
+        email_saved_rfps.extend(email_report["saved"])
+    email_saved_count = len(email_saved_rfps)
+    
+    delete_saved_spool_files(spooled_files, mapped_missions, email_missions, email_saved_rfps)
+    
+    print(f"\n[OK] Successfully saved {email_saved_count} email RFPs to MongoDB")
+    return email_saved_count, with_resumed_items("mail", email_saved_rfps)
+
+
+def delete_saved_spool_files(spooled_files: list, mapped_missions: list, attempted: list, saved_rfps: list):
+    """Delete the spooled attachment files whose RFP is saved (by this run or an interrupted one).
+
+    spooled_files[i] produced mapped_missions[i]; documents of `attempted` missing from
+    `saved_rfps` failed to save, and their file is kept so the next run retries them.
+    """
+    saved_ids = {id(rfp_document) for rfp_document in saved_rfps}
+    failed_ids = {id(rfp_document) for rfp_document in attempted if id(rfp_document) not in saved_ids}
+    for file_path, rfp_document in zip(spooled_files, mapped_missions):
+        if id(rfp_document) in failed_ids:
+            print(f"[KEEP] File '{os.path.basename(file_path)}' kept, its RFP was not saved")
+            continue
+        try:
+            os.remove(file_path)
+            print(f"[DELETE] File '{os.path.basename(file_path)}' deleted")
+        except Exception as e:
+            print(f"[WARN] Error deleting '{os.path.basename(file_path)}': {e}")
+
+
+def notify_subscribers(new_rfps: list) -> bool:
+    """Send subscription notifications for the RFPs saved by this run.
+    Returns True if every notification went out (errors are logged, not raised)."""
+    print("\n[NOTIFICATIONS] Sending subscription notifications...")
+    try:
+        notifier = SubscriptionNotifier(api_client=api_client)
+        if notifier.notify_all_subscribers(new_rfps=new_rfps):
+            print("[OK] Subscription notifications completed")
+            return True
+        print("[WARN] Some subscription notifications were not sent")
+    except Exception as e:
+        print(f"[ERROR] Error sending subscription notifications: {e}")
+        traceback.print_exc()
+    return False
+
+
+def mark_notified(sources=CHECKPOINT_SOURCES):
+    """Flag the checkpointed items of `sources` as notified, so a run resuming from them does not notify them twice.
+    Only called once notify_subscribers succeeded: otherwise the resumed run notifies them again."""
+    for source in sources:
+        checkpoints.mark_notified(source)
+
+
+def print_llm_summary():
+    """Print the ChatGPT token usage, cache counters, unchanged-item skips and resumed items of this process."""
+    if job_enhancer is not None:
+        usage = job_enhancer.usage
+        print(f"  - ChatGPT usage: {usage['calls']} calls, {usage['prompt_tokens']} prompt tokens, "
+              f"{usage['completion_tokens']} completion tokens")
+    if llm_cache is not None:
+        for namespace, counters in llm_cache.stats().items():
+            print(f"  - ChatGPT cache [{namespace}]: {counters['hits']} hits, {counters['misses']} misses")
+    if boond_fingerprints is not None:
+        for source, counters in boond_fingerprints.stats().items():
+            print(f"  - Unchanged {source} items skipped: {counters['skipped']} ({counters['changed']} changed)")
+    for source, count in sorted(checkpoints.resumed.items()):
+        print(f"  - {source} items already saved by the interrupted run: {count}")
+
+
+def iter_boond_opportunities(cutoff_date: datetime, inserter: MongoJsonInserter = None,
+                             chunk_size: int = BOOND_MAX_IN_FLIGHT * 4):
+    """Pipeline source: yield the detailed Boond opportunities updated after cutoff_date.
+
+    Closed opportunities are purged first (cleanup_closed_boond_rfps, from the full listing),
+    then details of the recent ones are fetched in chunks of `chunk_size` so the first opportunities reach the next stages
+    while the rest are still downloading. Opportunities unchanged since their last load
+    (boond_fingerprints) or already saved by an interrupted run (checkpoints) are not yielded.
+    """
+    print("\n[DOWNLOAD] Fetching Boond Manager opportunities...")
+    with create_boond_session() as boond_session:
+        # Full listing: the purge must also see opportunities closed before cutoff_date
+        data = fetch_boond_opportunities(session=boond_session)
+        if not data:
+            print("[ERROR] No data from Boond Manager API")
+            return
+
+        print("[CLEANUP] Checking for closed opportunities (state != 0)...")
+        cleanup_closed_boond_rfps(data, inserter=inserter)
+
+        recent_ids = select_recent_ids(data, cutoff_date)
+        print(f"[FILTER] {len(recent_ids)} opportunities updated after {cutoff_date.date()}")
+        for start in range(0, len(recent_ids), chunk_size):
+            chunk = recent_ids[start:start + chunk_size]
+            fetched = fetch_opportunity_details(chunk, session=boond_session)
+            fetched = [(item_id, opportunity) for item_id, opportunity in fetched if opportunity is not None]
+            for item_id, opportunity in skip_unchanged_opportunities(fetched, boond_fingerprints, checkpoints):
+                yield opportunity
+
+
+def map_pipeline_item(item: dict) -> dict:
+    """Pipeline map stage: raw mail attachment or Boond opportunity -> RFP document (None drops it)."""
+    if item["source"] == "mail":
+        mapped = ftm.map_json(item["raw"], pum.MAPPING, pum.LIST_MAPPINGS)
+        item["doc"] = pum.apply_pro_unity_defaults(mapped, item["raw"])
+        # Mail RFPs saved by an interrupted run are dropped before the enrich stage
+        return item if skip_saved_mail_missions([item["doc"]]) else None
+
+    # Closed opportunities were already purged by cleanup_closed_boond_rfps
+    state = item["raw"].get("data", {}).get("attributes", {}).get("state")
+    if state is not None and state != 0 and state != "0":
+        print(f"[SKIP] Opportunity {item['raw'].get('data', {}).get('id')} is closed (state: {state}), already cleaned up")
+        return None
+    item["doc"] = transform_boond_to_mongo_format(item["raw"])
+    return item
+
+
+def enrich_pipeline_item(item: dict) -> dict:
+    """Pipeline enrich stage: ChatGPT analysis of one RFP (see enhance_rfp_with_chatgpt)."""
+    if item["source"] == "boond" and job_enhancer:
+        # Boond analyses need the criteria, only present on the raw opportunity: analyze then re-map
+        analyze_opportunity(item["raw"], job_enhancer)
+        forget_degraded_fingerprints([item["raw"]], boond_fingerprints)
+        item["doc"] = transform_boond_to_mongo_format(item["raw"])
+    item["doc"] = enhance_rfp_with_chatgpt(item["doc"])
+    return item
+
+
+def run_source(source: str, failed_sources: list, process, *args, **kwargs):
+    """Run one source of a single ETL run. A failure is logged and added to `failed_sources`,
+    so the other sources still run and advance their own watermark.
+    Returns process's (saved_count, saved_rfps), or (0, []) if it failed.
+    """
+    try:
+        return process(*args, **kwargs)
+    except Exception as e:
+        print(f"\n[ERROR] {source} processing failed: {e}")
+        traceback.print_exc()
+        failed_sources.append(source)
+        return 0, []
+
+
+async def run_source_async(source: str, failed_sources: list, process):
+    """run_source for a coroutine."""
+    try:
+        return await process
+    except Exception as e:
+        print(f"\n[ERROR] {source} processing failed: {e}")
+        traceback.print_exc()
+        failed_sources.append(source)
+        return 0, []
+
+
+def save_completed_watermarks(current_execution: datetime, failed_sources: list, exporter: JobMailExporter):
+    """Advance the watermark of every source that completed (and commit the mailbox delta token with mail),
+    then raise if any source failed: it resumes from its checkpoints next run."""
+    for source in CHECKPOINT_SOURCES:
+        if source in failed_sources:
+            print(f"[WARN] {source} watermark NOT updated due to error")
+            continue
+        save_source_watermark(source, current_execution)
+        if source == "mail":
+            exporter.commit_delta_token()
+    if failed_sources:
+        raise RuntimeError(f"Sources failed: {', '.join(failed_sources)}")
+
+
+def run_pipeline(args: argparse.Namespace):
+    """
+    Single ETL run as a staged producer/consumer pipeline (--mode pipeline).
+
+    extract (mail and Boond, concurrently) -> map -> enrich -> load, connected by bounded
+    queues (PIPELINE_QUEUE_SIZE) so a slow stage throttles the ones before it. The enrich
+    stage runs OPENAI_MAX_CONCURRENCY workers, map PIPELINE_MAP_WORKERS, and load writes
+    batches of PIPELINE_LOAD_BATCH_SIZE documents.
+    Expired RFPs are cleaned up and subscribers notified once the load stage has drained,
+    so each subscriber still gets one mail per run. As in run_once, each source advances
+    its watermark (mail also its delta token) only if all its items were extracted, mapped,
+    enriched and loaded without error; items saved before a failure are checkpointed batch
+    by batch.
+    Mail attachments are streamed (MAIL_SPOOL_TO_DISK is not used in this mode).
     """
     print("=" * 80)
-    print("[ETL] Starting FuturScam ETL Process")
+    print("[ETL] Starting FuturScam ETL Process (pipeline mode)")
     print("=" * 80)
-    
-    # Get the last execution timestamp
-    last_execution = get_last_execution_time()
+
+    watermarks = get_source_watermarks()
     current_execution = datetime.now(timezone.utc)
-    
-    print(f"\n[ETL] Last execution: {last_execution.isoformat()}")
+    for source, watermark in watermarks.items():
+        print(f"\n[ETL] {source} watermark: {watermark.isoformat()}")
     print(f"[ETL] Current execution: {current_execution.isoformat()}")
-    print(f"[ETL] Processing data from: {last_execution.isoformat()}\n")
-    
+
+    inserter = open_sink_inserter(args.sink)
+    write_counts = {}
+    write_lock = threading.Lock()
+
+    def load(items: list) -> list:
+        # A failure is counted as a load error by the pipeline; these sources keep their watermark
+        report = save_many_to_mongodb([item["doc"] for item in items], inserter=inserter)
+        with write_lock:
+            add_report_counts(write_counts, report)
+        saved_ids = {id(rfp_document) for rfp_document in report["saved"]}
+        saved_items = [item for item in items if id(item["doc"]) in saved_ids]
+        for source in CHECKPOINT_SOURCES:
+            record_saved_items(source, [item["doc"] for item in saved_items if item["source"] == source])
+        return saved_items
+
     try:
-        # Process emails
-        exporter = JobMailExporter(
-            client_id=params.AZURE_CLIENT,
-            authority=params.AZURE_URI,
-            scopes=["https://graph.microsoft.com/.default"],
-            client_secret=params.AZURE_SECRET,
-            user_email=params.AZURE_USER_EMAIL,
-            attachments_dir="attachments",
-            init=False
-        )
-        
+        exporter = create_mail_exporter()
         print("[AUTH] Authenticating with Azure...")
         exporter.authenticate()
 
-        print(f"[EMAIL] Processing emails received after {last_execution.isoformat()}...")
-        exporter.process_emails(cutoff_datetime=last_execution)
+        sources = {
+            "mail": ({"source": "mail", "raw": raw}
+                     for raw in exporter.iter_job_exports(cutoff_datetime=watermarks["mail"])),
+            "boond": ({"source": "boond", "raw": raw}
+                      for raw in iter_boond_opportunities(watermarks["boond"], inserter=inserter)),
+        }
+        pipeline = Pipeline(sources, [
+            Stage("map", map_pipeline_item, workers=PIPELINE_MAP_WORKERS, queue_size=PIPELINE_QUEUE_SIZE),
+            Stage("enrich", enrich_pipeline_item, workers=enrichment_stage.max_concurrency,
+                  queue_size=PIPELINE_QUEUE_SIZE),
+            Stage("load", load, queue_size=PIPELINE_QUEUE_SIZE, batch_size=PIPELINE_LOAD_BATCH_SIZE),
+        ])
+        saved_items = pipeline.run()
+        # Same as a failed source in run_once: an item that failed to map, enrich or load fails its
+        # source, whose RFPs not loaded are retried next run (the others are checkpointed)
+        item_failed_sources = {item["source"] for _, item in pipeline.failed_items}
+        failed_sources = [source for source in CHECKPOINT_SOURCES
+                          if source in pipeline.source_errors or source in item_failed_sources]
+
+        saved_counts = {"mail": 0, "boond": 0}
+        for item in saved_items:
+            saved_counts[item["source"]] += 1
+        all_saved_rfps = [item["doc"] for item in saved_items]
+        print(f"\n[INFO] Total RFPs added/modified in this run: {len(all_saved_rfps)}")
+        for source in CHECKPOINT_SOURCES:
+            all_saved_rfps = with_resumed_items(source, all_saved_rfps)
+
+        expired_count = cleanup_expired_rfps(inserter=inserter, dry_run=args.cleanup_dry_run)
+        if notify_subscribers(all_saved_rfps):
+            mark_notified()
+
+        print(f"\n[SUMMARY]")
+        print(f"  - Email RFPs saved: {saved_counts['mail']}")
+        print(f"  - Boond RFPs saved: {saved_counts['boond']}")
+        print(f"  - Expired RFPs deleted: {expired_count}")
+        print(f"  - Total RFPs saved: {sum(saved_counts.values())}")
+        print(f"  - Sink: {args.sink} (matched: {write_counts.get('matched', 0)}, "
+              f"upserted: {write_counts.get('upserted', 0)}, modified: {write_counts.get('modified', 0)})")
+        pipeline.print_stats()
+        print_llm_summary()
+
+        save_completed_watermarks(current_execution, failed_sources, exporter)
 
-        current_dir = os.path.dirname(__file__)
-        parent_dir = os.path.dirname(current_dir)  
-        json_folder = os.path.join(parent_dir, "app", "attachments")
+        print("\n" + "=" * 80)
+        print("[ETL] FuturScam ETL Process completed successfully")
+        print("=" * 80)
 
-        if not os.path.exists(json_folder):
-            print(f"[WARN] Folder {json_folder} does not exist.")
-            email_saved_count = 0
-            email_saved_rfps = []
+    except Exception as e:
+        print(f"\n[ERROR] ETL Process failed: {e}")
+        traceback.print_exc()
+        print("\n[WARN] Watermarks of the unfinished sources NOT updated (they resume from their checkpoints)")
+        raise
+    finally:
+        if inserter is not None:
+            inserter.close()
+
+
+async def process_mail_exports_async(exporter: JobMailExporter, cutoff_date: datetime, api: AsyncFuturScamApiClient,
+                                     openai_slots: asyncio.Semaphore, inserter: MongoJsonInserter = None,
+                                     write_counts: dict = None):
+    """Async process_mail_exports. Returns: (saved_count, list of saved RFP documents)"""
+    print(f"[EMAIL] Processing emails received after {cutoff_date.isoformat()}...")
+    async with exporter.create_async_client() as graph_client:
+        if MAIL_SPOOL_TO_DISK:
+            mails = await exporter.list_new_emails_async(graph_client, cutoff_datetime=cutoff_date)
+            await asyncio.gather(*(exporter.save_attachments_async(graph_client, mail) for mail in mails))
+            spooled = list(exporter.iter_spooled_attachments())
+            attachments = [data for _, data in spooled]
         else:
-            email_saved_count = 0
-            email_saved_rfps = []
-            for filename in os.listdir(json_folder):
-                if filename.endswith(".json"):
-                    file_path = os.path.join(json_folder, filename)
-                    try:
-                        with open(file_path, "r", encoding="utf-8") as f:
-                            data = json.load(f)
-                            mission = ftm.map_json(data, pum.MAPPING, pum.LIST_MAPPINGS)
-                            
-                            # Apply Pro Unity defaults
-                            mission = pum.apply_pro_unity_defaults(mission, data)
-                            
-                            # Enhance job description with ChatGPT
-                            mission = enhance_rfp_with_chatgpt(mission)
-                            
-                            print(json.dumps(mission, default=to_serializable, indent=2, ensure_ascii=False))
-                            
-                            # Save to MongoDB via API instead of direct insertion
-                            success, saved_doc = save_to_mongodb_api(mission)
-                            if success and saved_doc:
-                                email_saved_count += 1
-                                email_saved_rfps.append(saved_doc)
-                        
-                    except Exception as e:
-                        print(f"[WARN] Error reading {filename}: {e}")
-                    finally:
-                        # Delete only the processed JSON file
-                        if os.path.exists(file_path):
-                            try:
-                                os.remove(file_path)
-                                print(f"[DELETE] File '{filename}' deleted")
-                            except Exception as e:
-                                print(f"[WARN] Error deleting '{filename}': {e}")
-        
-        print(f"\n[OK] Successfully saved {email_saved_count} email RFPs to MongoDB")
-        
-        # Process Boond opportunities with last execution timestamp
-        boond_saved_count, boond_saved_rfps = process_boond_opportunities(cutoff_date=last_execution)
+            spooled = []
+            attachments = await exporter.get_job_exports_async(graph_client, cutoff_datetime=cutoff_date)
+
+    mapped_missions = list(ftm.map_many(attachments, pum.MAPPING, pum.LIST_MAPPINGS,
+                                        post=pum.apply_pro_unity_defaults))
+    email_missions = skip_saved_mail_missions(mapped_missions)
+    saved_rfps = await enrich_and_save_async("mail", email_missions, api, openai_slots, inserter=inserter,
+                                             write_counts=write_counts)
+    
+    delete_saved_spool_files([file_path for file_path, _ in spooled], mapped_missions, email_missions, saved_rfps)
+    
+    print(f"\n[OK] Successfully saved {len(saved_rfps)} email RFPs to MongoDB")
+    return len(saved_rfps), with_resumed_items("mail", saved_rfps)
+
+
+async def process_boond_opportunities_async(cutoff_date: datetime, api: AsyncFuturScamApiClient,
+                                            openai_slots: asyncio.Semaphore, inserter: MongoJsonInserter = None,
+                                            write_counts: dict = None):
+    """Async process_boond_opportunities. Returns: (saved_count, list of saved RFP documents)"""
+    print("\n[DOWNLOAD] Fetching Boond Manager opportunities...")
+    async with create_boond_async_client() as boond_client:
+        # Full listing: the purge must also see opportunities closed before cutoff_date
+        data = await fetch_boond_opportunities_async(client=boond_client)
+        if not data:
+            print("[ERROR] No data from Boond Manager API")
+            return 0, []
+        
+        # The purge of closed opportunities keeps its blocking implementation, in a worker thread
+        print("[CLEANUP] Checking for closed opportunities (state != 0)...")
+        await asyncio.to_thread(cleanup_closed_boond_rfps, data, inserter=inserter)
+        
+        print(f"[FILTER] Filtering opportunities updated after {cutoff_date.date()}...")
+        recent_opportunities = await filter_recent_opportunities_async(
+            data,
+            cutoff_date,
+            job_enhancer=job_enhancer,
+            client=boond_client,
+            semaphore=openai_slots,
+            fingerprints=boond_fingerprints,
+            checkpoints=checkpoints
+        )
+        print(f"[OK] Found {len(recent_opportunities)} recent opportunities")
+    
+    rfp_docs = []
+    for opportunity in recent_opportunities:
+        state = opportunity.get("data", {}).get("attributes", {}).get("state")
+        if state is not None and state != 0 and state != "0":
+            print(f"[SKIP] Opportunity {opportunity.get('data', {}).get('id')} is closed (state: {state}), already cleaned up")
+            continue
+        try:
+            rfp_docs.append(transform_boond_to_mongo_format(opportunity))
+        except Exception as e:
+            print(f"[WARN] Error processing Boond opportunity: {e}")
+    
+    saved_rfps = await enrich_and_save_async("boond", rfp_docs, api, openai_slots, inserter=inserter,
+                                             write_counts=write_counts)
+    print(f"[OK] Successfully saved {len(saved_rfps)}/{len(recent_opportunities)} Boond RFPs to MongoDB")
+    return len(saved_rfps), with_resumed_items("boond", saved_rfps)
+
+
+async def enrich_and_save_async(source: str, rfp_docs: list, api: AsyncFuturScamApiClient,
+                                openai_slots: asyncio.Semaphore, inserter: MongoJsonInserter = None,
+                                write_counts: dict = None) -> list:
+    """Enhance the documents (ChatGPT calls limited by `openai_slots`, shared by mail and Boond), then save them.
+    With an inserter, each bulk batch is enhanced then written by bulk_write in a worker thread (pymongo
+    is blocking); otherwise every document is upserted through the REST API as soon as it is enhanced.
+    Each saved document of `source` is checkpointed once written. Returns the saved documents.
+    """
+    async def enrich(rfp_document):
+        async with openai_slots:
+            return await enhance_rfp_with_chatgpt_async(rfp_document)
+    
+    if inserter is not None:
+        saved_rfps = []
+        for batch in iter_save_batches(rfp_docs, inserter):
+            batch = list(await asyncio.gather(*(enrich(rfp_document) for rfp_document in batch)))
+            report = await asyncio.to_thread(save_many_to_mongodb, batch, inserter,
+                                             on_saved=lambda saved: record_saved_items(source, saved))
+            if write_counts is not None:
+                add_report_counts(write_counts, report)
+            saved_rfps.extend(report["saved"])
+        return saved_rfps
+    
+    async def enrich_and_upsert(rfp_document):
+        rfp_document = await enrich(rfp_document)
+        status = await upsert_rfp_via_api_async(apply_budget_rule(rfp_document), api)
+        if status != "failed":
+            record_saved_items(source, [rfp_document])
+        return rfp_document, status
+    
+    outcomes = await asyncio.gather(*(enrich_and_upsert(rfp_document) for rfp_document in rfp_docs))
+    statuses = [status for _, status in outcomes]
+    report = {status: statuses.count(status) for status in ("created", "updated", "failed")}
+    print(f"[MONGODB] {report['created']} created, {report['updated']} updated, {report['failed']} failed")
+    if write_counts is not None:
+        # Same convention as save_many_to_mongodb for the REST API sink
+        add_report_counts(write_counts, {"matched": report["updated"], "upserted": report["created"],
+                                         "modified": report["updated"]})
+    return [rfp_document for rfp_document, status in outcomes if status != "failed"]
+
+
+async def run_once_async(args: argparse.Namespace):
+    """
+    Single ETL run on one asyncio event loop (--mode async).
+
+    Mail and Boond run concurrently; Graph, Boond, the local REST API and OpenAI
+    (AsyncOpenAI) are called through async clients, so hundreds of calls can be in
+    flight on one thread. Blocking pieces (MSAL token renewal, Graph delta sync, pymongo,
+    expired-RFP cleanup) run in worker threads. Same watermark rules as run_once.
+    """
+    print("=" * 80)
+    print("[ETL] Starting FuturScam ETL Process (async mode)")
+    print("=" * 80)
+    
+    watermarks = get_source_watermarks()
+    current_execution = datetime.now(timezone.utc)
+    for source, watermark in watermarks.items():
+        print(f"\n[ETL] {source} watermark: {watermark.isoformat()}")
+    print(f"[ETL] Current execution: {current_execution.isoformat()}")
+    
+    inserter = open_sink_inserter(args.sink)
+    write_counts = {}
+    api = AsyncFuturScamApiClient(
+        api_url=getattr(params, "API_URL", "http://localhost:8000"),
+        max_connections=ASYNC_API_MAX_CONNECTIONS,
+        timeout=getattr(params, "API_TIMEOUT", 30),
+        retries=getattr(params, "API_RETRIES", 3)
+    )
+    
+    # ChatGPT calls in flight, shared by mail and Boond (rate limits are still enforced by job_enhancer)
+    openai_slots = asyncio.Semaphore(ASYNC_OPENAI_MAX_CONCURRENCY)
+    
+    try:
+        exporter = create_mail_exporter()
+        
+        async def process_mail():
+            print("[AUTH] Authenticating with Azure...")
+            await asyncio.to_thread(exporter.authenticate)
+            return await process_mail_exports_async(exporter, watermarks["mail"], api, openai_slots,
+                                                    inserter=inserter, write_counts=write_counts)
+        
+        failed_sources = []
+        (email_saved_count, email_saved_rfps), (boond_saved_count, boond_saved_rfps) = await asyncio.gather(
+            run_source_async("mail", failed_sources, process_mail()),
+            run_source_async("boond", failed_sources, process_boond_opportunities_async(
+                watermarks["boond"], api, openai_slots, inserter=inserter, write_counts=write_counts
+            ))
+        )
         
-        # Combine all saved RFPs from this run
         all_saved_rfps = email_saved_rfps + boond_saved_rfps
         print(f"\n[INFO] Total RFPs added/modified in this run: {len(all_saved_rfps)}")
         
-        # Clean up expired RFPs (deadlineAt < today)
-        expired_count = cleanup_expired_rfps()
+        expired_count = await asyncio.to_thread(cleanup_expired_rfps, inserter=inserter, dry_run=args.cleanup_dry_run)
         
-        # Send subscription notifications to users (only for RFPs from this run)
         print("\n[NOTIFICATIONS] Sending subscription notifications...")
         try:
-            notifier = SubscriptionNotifier(api_url="http://localhost:8000")
-            notifier.notify_all_subscribers(new_rfps=all_saved_rfps)
-            print("[OK] Subscription notifications completed")
+            notifier = SubscriptionNotifier(api_client=api_client, async_api_client=api)
+            if await notifier.notify_all_subscribers_async(new_rfps=all_saved_rfps):
+                print("[OK] Subscription notifications completed")
+                mark_notified()
+            else:
+                print("[WARN] Some subscription notifications were not sent")
         except Exception as e:
             print(f"[ERROR] Error sending subscription notifications: {e}")
-            import traceback
             traceback.print_exc()
         
         print(f"\n[SUMMARY]")
@@ -444,9 +1359,156 @@ def main():
         print(f"  - Boond RFPs saved: {boond_saved_count}")
         print(f"  - Expired RFPs deleted: {expired_count}")
         print(f"  - Total RFPs saved: {email_saved_count + boond_saved_count}")
+        print(f"  - Sink: {args.sink} (matched: {write_counts.get('matched', 0)}, "
+              f"upserted: {write_counts.get('upserted', 0)}, modified: {write_counts.get('modified', 0)})")
+        print_llm_summary()
+        
+        save_completed_watermarks(current_execution, failed_sources, exporter)
+        
+        print("\n" + "=" * 80)
+        print("[ETL] FuturScam ETL Process completed successfully")
+        print("=" * 80)
+    
+    except Exception as e:
+        print(f"\n[ERROR] ETL Process failed: {e}")
+        traceback.print_exc()
+        print("\n[WARN] Watermarks of the unfinished sources NOT updated (they resume from their checkpoints)")
+        raise
+    finally:
+        await api.aclose()
+        if job_enhancer is not None:
+            await job_enhancer.aclose()
+        if inserter is not None:
+            inserter.close()
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="FuturScam ETL")
+    parser.add_argument(
+        "--sink",
+        choices=["api", "mongo"],
+        default=ETL_SINK,
+        help="Write RFPs through the REST API (default from params.ETL_SINK) or directly to MongoDB with bulk_write"
+    )
+    parser.add_argument(
+        "--warm-skills-cache",
+        action="store_true",
+        help="Fill the skills/languages cache from the RFPs stored in MongoDB (params.MONGO_URI), then exit"
+    )
+    parser.add_argument(
+        "--batch-reclassify",
+        action="store_true",
+        help="Re-compute RFP_type of every stored RFP through the OpenAI Batch API (resumable), then exit"
+    )
+    parser.add_argument(
+        "--batch-no-wait",
+        action="store_true",
+        help="With --batch-reclassify: submit or check the batch once instead of waiting for its completion"
+    )
+    parser.add_argument(
+        "--mode",
+        choices=["sequential", "pipeline", "async"],
+        default=ETL_MODE,
+        help="Single run: mail then Boond (default from params.ETL_MODE), a staged pipeline where both sources "
+             "overlap, or asyncio with every HTTP call on one event loop"
+    )
+    parser.add_argument(
+        "--daemon",
+        action="store_true",
+        help="Keep running and schedule mail, Boond and cleanup on their own intervals (params.DAEMON_*_INTERVAL_MINUTES)"
+    )
+    parser.add_argument(
+        "--show-checkpoints",
+        action="store_true",
+        help="Print the watermark of each source and the items saved since, then exit"
+    )
+    parser.add_argument(
+        "--set-watermark",
+        metavar="ISO_DATETIME",
+        help="Set the watermark of every source (e.g. 2025-12-01T00:00:00, UTC) to reprocess data since then, then exit"
+    )
+    parser.add_argument(
+        "--cleanup-dry-run",
+        action="store_true",
+        help="Only count expired RFPs instead of deleting them"
+    )
+    return parser.parse_args(argv)
+
+
+def run_once(args: argparse.Namespace):
+    """
+    Main ETL execution with per-source checkpoints.
+    
+    This function:
+    1. Reads the watermark of each source (mail, boond) from the checkpoint store
+    2. Processes emails and Boond opportunities since their watermark, skipping the
+       items an interrupted run already saved
+    3. Advances the watermark of every source that completed; a failed source does not
+       hold back the other one and resumes from its checkpoints next run
+    """
+    print("=" * 80)
+    print("[ETL] Starting FuturScam ETL Process")
+    print("=" * 80)
+    
+    # Get the watermark of each source
+    watermarks = get_source_watermarks()
+    current_execution = datetime.now(timezone.utc)
+    
+    for source, watermark in watermarks.items():
+        print(f"\n[ETL] {source} watermark: {watermark.isoformat()}")
+    print(f"[ETL] Current execution: {current_execution.isoformat()}\n")
+    
+    # One MongoDB client for the whole run when writing directly (None for the REST API sink)
+    inserter = open_sink_inserter(args.sink)
+    write_counts = {}
+    
+    try:
+        # Process emails
+        exporter = create_mail_exporter()
+        
+        def process_mail():
+            print("[AUTH] Authenticating with Azure...")
+            exporter.authenticate()
+            return process_mail_exports(
+                exporter,
+                cutoff_date=watermarks["mail"],
+                inserter=inserter,
+                write_counts=write_counts
+            )
+        
+        failed_sources = []
+        email_saved_count, email_saved_rfps = run_source("mail", failed_sources, process_mail)
+        
+        # Process Boond opportunities since the Boond watermark
+        boond_saved_count, boond_saved_rfps = run_source(
+            "boond", failed_sources, process_boond_opportunities,
+            cutoff_date=watermarks["boond"],
+            inserter=inserter,
+            write_counts=write_counts
+        )
+        
+        # Combine all saved RFPs from this run
+        all_saved_rfps = email_saved_rfps + boond_saved_rfps
+        print(f"\n[INFO] Total RFPs added/modified in this run: {len(all_saved_rfps)}")
+        
+        # Clean up expired RFPs (deadlineAt < today)
+        expired_count = cleanup_expired_rfps(inserter=inserter, dry_run=args.cleanup_dry_run)
+        
+        # Send subscription notifications to users (only for RFPs from this run)
+        if notify_subscribers(all_saved_rfps):
+            mark_notified()
+        
+        print(f"\n[SUMMARY]")
+        print(f"  - Email RFPs saved: {email_saved_count}")
+        print(f"  - Boond RFPs saved: {boond_saved_count}")
+        print(f"  - Expired RFPs deleted: {expired_count}")
+        print(f"  - Total RFPs saved: {email_saved_count + boond_saved_count}")
+        print(f"  - Sink: {args.sink} (matched: {write_counts.get('matched', 0)}, "
+              f"upserted: {write_counts.get('upserted', 0)}, modified: {write_counts.get('modified', 0)})")
+        print_llm_summary()
         
-        # Save the current execution timestamp for next run
-        save_last_execution_time(current_execution)
+        # Advance the watermark of the completed sources (and the mailbox delta token) for next run
+        save_completed_watermarks(current_execution, failed_sources, exporter)
         
         print("\n" + "=" * 80)
         print("[ETL] FuturScam ETL Process completed successfully")
@@ -454,10 +1516,141 @@ def main():
         
     except Exception as e:
         print(f"\n[ERROR] ETL Process failed: {e}")
-        import traceback
         traceback.print_exc()
-        print("\n[WARN] Last execution timestamp NOT updated due to error")
+        print("\n[WARN] Watermarks of the unfinished sources NOT updated (they resume from their checkpoints)")
         raise
+    finally:
+        if inserter is not None:
+            inserter.close()
+
+
+def run_daemon(args: argparse.Namespace, intervals_minutes: dict = None):
+    """
+    Run the ETL in a loop inside one process until SIGTERM/SIGINT.
+
+    Clients, sessions, ChatGPT caches and the Graph token stay warm between cycles.
+    Each source (mail, boond, cleanup) runs on its own interval; sources run one after
+    the other, so a cycle never starts while the previous one is still running.
+    Mail and Boond advance their own watermark in the checkpoint store, so a restarted
+    daemon resumes each source where it stopped.
+    On shutdown the running source finishes before the loop exits.
+    """
+    intervals = dict(DAEMON_INTERVALS_MINUTES, **(intervals_minutes or {}))
+    stop = threading.Event()
+
+    def request_stop(signum, frame):
+        print(f"\n[DAEMON] Signal {signum} received, stopping after the current task...")
+        stop.set()
+
+    signal.signal(signal.SIGINT, request_stop)
+    if hasattr(signal, "SIGTERM"):
+        signal.signal(signal.SIGTERM, request_stop)
+
+    print("=" * 80)
+    print("[DAEMON] Starting FuturScam ETL daemon")
+    print("  - Intervals (minutes): " + ", ".join(f"{source}={minutes}" for source, minutes in intervals.items()))
+    print("=" * 80)
+
+    cutoffs = get_source_watermarks()
+    next_runs = {source: 0.0 for source in intervals}
+
+    inserter = open_sink_inserter(args.sink)
+    exporter = create_mail_exporter()
+    try:
+        while not stop.is_set():
+            for source in intervals:
+                if stop.is_set() or time.monotonic() < next_runs[source]:
+                    continue
+
+                started_at = datetime.now(timezone.utc)
+                print(f"\n[DAEMON] Running {source} at {started_at.isoformat()}")
+                write_counts = {}
+                try:
+                    if source == "mail":
+                        saved_count, saved_rfps = process_mail_exports(
+                            exporter, cutoffs["mail"], inserter=inserter, write_counts=write_counts
+                        )
+                    elif source == "boond":
+                        saved_count, saved_rfps = process_boond_opportunities(
+                            cutoff_date=cutoffs["boond"], inserter=inserter, write_counts=write_counts
+                        )
+                    else:
+                        cleanup_expired_rfps(inserter=inserter, dry_run=args.cleanup_dry_run)
+                        saved_rfps = []
+
+                    if saved_rfps and notify_subscribers(saved_rfps):
+                        mark_notified([source])
+                    if source in cutoffs:
+                        cutoffs[source] = started_at
+                        save_source_watermark(source, started_at)
+                        if source == "mail":
+                            exporter.commit_delta_token()
+                        print(f"[DAEMON] {source}: {saved_count} RFPs saved (matched: {write_counts.get('matched', 0)}, "
+                              f"upserted: {write_counts.get('upserted', 0)}, modified: {write_counts.get('modified', 0)})")
+                except Exception as e:
+                    # A failed source keeps its watermark and resumes from its checkpoints at its next interval
+                    print(f"[ERROR] Daemon {source} run failed: {e}")
+                    traceback.print_exc()
+
+                next_runs[source] = time.monotonic() + intervals[source] * 60
+                print_llm_summary()
+
+            # Short waits so a signal is handled promptly even where Event.wait is not interruptible
+            wait = min(next_runs.values()) - time.monotonic()
+            stop.wait(min(max(wait, 0.1), 1.0))
+    finally:
+        if inserter is not None:
+            inserter.close()
+        print("[DAEMON] Stopped")
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    open_state_stores()
+    
+    if args.show_checkpoints:
+        get_source_watermarks()
+        for source, (watermark, item_count) in checkpoints.watermarks().items():
+            print(f"[CHECKPOINT] {source}: watermark {watermark}, {item_count} items saved since")
+        return
+    
+    if args.warm_skills_cache and not job_enhancer:
+        print("[ERROR] Skills cache warm-up needs an OpenAI API key (the cache is tied to the enhancer)")
+        return
+    if args.batch_reclassify and not job_enhancer:
+        print("[ERROR] Batch re-classification needs an OpenAI API key")
+        return
+    
+    # The cache warm-up and the batch re-classification write the same cache and collection as an ETL run
+    lock = acquire_run_lock()
+    if lock is None:
+        print("[SKIP] Another ETL run is still in progress (lock held), not starting a new one")
+        return
+    try:
+        if args.warm_skills_cache:
+            with MongoJsonInserter(params.MONGO_URI) as inserter, create_boond_session() as boond_session:
+                warm_skills_cache(job_enhancer, inserter, boond_fingerprints, session=boond_session)
+        elif args.batch_reclassify:
+            with MongoJsonInserter(params.MONGO_URI) as inserter:
+                run_batch_reclassification(inserter, wait=not args.batch_no_wait)
+        elif args.set_watermark:
+            get_source_watermarks()  # migrates .last_execution first, so it cannot override this value later
+            watermark = datetime.fromisoformat(args.set_watermark)
+            if watermark.tzinfo is None:
+                watermark = watermark.replace(tzinfo=timezone.utc)
+            for source in CHECKPOINT_SOURCES:
+                checkpoints.set_watermark(source, watermark)
+                print(f"[OK] {source} watermark set to {watermark.isoformat()}")
+        elif args.daemon:
+            run_daemon(args)
+        elif args.mode == "pipeline":
+            run_pipeline(args)
+        elif args.mode == "async":
+            asyncio.run(run_once_async(args))
+        else:
+            run_once(args)
+    finally:
+        release_run_lock(lock)
 
 
 if __name__ == "__main__":